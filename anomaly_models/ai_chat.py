@@ -1,24 +1,109 @@
 import argparse
 import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from newspaper import Article
 from openai import OpenAI
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any
 from dotenv import load_dotenv
+from article_cache import ArticleCache, DEFAULT_TTL_SECONDS, DEFAULT_MAX_BYTES
+from conversation_store import ConversationStore, DEFAULT_TOKEN_BUDGET, fit_history, message_tokens
 
 load_dotenv()
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Latest articles summarized into the prompt
+NEWS_ARTICLES = 2
+
+# Socket timeout for one article download, and the most a chat waits for any article
+ARTICLE_TIMEOUT_SECONDS = float(os.getenv('ARTICLE_TIMEOUT_SECONDS', '5'))
+ARTICLE_DEADLINE_SECONDS = float(os.getenv('ARTICLE_DEADLINE_SECONDS', '8'))
+
+ARTICLE_CACHE = ArticleCache(
+    os.getenv('ARTICLE_CACHE_DIR', os.path.join(SCRIPT_DIR, 'cache', 'articles')),
+    ttl_seconds=float(os.getenv('ARTICLE_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+    max_bytes=int(os.getenv('ARTICLE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
+
+# Completion length cap per reply
+CHAT_MAX_TOKENS = int(os.getenv('CHAT_MAX_TOKENS', '1000'))
+
+# Server-side chat sessions: the market context is assembled once per session and every
+# continuation is fitted to the token budget instead of resending the whole history
+CONVERSATIONS = ConversationStore(token_budget=int(os.getenv('CHAT_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET)))
+
+# Chats a worker streams at once; each mostly waits on the completions endpoint
+DEFAULT_WORKER_CONCURRENCY = 8
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> OpenAI:
+    """OpenAI client shared by every chat in this process, so its HTTP connections are reused.
+
+    OPENAI_BASE_URL points it at another completions endpoint, such as chat_standin.py.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                raise ValueError("OpenAI API key not found in environment variables")
+            _client = OpenAI(api_key=api_key)
+        return _client
+
 def process_news_article(url: str) -> str:
     """Extract text content from a news article URL."""
     try:
-        article = Article(url)
+        article = Article(url, request_timeout=ARTICLE_TIMEOUT_SECONDS)
         article.download()
         article.parse()
         return f"Title: {article.title}\n\nContent: {article.text[:1000]}"  # Limit content to 1000 chars
     except Exception as e:
-        print(f"Error processing article {url}: {str(e)}")
+        print(f"Error processing article {url}: {str(e)}", file=sys.stderr)
         return ""
 
+def cached_news_article(url: str) -> str:
+    """Extract an article through the shared cache, so each URL is downloaded once per TTL."""
+    text = ARTICLE_CACHE.load(url)
+    if text is not None:
+        return text
+    with ARTICLE_CACHE.lock(url):
+        # Another chat may have extracted it while we waited for the lock
+        text = ARTICLE_CACHE.load(url)
+        if text is None:
+            text = process_news_article(url)
+            ARTICLE_CACHE.store(url, text)
+        return text
+
+def process_news_articles(urls: List[str]) -> List[str]:
+    """Extract several articles concurrently, in order, skipping ones that fail or miss the deadline."""
+    if not urls:
+        return []
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    futures = [executor.submit(cached_news_article, url) for url in urls]
+    deadline = time.monotonic() + ARTICLE_DEADLINE_SECONDS
+    texts = []
+    try:
+        for url, future in zip(urls, futures):
+            try:
+                text = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                print(f"Timed out extracting article {url}", file=sys.stderr)
+                continue
+            except Exception as e:
+                print(f"Error processing article {url}: {str(e)}", file=sys.stderr)
+                continue
+            if text:
+                texts.append(text)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return texts
+
 def format_market_data(market_data: Dict[str, Any]) -> str:
     """Format market data into a readable string."""
     return f"""
@@ -68,7 +153,7 @@ def format_features(base_features: Dict[str, str], derived_features: List[str])
     
     return features_str
 
-def chat_with_ai(
+def build_chat_messages(
     messages: List[Dict[str, str]], 
     market_data: Dict[str, Any] = None, 
     news_data: List[Dict[str, Any]] = None, 
@@ -78,34 +163,22 @@ def chat_with_ai(
     base_features: Dict[str, str] = None,
     derived_features: List[str] = None,
     continue_chat: bool = False
-) -> str:
-    """Handle chat interaction with OpenAI."""
-    api_key = os.getenv('OPENAI_API_KEY')
-    model = os.getenv('DEFAULT_MODEL', 'gpt-4')
-    
-    if not api_key:
-        raise ValueError("OpenAI API key not found in environment variables")
+) -> List[Dict[str, str]]:
+    """Build the completion messages: the conversation fitted to the token budget when continuing, otherwise with the market context prompt."""
+    if continue_chat:
+        return fit_history(messages, CONVERSATIONS.token_budget)
 
-    client = OpenAI(api_key=api_key)
+    processed_news = process_news_articles([article['link'] for article in (news_data or [])[:NEWS_ARTICLES]])
 
-    if continue_chat:
-        ai_messages = messages
-    else:
-        processed_news = []
-        for article in news_data[:2]:  # Only 2 latest articles
-            article_text = process_news_article(article['link'])
-            if article_text:
-                processed_news.append(article_text)
-
-        market_context = format_market_data(market_data)
-        news_context = "\n\n".join(processed_news)
-        features_context = format_features(base_features or {}, derived_features or [])
-
-        system_prompt = get_system_prompt(symbol, strategy_name, strategy_purpose)
-        
-        ai_messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"""
+    market_context = format_market_data(market_data)
+    news_context = "\n\n".join(processed_news)
+    features_context = format_features(base_features or {}, derived_features or [])
+
+    system_prompt = get_system_prompt(symbol, strategy_name, strategy_purpose)
+    
+    ai_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"""
 Here's the current market data for {symbol}:
 {market_context}
 
@@ -117,22 +190,154 @@ Recent news articles:
 
 Please provide your analysis and respond to: {messages[-1]['content']}
 """}
-        ]
+    ]
+
+    if len(messages) > 1:
+        ai_messages[1:-1] = messages[:-1]
+    return ai_messages
 
-        if len(messages) > 1:
-            ai_messages[1:-1] = messages[:-1]
+def chat_with_ai(
+    messages: List[Dict[str, str]], 
+    market_data: Dict[str, Any] = None, 
+    news_data: List[Dict[str, Any]] = None, 
+    symbol: str = '',
+    strategy_name: str = '',
+    strategy_purpose: str = '',
+    base_features: Dict[str, str] = None,
+    derived_features: List[str] = None,
+    continue_chat: bool = False,
+    on_delta: Callable[[str], None] = None
+) -> str:
+    """Handle chat interaction with OpenAI, passing each piece of the reply to ``on_delta`` as it arrives."""
+    get_client()
+    ai_messages = build_chat_messages(
+        messages, market_data, news_data, symbol, strategy_name, strategy_purpose,
+        base_features, derived_features, continue_chat
+    )
+    return stream_completion(ai_messages, on_delta)
 
+def stream_completion(ai_messages: List[Dict[str, str]], on_delta: Callable[[str], None] = None) -> str:
+    """Request a streamed completion and return the joined reply."""
+    client = get_client()
+    model = os.getenv('DEFAULT_MODEL', 'gpt-4')
     try:
-        chat_completion = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model=model,
             messages=ai_messages,
-            max_tokens=1000
+            max_tokens=CHAT_MAX_TOKENS,
+            stream=True
         )
-        return chat_completion.choices[0].message.content
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        return ''.join(parts)
     except Exception as e:
         raise Exception(f"Error getting AI response: {str(e)}")
 
+def context_args(args: Dict[str, Any]) -> tuple:
+    """Positional chat_with_ai / build_chat_messages arguments for a new analysis."""
+    market_data = args.get('market_data') or {}
+    return (
+        args['messages'],
+        market_data,
+        args.get('news_data') or [],
+        market_data.get('symbol', 'Unknown'),
+        args.get('strategy_name', ''),
+        args.get('strategy_purpose', ''),
+        args.get('base_features') or {},
+        args.get('derived_features') or []
+    )
+
+def chat_from_args(args: Dict[str, Any], continue_chat: bool, on_delta: Callable[[str], None] = None) -> str:
+    """Run one chat from its parsed JSON arguments, as given on the command line or in a worker request."""
+    if continue_chat:
+        return chat_with_ai(args['messages'], continue_chat=True, on_delta=on_delta)
+    return chat_with_ai(*context_args(args), on_delta=on_delta)
+
+def start_session(args: Dict[str, Any], on_delta: Callable[[str], None] = None) -> Dict[str, Any]:
+    """Answer a new analysis and keep its assembled context as a session for continuations."""
+    get_client()
+    ai_messages = build_chat_messages(*context_args(args))
+    reply = stream_completion(ai_messages, on_delta)
+    return {'message': reply, 'session': CONVERSATIONS.create(ai_messages, reply)}
+
+def continue_session(args: Dict[str, Any], on_delta: Callable[[str], None] = None) -> Dict[str, Any]:
+    """Answer the latest user message of a session within the token budget."""
+    conversation = CONVERSATIONS.get(args['session'])
+    message = args['messages'][-1]
+    with conversation.lock:
+        prompt = conversation.prompt(message, CONVERSATIONS.token_budget)
+        reply = stream_completion(prompt, on_delta)
+        conversation.record(message, reply)
+    return {'message': reply, 'session': args['session'], 'promptTokens': sum(message_tokens(m) for m in prompt)}
+
+def serve_worker(max_concurrency: int = DEFAULT_WORKER_CONCURRENCY):
+    """Serve NDJSON chat requests from stdin until it is closed.
+
+    A request is ``{"id": ..., "op": "chat" | "continue", "args": {...}}`` where ``args``
+    holds the command line options by name (``messages``, ``market_data``, ``news_data``, ...).
+    The reply streams as ``{"id": ..., "partial": {"delta": "..."}}`` lines followed by one
+    ``{"id": ..., "result": {"message": "..."}}`` or ``{"id": ..., "error": ..., "type": ...}`` line.
+    A ``chat`` result also carries the ``session`` it started; a ``continue`` with that
+    ``session`` only needs the new user message in ``messages`` and fails with type
+    ``SessionNotFound`` once the session has expired. ``close`` drops a session.
+    """
+    response_stream = sys.stdout
+    # Diagnostics must not interleave with responses
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def respond(payload: dict):
+        line = json.dumps(payload, separators=(',', ':'))
+        with write_lock:
+            response_stream.write(line + '\n')
+            response_stream.flush()
+
+    def handle(request: dict):
+        request_id = request.get('id')
+        try:
+            op, args = request.get('op', 'chat'), request.get('args', {})
+            on_delta = lambda delta: respond({'id': request_id, 'partial': {'delta': delta}})
+            if op == 'close':
+                result = {'closed': CONVERSATIONS.close(args.get('session'))}
+            elif op == 'continue' and args.get('session'):
+                result = continue_session(args, on_delta)
+            elif op == 'continue':
+                result = {'message': chat_from_args(args, True, on_delta)}
+            else:
+                result = start_session(args, on_delta)
+            respond({'id': request_id, 'result': result})
+        except Exception as e:
+            respond({'id': request_id, 'error': str(e), 'type': type(e).__name__})
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        respond({'ready': True})
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                respond({'id': None, 'error': f"Malformed request: {str(e)}", 'type': type(e).__name__})
+                continue
+            executor.submit(handle, request)
+
 def main():
+    worker_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    worker_parser.add_argument('--worker', action='store_true', help='Serve NDJSON chat requests on stdin/stdout, streaming replies as they are generated')
+    worker_parser.add_argument('--max-concurrency', type=int, default=DEFAULT_WORKER_CONCURRENCY, help='Maximum number of chats streamed concurrently in worker mode')
+    worker_args, remaining_argv = worker_parser.parse_known_args()
+    if worker_args.worker:
+        serve_worker(worker_args.max_concurrency)
+        return
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--messages', type=str, required=True)
     parser.add_argument('--market_data', type=str, default='{}')
@@ -143,31 +348,18 @@ def main():
     parser.add_argument('--derived_features', type=str, default='[]')
     parser.add_argument('--continue_chat', type=str, default='false')
     
-    args = parser.parse_args()
+    args = parser.parse_args(remaining_argv)
     
     try:
-        messages = json.loads(args.messages)
-        continue_chat = args.continue_chat.lower() == 'true'
-        
-        if continue_chat:
-            response = chat_with_ai(messages, continue_chat=True)
-        else:
-            market_data = json.loads(args.market_data)
-            news_data = json.loads(args.news_data)
-            base_features = json.loads(args.base_features)
-            derived_features = json.loads(args.derived_features)
-            
-            symbol = market_data.get('symbol', 'Unknown')
-            response = chat_with_ai(
-                messages, 
-                market_data, 
-                news_data, 
-                symbol,
-                args.strategy_name,
-                args.strategy_purpose,
-                base_features,
-                derived_features
-            )
+        response = chat_from_args({
+            'messages': json.loads(args.messages),
+            'market_data': json.loads(args.market_data),
+            'news_data': json.loads(args.news_data),
+            'strategy_name': args.strategy_name,
+            'strategy_purpose': args.strategy_purpose,
+            'base_features': json.loads(args.base_features),
+            'derived_features': json.loads(args.derived_features)
+        }, args.continue_chat.lower() == 'true')
         
         print(json.dumps({"message": response}))
     except Exception as e:
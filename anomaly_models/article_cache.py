@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from filelock import FileLock, Timeout
+
+# How long an extracted article is reused before it is downloaded again
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+
+# Failed extractions are remembered briefly so a dead link does not time out every chat
+FAILURE_TTL_SECONDS = 10 * 60
+
+# Total size of the cache directory before the least recently used entries are evicted
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# How long to wait for another process that is extracting the same URL
+LOCK_TIMEOUT_SECONDS = 60
+
+class ArticleCache:
+    """On-disk store of extracted news article text, one JSON file per URL.
+
+    Entries are shared by every chat process, expire after ``ttl_seconds`` and are
+    evicted least recently used first once the directory outgrows ``max_bytes``.
+    Callers hold ``lock(url)`` around a load/extract/store cycle so concurrent chats
+    about the same symbol download each article once.
+    """
+
+    def __init__(self, root: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def lock(self, url: str) -> FileLock:
+        os.makedirs(self.root, exist_ok=True)
+        return FileLock(self._path(url) + '.lock', timeout=LOCK_TIMEOUT_SECONDS)
+
+    def load(self, url: str) -> Optional[str]:
+        """Cached text for ``url`` ('' for a remembered failure), or None when missing or expired."""
+        path = self._path(url)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        ttl = self.ttl_seconds if entry['text'] else FAILURE_TTL_SECONDS
+        if entry.get('url') != url or time.time() - entry['fetchedAt'] >= ttl:
+            return None
+        # Reads refresh the modification time that eviction orders by
+        os.utime(path)
+        return entry['text']
+
+    def store(self, url: str, text: str):
+        path = self._path(url)
+        os.makedirs(self.root, exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'url': url, 'fetchedAt': time.time(), 'text': text}, f)
+        os.replace(path + '.tmp', path)
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in ``max_bytes``.
+
+        Lock files go with their entry, as do those left without one by earlier evictions.
+        """
+        entries, locks, total = [], set(), 0
+        for entry in os.scandir(self.root):
+            if entry.name.endswith('.json.lock'):
+                locks.add(entry.path)
+                continue
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            _remove_lock(path + '.lock')
+            locks.discard(path + '.lock')
+        for lock_path in locks:
+            if not os.path.exists(lock_path[:-len('.lock')]):
+                _remove_lock(lock_path)
+
+def _remove_lock(path: str):
+    """Delete a lock file unless another process holds it; a caller about to take it just extracts once more."""
+    try:
+        with FileLock(path, timeout=0):
+            os.remove(path)
+    except (Timeout, OSError):
+        pass
@@ -0,0 +1,251 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import joblib
+import numpy as np
+from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREPARED_DATA_DIR = os.path.join(SCRIPT_DIR, 'prepared_data')
+RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
+MANIFEST_FILENAME = 'backtest_manifest.json'
+
+SUPERVISED_MODELS = ['xgboost', 'gradient_boosting', 'random_forest', 'neural_net', 'svm', 'voting_ensemble']
+UNSUPERVISED_MODELS = ['isolation_forest', 'gaussian_mixture', 'elliptic_envelope']
+
+# Models that label outliers -1 and inliers 1; training scored -1 as an anomaly
+OUTLIER_SIGN_MODELS = {'isolation_forest', 'elliptic_envelope'}
+
+# Rows scored per predict call, so large test sets are read from the memory map in slices
+CHUNK_ROWS = 4096
+
+def fingerprint(path: str, previous: dict = None) -> dict:
+    """Size, mtime and content hash of a file, reusing the previous hash when size and mtime match."""
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        return previous
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+def anomaly_scores(model, model_name: str, chunk: np.ndarray):
+    """Continuous anomaly scores for ROC, or None when the model has none.
+
+    Outlier detectors score by how far a row lies outside the decision boundary,
+    which is negative for outliers, so the score is the negated decision function.
+    """
+    if model_name in OUTLIER_SIGN_MODELS:
+        return -model.decision_function(chunk)
+    if model_name not in UNSUPERVISED_MODELS and hasattr(model, 'predict_proba'):
+        return model.predict_proba(chunk)[:, 1]
+    return None
+
+def score_chunks(model, model_name: str, X: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+    """Predict labels (and anomaly scores when available) chunk by chunk.
+
+    Returns the seconds spent in predict alone; the scoring pass for ROC is not timed.
+    """
+    predictions, scores = [], []
+    elapsed = 0.0
+    for start in range(0, len(X), CHUNK_ROWS):
+        chunk = np.asarray(X[start:start + CHUNK_ROWS])
+        started = time.perf_counter()
+        predicted = model.predict(chunk)
+        elapsed += time.perf_counter() - started
+        if model_name in OUTLIER_SIGN_MODELS:
+            predicted = np.where(predicted == -1, 1, 0)
+        predictions.append(predicted)
+        chunk_scores = anomaly_scores(model, model_name, chunk)
+        if chunk_scores is not None:
+            scores.append(chunk_scores)
+    return np.concatenate(predictions), np.concatenate(scores) if scores else None, elapsed
+
+def evaluate_model(folder: str, model_name: str) -> dict:
+    """Score one model on its strategy's memory-mapped test split; runs in a worker process."""
+    X = np.load(os.path.join(PREPARED_DATA_DIR, folder, 'X_test.npy'), mmap_mode='r')
+    y = np.load(os.path.join(PREPARED_DATA_DIR, folder, 'y_test.npy'), mmap_mode='r')
+    model = joblib.load(os.path.join(RESULTS_DIR, folder, 'models', f'{model_name}.joblib'))
+
+    predictions, scores, elapsed = score_chunks(model, model_name, X)
+    y = np.asarray(y)
+    report = classification_report(y, predictions, output_dict=True, zero_division=0)
+
+    metrics = {'accuracy': report['accuracy']}
+    if scores is not None:
+        metrics['roc_auc'] = roc_auc_score(y, scores)
+    metrics.update({
+        'class_0': report['0'],
+        'class_1': report['1'],
+        'macro_avg': report['macro avg'],
+        'weighted_avg': report['weighted avg'],
+        'confusion_matrix': confusion_matrix(y, predictions).tolist(),
+        'latency_per_row_ms': elapsed * 1000 / max(len(X), 1),
+    })
+    return metrics
+
+def best_by(models: dict, key) -> tuple:
+    """(model name, metrics) with the highest key(metrics), keeping the first on ties."""
+    best = None
+    for name, metrics in models.items():
+        if best is None or key(metrics) > key(best[1]):
+            best = (name, metrics)
+    return best
+
+def summarize(strategies: dict) -> dict:
+    """Recompute the cross-strategy winners stored under ``overall_best``."""
+    supervised = [(folder, name, metrics) for folder, strategy in strategies.items() for name, metrics in strategy['supervised_models'].items()]
+    unsupervised = [(folder, name, metrics) for folder, strategy in strategies.items() for name, metrics in strategy['unsupervised_models'].items()]
+
+    def top(entries, key):
+        best = None
+        for entry in entries:
+            if best is None or key(entry[2]) > key(best[2]):
+                best = entry
+        return best
+
+    anomaly = top(supervised, lambda m: m['class_1']['f1-score'])
+    normal = top(supervised, lambda m: m['class_0']['f1-score'])
+    overall = top(supervised, lambda m: m['accuracy'])
+    best_unsupervised = top(unsupervised, lambda m: m['accuracy'])
+    return {
+        'anomaly_detection': {
+            'strategy': anomaly[0], 'model': anomaly[1],
+            'precision': anomaly[2]['class_1']['precision'],
+            'recall': anomaly[2]['class_1']['recall'],
+            'f1_score': anomaly[2]['class_1']['f1-score']
+        },
+        'normal_detection': {
+            'strategy': normal[0], 'model': normal[1],
+            'precision': normal[2]['class_0']['precision'],
+            'recall': normal[2]['class_0']['recall'],
+            'f1_score': normal[2]['class_0']['f1-score']
+        },
+        'overall': {
+            'strategy': overall[0], 'model': overall[1],
+            'accuracy': overall[2]['accuracy'],
+            'f1_score': overall[2]['weighted_avg']['f1-score']
+        },
+        'unsupervised': {
+            'strategy': best_unsupervised[0], 'model': best_unsupervised[1],
+            'accuracy': best_unsupervised[2]['accuracy'],
+            'class_0_f1': best_unsupervised[2]['class_0']['f1-score'],
+            'class_1_f1': best_unsupervised[2]['class_1']['f1-score'],
+            'overall_f1': best_unsupervised[2]['weighted_avg']['f1-score']
+        }
+    }
+
+def write_accuracies(path: str, strategies: dict):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Strategy', 'Best Supervised Accuracy', 'Best Unsupervised Accuracy'])
+        for folder, strategy in strategies.items():
+            writer.writerow([
+                folder,
+                f"{strategy['best_models']['supervised']['metrics']['accuracy']:.4f}",
+                f"{strategy['best_models']['unsupervised']['metrics']['accuracy']:.4f}"
+            ])
+
+def run_backtest(folders: list, processes: int, force: bool = False) -> dict:
+    """Re-score models whose artifact or test data changed and rewrite the consolidated results.
+
+    Returns counts of scored, unchanged and failed models.
+    """
+    consolidated_path = os.path.join(RESULTS_DIR, 'consolidated_results.json')
+    manifest_path = os.path.join(RESULTS_DIR, MANIFEST_FILENAME)
+    with open(consolidated_path) as f:
+        consolidated = json.load(f)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs, fingerprints, unchanged = [], {}, 0
+    for folder in folders:
+        data_fingerprints = {
+            name: fingerprint(os.path.join(PREPARED_DATA_DIR, folder, name), manifest.get(f"{folder}/{name}"))
+            for name in ('X_test.npy', 'y_test.npy')
+        }
+        for name, value in data_fingerprints.items():
+            fingerprints[f"{folder}/{name}"] = value
+        data_key = ''.join(value['sha256'] for value in data_fingerprints.values())
+
+        for model_name in SUPERVISED_MODELS + UNSUPERVISED_MODELS:
+            model_path = os.path.join(RESULTS_DIR, folder, 'models', f'{model_name}.joblib')
+            if not os.path.exists(model_path):
+                continue
+            key = f"{folder}/models/{model_name}.joblib"
+            previous = manifest.get(key)
+            current = fingerprint(model_path, previous)
+            current = {**current, 'data': data_key}
+            fingerprints[key] = current
+            if previous is not None and previous.get('sha256') == current['sha256'] and previous.get('data') == data_key:
+                unchanged += 1
+                continue
+            jobs.append((folder, model_name, key))
+
+    scored, failed = 0, []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(evaluate_model, folder, model_name): (folder, model_name, key) for folder, model_name, key in jobs}
+        for future in as_completed(futures):
+            folder, model_name, key = futures[future]
+            try:
+                metrics = future.result()
+            except Exception as e:
+                # Keep the previous metrics and retry next run
+                print(f"Could not score {folder}/{model_name}: {str(e)}", file=sys.stderr)
+                fingerprints.pop(key, None)
+                failed.append(f"{folder}/{model_name}")
+                continue
+            strategy = consolidated['strategies'].setdefault(folder, {'features_used': [], 'supervised_models': {}, 'unsupervised_models': {}})
+            group = 'unsupervised_models' if model_name in UNSUPERVISED_MODELS else 'supervised_models'
+            strategy[group][model_name] = metrics
+            scored += 1
+            print(f"Scored {folder}/{model_name}: accuracy {metrics['accuracy']:.4f}, {metrics['latency_per_row_ms']:.4f} ms/row")
+
+    for folder, strategy in consolidated['strategies'].items():
+        best_supervised = best_by(strategy['supervised_models'], lambda m: m['accuracy'])
+        best_unsupervised = best_by(strategy['unsupervised_models'], lambda m: m['accuracy'])
+        strategy['best_models'] = {
+            'supervised': {'model_name': best_supervised[0], 'metrics': best_supervised[1]},
+            'unsupervised': {'model_name': best_unsupervised[0], 'metrics': best_unsupervised[1]}
+        }
+
+    if scored:
+        consolidated['timestamp'] = datetime.now().strftime('%Y%m%d_%H%M%S')
+        consolidated['overall_best'] = summarize(consolidated['strategies'])
+        with open(consolidated_path, 'w') as f:
+            json.dump(consolidated, f, indent=4)
+        write_accuracies(os.path.join(RESULTS_DIR, 'comparisons', 'accuracies.csv'), consolidated['strategies'])
+
+    manifest.update(fingerprints)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    return {'scored': scored, 'unchanged': unchanged, 'failed': failed}
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the shipped models on prepared_data and refresh the consolidated results')
+    parser.add_argument('--strategies', default=None, help='Comma separated strategy folders (default: every folder in prepared_data)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='Worker processes used to score models')
+    parser.add_argument('--force', action='store_true', help='Re-score every model even if its artifact is unchanged')
+    args = parser.parse_args()
+
+    if args.strategies:
+        folders = [folder.strip() for folder in args.strategies.split(',') if folder.strip()]
+    else:
+        folders = sorted(
+            folder for folder in os.listdir(PREPARED_DATA_DIR)
+            if os.path.exists(os.path.join(PREPARED_DATA_DIR, folder, 'X_test.npy'))
+        )
+    print(json.dumps(run_backtest(folders, args.processes, args.force)))
+
+if __name__ == '__main__':
+    main()
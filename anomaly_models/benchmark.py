@@ -0,0 +1,314 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from types import SimpleNamespace
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+import run_prediction
+from feature_registry import load_strategies
+from market_cache import MarketDataCache
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(SCRIPT_DIR, 'benchmarks', 'fixtures')
+
+DEFAULT_INTERVALS = ['1y', '2y', '5y', '10y', 'max']
+DEFAULT_MODELS = ['voting_ensemble', 'isolation_forest', 'xgboost', 'gradient_boosting', 'random_forest',
+                  'neural_net', 'svm', 'gaussian_mixture', 'elliptic_envelope']
+STAGES = ['model_load', 'fetch_cold', 'fetch_warm', 'features', 'scaling', 'score', 'align', 'serialize']
+
+# Libraries run_prediction imports on first use; none of them may load with the module itself
+LAZY_MODULES = ['sklearn', 'scipy', 'joblib', 'yfinance', 'pandas_datareader', 'xgboost']
+
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import run_prediction\n"
+    "print(json.dumps({'ms': (time.perf_counter() - started) * 1000, 'modules': sorted(sys.modules)}))\n"
+)
+
+# Market data the benchmark replays: deterministic random walks, or fixtures recorded with --record
+DATA_SOURCES = ['synthetic', 'recorded']
+
+# First bar of synthetic histories
+SYNTHETIC_START = '2000-01-03'
+
+def fixture_path(yahoo_symbol: str, suffix: str) -> str:
+    return os.path.join(FIXTURES_DIR, quote(yahoo_symbol, safe='') + suffix)
+
+def synthetic_history(yahoo_symbol: str, end: pd.Timestamp) -> pd.DataFrame:
+    """Deterministic random-walk daily bars for a symbol, seeded by its name."""
+    rng = np.random.default_rng(zlib.crc32(yahoo_symbol.encode()))
+    index = pd.bdate_range(SYNTHETIC_START, end.tz_localize(None).normalize(), tz='UTC')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, len(index))),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(100_000, 1_000_000, len(index)).astype(np.float64)
+    }, index=index)
+
+class BenchmarkYahoo:
+    """Serves daily bars through the parts of the yfinance API run_prediction uses.
+
+    With ``data='synthetic'`` every symbol gets a deterministic random walk, so
+    timings are reproducible anywhere but bar counts and price paths are not those
+    of the real markets. With ``data='recorded'`` bars are replayed from fixtures
+    captured by ``--record``, and a symbol without a fixture is an error. Recorded
+    histories are shifted by whole weeks so their last bar falls in the current
+    week; Yahoo periods like ``1y`` then select the same number of bars no matter
+    when the fixtures were recorded.
+    """
+
+    def __init__(self, data: str = 'synthetic'):
+        if data not in DATA_SOURCES:
+            raise ValueError(f"Invalid data source: {data}. Must be one of {DATA_SOURCES}")
+        self.data = data
+        self._now = pd.Timestamp.now(tz='UTC')
+        self._histories = {}
+
+    def history(self, yahoo_symbol: str) -> pd.DataFrame:
+        if yahoo_symbol not in self._histories:
+            if self.data == 'synthetic':
+                frame = synthetic_history(yahoo_symbol, self._now)
+            else:
+                path = fixture_path(yahoo_symbol, '.csv.gz')
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"No recorded fixture for {yahoo_symbol}; run benchmark.py --record or use --data synthetic")
+                frame = pd.read_csv(path, index_col=0)
+                frame.index = pd.to_datetime(frame.index, utc=True)
+                weeks = (self._now - frame.index[-1]).days // 7
+                frame.index = frame.index + pd.Timedelta(weeks=weeks)
+            self._histories[yahoo_symbol] = frame
+        return self._histories[yahoo_symbol]
+
+    def download(self, tickers, period=None, start=None, group_by='ticker', **kwargs) -> pd.DataFrame:
+        tickers = tickers.split() if isinstance(tickers, str) else list(tickers)
+        first = pd.Timestamp(start, tz='UTC') if start is not None else run_prediction.period_start(period or 'max', self._now)
+        frames = {}
+        for ticker in tickers:
+            frame = self.history(ticker)
+            frames[ticker] = frame[frame.index >= first] if first is not None else frame
+        return pd.concat(frames, axis=1)
+
+    def Ticker(self, yahoo_symbol: str):
+        path = fixture_path(yahoo_symbol, '.info.json')
+        history = self.history(yahoo_symbol)
+        info = {
+            'longName': yahoo_symbol,
+            'regularMarketTime': int(history.index[-1].timestamp()),
+            'regularMarketPreviousClose': float(history['Close'].iloc[-2])
+        }
+        if self.data == 'recorded' and os.path.exists(path):
+            with open(path) as f:
+                info = json.load(f)
+        return SimpleNamespace(info=info)
+
+    def Search(self, symbol: str, news_count: int = 10):
+        return SimpleNamespace(news=[])
+
+def record_fixtures(yahoo_symbols: list):
+    """Download full daily histories and quote info from Yahoo into the fixtures directory."""
+    import yfinance as yf
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    history = run_prediction.download_daily_history(yahoo_symbols, interval='max')
+    for yahoo_symbol in yahoo_symbols:
+        frame = history[yahoo_symbol]
+        if frame.empty:
+            print(f"No data returned for {yahoo_symbol}, not recorded", file=sys.stderr)
+            continue
+        frame.to_csv(fixture_path(yahoo_symbol, '.csv.gz'))
+        info = yf.Ticker(yahoo_symbol).info
+        with open(fixture_path(yahoo_symbol, '.info.json'), 'w') as f:
+            json.dump(info, f, indent=2, sort_keys=True, default=str)
+        print(f"Recorded {len(frame)} bars for {yahoo_symbol}")
+
+def timed(samples: dict, stage: str, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    samples.setdefault(stage, []).append(time.perf_counter() - started)
+    return result
+
+def run_case(strategy: str, model_name: str, interval: str, primary_symbol: str, repeat: int, cache_root: str) -> dict:
+    """Time every pipeline stage of one (strategy, model, interval) prediction ``repeat`` times."""
+    base_features = run_prediction.strategy_base_features(strategy)
+    mapping = {feature: feature for feature in base_features}
+    samples = {}
+    rows = {}
+
+    for iteration in range(repeat):
+        run_prediction.MODEL_REGISTRY.clear()
+        run_prediction.MARKET_CACHE = MarketDataCache(os.path.join(cache_root, f"{strategy}-{interval}-{iteration}"))
+
+        model = timed(samples, 'model_load', run_prediction.load_model, strategy, model_name)
+        timed(samples, 'fetch_cold', lambda: (
+            run_prediction.fetch_data({'symbol': primary_symbol}, interval),
+            run_prediction.fetch_data(mapping, interval)
+        ))
+        (primary_data, _, market_stats), (_, base_data_weekly, _) = timed(samples, 'fetch_warm', lambda: (
+            run_prediction.fetch_data({'symbol': primary_symbol}, interval),
+            run_prediction.fetch_data(mapping, interval)
+        ))
+        primary_data.index = primary_data.index.tz_convert('UTC').normalize()
+        base_data_weekly.index = base_data_weekly.index.tz_convert('UTC').normalize()
+
+        feature_data = timed(samples, 'features', run_prediction.build_feature_matrix, strategy, base_data_weekly, base_features)
+        run_prediction.MODEL_REGISTRY.get(strategy, run_prediction.SCALER_NAME)  # Scaler load is not part of scaling
+        scaled_data = timed(samples, 'scaling', run_prediction.scale_features, strategy, feature_data)
+        predictions, probabilities = timed(samples, 'score', model.score, scaled_data)
+        daily_predictions, daily_probabilities = timed(
+            samples, 'align', run_prediction.align_weekly_to_daily,
+            base_data_weekly.index, primary_data.index, predictions, probabilities, 'exact'
+        )
+        timed(samples, 'serialize', lambda: json.dumps({
+            'timestamps': primary_data.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+            'predictions': daily_predictions.tolist(),
+            'probabilities': daily_probabilities.tolist(),
+            'ohlc': {
+                'open': primary_data['symbol_Open'].tolist(),
+                'high': primary_data['symbol_High'].tolist(),
+                'low': primary_data['symbol_Low'].tolist(),
+                'close': primary_data['symbol_Close'].tolist(),
+                'volume': primary_data['symbol_Volume'].tolist()
+            },
+            'marketStats': market_stats
+        }, separators=(',', ':'), allow_nan=False))
+        rows = {'daily': len(primary_data), 'weekly': len(base_data_weekly), 'features': feature_data.shape[1]}
+
+    stages = {}
+    for stage, values in samples.items():
+        values = np.array(values) * 1000
+        stages[stage] = {
+            'medianMs': round(float(np.median(values)), 4),
+            'minMs': round(float(values.min()), 4),
+            'p95Ms': round(float(np.percentile(values, 95)), 4),
+        }
+    total = sum(stages[stage]['medianMs'] for stage in stages if stage != 'fetch_cold')
+    return {'rows': rows, 'stages': stages, 'totalWarmMedianMs': round(total, 4)}
+
+def measure_import(repeat: int) -> dict:
+    """Import run_prediction in ``repeat`` fresh interpreters, returning the fastest time and any eagerly loaded lazy modules."""
+    samples, eager = [], set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        samples.append(probe['ms'])
+        eager.update(module for module in probe['modules'] if module.split('.')[0] in LAZY_MODULES)
+    return {'bestMs': round(min(samples), 3), 'medianMs': round(float(np.median(samples)), 3), 'eager': sorted({module.split('.')[0] for module in eager})}
+
+def environment() -> dict:
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'cpus': os.cpu_count(),
+    }
+
+def compare_reports(base: dict, current: dict, threshold: float) -> list:
+    """Return (case, stage, base ms, current ms) for every stage median slower than ``threshold`` times the base."""
+    regressions = []
+    for case, result in current['results'].items():
+        base_result = base['results'].get(case)
+        if not base_result or 'stages' not in base_result or 'stages' not in result:
+            continue
+        for stage, timing in result['stages'].items():
+            base_timing = base_result['stages'].get(stage)
+            if base_timing and base_timing['medianMs'] > 0 and timing['medianMs'] > threshold * base_timing['medianMs']:
+                regressions.append((case, stage, base_timing['medianMs'], timing['medianMs']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark run_prediction stage by stage against synthetic or recorded market data')
+    parser.add_argument('--strategies', default=None, help='Comma separated strategy IDs (default: all)')
+    parser.add_argument('--models', default=','.join(DEFAULT_MODELS), help='Comma separated model names')
+    parser.add_argument('--intervals', default=','.join(DEFAULT_INTERVALS), help='Comma separated history lengths')
+    parser.add_argument('--primary-symbol', default='SPY', help='Primary symbol predictions are aligned to')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--output', default='benchmark_report.json', help='Where to write the JSON report')
+    parser.add_argument('--compare', default=None, help='Previous report to compare stage medians against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Slowdown ratio reported as a regression by --compare')
+    parser.add_argument('--data', default='synthetic', choices=DATA_SOURCES, help='Replay deterministic random-walk bars (synthetic) or fixtures captured with --record (recorded)')
+    parser.add_argument('--record', action='store_true', help='Record fixtures for the selected strategies from Yahoo Finance and exit')
+    parser.add_argument('--import-budget-ms', type=float, default=None, help='Check that importing run_prediction in a fresh interpreter stays under this many milliseconds without loading model or market data libraries, then exit')
+    args = parser.parse_args()
+
+    if args.import_budget_ms is not None:
+        result = measure_import(args.repeat)
+        print(json.dumps(result))
+        if result['eager']:
+            print(f"run_prediction imports {', '.join(result['eager'])} at startup", file=sys.stderr)
+        if result['bestMs'] > args.import_budget_ms:
+            print(f"Importing run_prediction took {result['bestMs']:.1f} ms, over the {args.import_budget_ms:.0f} ms budget", file=sys.stderr)
+        if result['eager'] or result['bestMs'] > args.import_budget_ms:
+            sys.exit(1)
+        return
+
+    strategy_ids = args.strategies.split(',') if args.strategies else list(load_strategies())
+    models = [model for model in args.models.split(',') if model]
+    intervals = [interval for interval in args.intervals.split(',') if interval]
+
+    if args.record:
+        features = {feature for strategy in strategy_ids for feature in run_prediction.strategy_base_features(strategy)}
+        symbols = {run_prediction.YAHOO_SYMBOL_MAP.get(feature, feature) for feature in features}
+        symbols.add(run_prediction.YAHOO_SYMBOL_MAP.get(args.primary_symbol, args.primary_symbol))
+        record_fixtures(sorted(symbols))
+        return
+
+    run_prediction.yf = BenchmarkYahoo(args.data)
+    results = {}
+    # Pipeline diagnostics would otherwise flood the output
+    with tempfile.TemporaryDirectory() as cache_root, open(os.devnull, 'w') as devnull:
+        for strategy in strategy_ids:
+            for model_name in models:
+                for interval in intervals:
+                    case = f"{strategy}:{model_name}:{interval}"
+                    try:
+                        with contextlib.redirect_stdout(devnull):
+                            results[case] = run_case(strategy, model_name, interval, args.primary_symbol, args.repeat, cache_root)
+                    except Exception as e:
+                        results[case] = {'error': str(e), 'type': type(e).__name__}
+                    summary = results[case].get('totalWarmMedianMs', results[case].get('error'))
+                    print(f"{case}: {summary}", file=sys.stderr)
+
+    report = {
+        'environment': environment(),
+        'repeat': args.repeat,
+        'stages': STAGES,
+        'data': args.data,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Wrote {len(results)} cases to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        if base.get('data') != report['data']:
+            print(f"Comparing {report['data']} timings against a report made with {base.get('data', 'unlabelled')} data", file=sys.stderr)
+        regressions = compare_reports(base, report, args.threshold)
+        for case, stage, base_ms, current_ms in regressions:
+            print(f"Regression {case} {stage}: {base_ms:.3f} ms -> {current_ms:.3f} ms")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import json
+import struct
+
+import numpy as np
+
+# Frame layout, all integers little endian:
+#   magic 'AMDF' | version u8 | 3 reserved bytes | header length u32 | header JSON (UTF-8)
+#   | zero padding to an 8 byte boundary | column buffers, each starting on an 8 byte boundary
+# The header lists every column's name, dtype, offset (from the start of the column
+# section) and row count, plus free-form JSON metadata such as market stats, so a
+# reader can view each column as a typed array without copying or parsing text.
+MAGIC = b'AMDF'
+VERSION = 1
+ALIGNMENT = 8
+PREAMBLE = struct.Struct('<4sB3xI')
+
+DTYPES = {
+    'int8': np.dtype('<i1'),
+    'int64': np.dtype('<i8'),
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8'),
+}
+
+def _padding(length: int) -> int:
+    return -length % ALIGNMENT
+
+def encode_frame(columns: dict, meta: dict) -> bytes:
+    """Pack equal-length ``{name: (dtype name, array)}`` columns and JSON metadata into one frame."""
+    buffers, descriptors, offset, rows = [], [], 0, None
+    for name, (dtype_name, values) in columns.items():
+        array = np.ascontiguousarray(values, dtype=DTYPES[dtype_name])
+        if rows is None:
+            rows = len(array)
+        elif len(array) != rows:
+            raise ValueError(f"Column {name} has {len(array)} rows, expected {rows}")
+        descriptors.append({'name': name, 'dtype': dtype_name, 'offset': offset, 'length': len(array)})
+        data = array.tobytes()
+        buffers.append(data + b'\0' * _padding(len(data)))
+        offset += len(buffers[-1])
+
+    header = json.dumps({'rows': rows or 0, 'columns': descriptors, 'meta': meta}, separators=(',', ':'), allow_nan=False).encode('utf-8')
+    preamble = PREAMBLE.pack(MAGIC, VERSION, len(header))
+    header += b' ' * _padding(len(preamble) + len(header))
+    return b''.join([preamble, header, *buffers])
+
+def decode_frame(frame: bytes) -> tuple[dict, dict]:
+    """Inverse of encode_frame: returns ``({name: array}, meta)`` with arrays viewing ``frame``."""
+    magic, version, header_length = PREAMBLE.unpack_from(frame)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} prediction frame")
+    header = json.loads(bytes(frame[PREAMBLE.size:PREAMBLE.size + header_length]))
+    body = PREAMBLE.size + header_length
+    body += _padding(body)
+    columns = {
+        column['name']: np.frombuffer(frame, dtype=DTYPES[column['dtype']], count=column['length'], offset=body + column['offset'])
+        for column in header['columns']
+    }
+    return columns, header['meta']
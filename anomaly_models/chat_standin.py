@@ -0,0 +1,85 @@
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI chat completions endpoint, so the chat worker can be
+# exercised offline:
+#   python chat_standin.py --port 8765
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test python ai_chat.py --worker
+# Replies echo the last user message word by word, streamed as server-sent events
+# like the real endpoint when the request asks for ``stream``.
+
+def reply_words(body: dict) -> list:
+    """Words of the canned reply, capped at the request's max_tokens."""
+    last = body.get('messages', [{}])[-1].get('content', '')
+    words = f"Stand-in reply to: {' '.join(last.split())}".split(' ')
+    words = words[:body.get('max_tokens') or len(words)]
+    return [word if i == 0 else ' ' + word for i, word in enumerate(words)]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay_seconds = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        words = reply_words(body)
+        completion = {'id': f"chatcmpl-{uuid.uuid4().hex}", 'created': int(time.time()), 'model': body.get('model', 'stand-in')}
+
+        if not body.get('stream'):
+            payload = json.dumps({
+                **completion,
+                'object': 'chat.completion',
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ''.join(words)}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(words), 'total_tokens': len(words)},
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        deltas = [{'role': 'assistant', 'content': ''}] + [{'content': word} for word in words] + [{}]
+        for i, delta in enumerate(deltas):
+            chunk = {
+                **completion,
+                'object': 'chat.completion.chunk',
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': 'stop' if i == len(deltas) - 1 else None}],
+            }
+            self._write_event(json.dumps(chunk))
+            if 0 < i < len(deltas) - 1:
+                time.sleep(self.delay_seconds)
+        self._write_event('[DONE]')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_event(self, data: str):
+        event = f"data: {data}\n\n".encode('utf-8')
+        self.wfile.write(f"{len(event):x}\r\n".encode('ascii') + event + b'\r\n')
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the OpenAI chat completions endpoint')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--delay-ms', type=float, default=20, help='Pause between streamed words')
+    args = parser.parse_args()
+
+    StandInHandler.delay_seconds = args.delay_ms / 1000
+    server = ThreadingHTTPServer((args.host, args.port), StandInHandler)
+    print(f"Chat completions stand-in listening on http://{args.host}:{args.port}/v1", flush=True)
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,501 @@
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREPARED_DATA_DIR = os.path.join(SCRIPT_DIR, 'prepared_data')
+RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
+EXTENSION = '.compact'
+
+# File layout, all integers little endian:
+#   magic 'AMCM' | version u8 | 3 reserved bytes | header length u32 | header JSON (UTF-8)
+#   | zero padding to a 64 byte boundary | array buffers, each starting on a 64 byte boundary
+# The header lists every array's name, dtype, shape and offset from the start of the
+# array section, plus the model description, so the arrays are memory-mapped in place.
+MAGIC = b'AMCM'
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<4sB3xI')
+
+# Artifacts are built from the .joblib models by running this module and are not committed.
+# XGBoost models keep joblib: without xgboost installed an exporter could not be checked against it
+EXPORTABLE_MODELS = ['random_forest', 'gradient_boosting', 'isolation_forest', 'neural_net',
+                     'elliptic_envelope', 'gaussian_mixture', 'voting_ensemble']
+
+# Rows pushed through the tree ensembles at once, bounding the (trees, rows) node index matrix
+TREE_CHUNK_ROWS = 2048
+
+# Largest probability or score difference from the original estimator accepted by export,
+# relative to the value where it exceeds 1 (outlier distances reach the thousands)
+MAX_DEVIATION = 1e-9
+
+def compact_path(model_path: str) -> str:
+    """Compact artifact stored next to a ``.joblib`` model."""
+    return os.path.splitext(model_path)[0] + EXTENSION
+
+def _padding(length: int) -> int:
+    return -length % ALIGNMENT
+
+def save_compact(path: str, arrays: dict, meta: dict):
+    """Write ``{name: array}`` and the JSON model description as one memory-mappable file."""
+    descriptors, buffers, offset = [], [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+        descriptors.append({'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset})
+        data = array.tobytes()
+        buffers.append(data + b'\0' * _padding(len(data)))
+        offset += len(buffers[-1])
+
+    header = json.dumps({'arrays': descriptors, 'meta': meta}, separators=(',', ':')).encode('utf-8')
+    preamble = PREAMBLE.pack(MAGIC, VERSION, len(header))
+    header += b' ' * _padding(len(preamble) + len(header))
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(b''.join([preamble, header, *buffers]))
+    os.replace(temp_path, path)
+
+def load_arrays(path: str) -> tuple[dict, dict]:
+    """Inverse of save_compact: returns ``({name: array}, meta)`` with arrays viewing a read-only memory map."""
+    with open(path, 'rb') as f:
+        magic, version, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} compact model")
+        header = json.loads(f.read(header_length))
+    body = PREAMBLE.size + header_length
+    body += _padding(body)
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for descriptor in header['arrays']:
+        dtype = np.dtype(descriptor['dtype'])
+        count = math.prod(descriptor['shape'])
+        start = body + descriptor['offset']
+        arrays[descriptor['name']] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(descriptor['shape'])
+    return arrays, header['meta']
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _binary_proba(positive: np.ndarray) -> np.ndarray:
+    return np.column_stack([1.0 - positive, positive])
+
+class _TreeEnsemble:
+    """Decision trees flattened into shared node arrays and walked for all trees and rows at once.
+
+    Leaves point back at themselves, so every row takes ``max_depth`` steps
+    without checking whether it has already reached a leaf.
+    """
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        # Node indices are stored as int32 but gathered much faster as native indices,
+        # so only they are copied; thresholds and leaf values stay memory-mapped
+        self.feature = arrays[f'{prefix}feature'].astype(np.intp)
+        self.children = arrays[f'{prefix}children'].astype(np.intp).ravel()
+        self.roots = arrays[f'{prefix}roots'].astype(np.intp)
+        self.threshold = arrays[f'{prefix}threshold']
+        self.value = arrays[f'{prefix}value']
+        self.max_depth = meta['max_depth']
+        self.n_features_in_ = meta['n_features']
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """Leaf value of every tree for every row, shaped (trees, rows, ...)."""
+        # Tree libraries compare single precision features against the thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Feature count mismatch: model expects {self.n_features_in_} features, got {X.shape[1]}")
+        chunks = []
+        for start in range(0, len(X), TREE_CHUNK_ROWS):
+            chunk = np.ascontiguousarray(X[start:start + TREE_CHUNK_ROWS])
+            flat = chunk.ravel()
+            row_starts = np.arange(len(chunk), dtype=np.intp) * chunk.shape[1]
+            nodes = np.repeat(self.roots[:, None], len(chunk), axis=1)
+            for _ in range(self.max_depth):
+                go_left = flat[row_starts + self.feature[nodes]] <= self.threshold[nodes]
+                # children holds (right, left) pairs, so the comparison picks the column
+                nodes = self.children[2 * nodes + go_left]
+            chunks.append(self.value[nodes])
+        return np.concatenate(chunks, axis=1) if chunks else self.value[np.empty((len(self.roots), 0), dtype=np.intp)]
+
+class CompactForest(_TreeEnsemble):
+    """Random forest classifier: averages the per-tree class distributions."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        super().__init__(arrays, meta, prefix)
+        self.classes_ = np.array(meta['classes'])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # Summed over the leading (tree) axis, so trees are added one after another like scikit-learn does
+        return self.leaf_values(X).sum(axis=0) / len(self.roots)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+class CompactBoosting(_TreeEnsemble):
+    """Binary scikit-learn gradient boosting: the logistic of the summed leaf margins."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        super().__init__(arrays, meta, prefix)
+        self.classes_ = np.array(meta['classes'])
+        self.base_margin = meta['base_margin']
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.leaf_values(X).sum(axis=0, initial=self.base_margin)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return _binary_proba(_expit(self.decision_function(X)))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+class CompactIsolationForest(_TreeEnsemble):
+    """Isolation forest; leaves hold their path length, so scoring is a sum and a power of two."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        super().__init__(arrays, meta, prefix)
+        self.offset_ = meta['offset']
+        self.denominator = meta['denominator']
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        depths = self.leaf_values(X).sum(axis=0)
+        return -(2 ** (-depths / self.denominator))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # -1 marks an outlier, like IsolationForest.predict
+        return np.where(self.decision_function(X) >= 0, 1, -1)
+
+ACTIVATIONS = {
+    'identity': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'logistic': _expit,
+}
+
+class CompactMLP:
+    """Binary multi-layer perceptron classifier as a chain of dense layers."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        self.weights = [arrays[f'{prefix}coef_{i}'] for i in range(meta['layers'])]
+        self.biases = [arrays[f'{prefix}intercept_{i}'] for i in range(meta['layers'])]
+        self.activation = ACTIVATIONS[meta['activation']]
+        self.classes_ = np.array(meta['classes'])
+        self.n_features_in_ = meta['n_features']
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        activation = np.asarray(X, dtype=np.float64)
+        for i, (weights, bias) in enumerate(zip(self.weights, self.biases)):
+            activation = activation @ weights + bias
+            if i < len(self.weights) - 1:
+                activation = self.activation(activation)
+        return _binary_proba(_expit(activation.ravel()))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+class CompactEllipticEnvelope:
+    """Robust covariance outlier detector: a Mahalanobis distance against a fitted threshold."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        self.location = arrays[f'{prefix}location']
+        self.precision = arrays[f'{prefix}precision']
+        self.offset_ = meta['offset']
+        self.n_features_in_ = len(self.location)
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        centered = np.asarray(X, dtype=np.float64) - self.location
+        return -np.einsum('ij,jk,ik->i', centered, self.precision, centered)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.where(self.decision_function(X) >= 0, 1, -1)
+
+class CompactGaussianMixture:
+    """Gaussian mixture scored from its precision Cholesky factors, for any covariance type."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        self.means = arrays[f'{prefix}means']
+        self.precisions_cholesky = arrays[f'{prefix}precisions_cholesky']
+        self.log_weights = np.log(arrays[f'{prefix}weights'])
+        self.covariance_type = meta['covariance_type']
+        self.n_features_in_ = self.means.shape[1]
+
+    def _weighted_log_prob(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        n_features = X.shape[1]
+        chol = self.precisions_cholesky
+        if self.covariance_type == 'full':
+            log_det = np.log(np.diagonal(chol, axis1=1, axis2=2)).sum(axis=1)
+            y = np.einsum('ij,kjl->kil', X, chol) - np.einsum('kj,kjl->kl', self.means, chol)[:, None, :]
+            distance = (y ** 2).sum(axis=2).T
+        elif self.covariance_type == 'tied':
+            log_det = np.full(len(self.means), np.log(np.diag(chol)).sum())
+            y = (X @ chol)[None, :, :] - (self.means @ chol)[:, None, :]
+            distance = (y ** 2).sum(axis=2).T
+        elif self.covariance_type == 'diag':
+            log_det = np.log(chol).sum(axis=1)
+            precisions = chol ** 2
+            distance = ((self.means ** 2 * precisions).sum(axis=1) - 2.0 * X @ (self.means * precisions).T + (X ** 2) @ precisions.T)
+        else:  # spherical
+            log_det = n_features * np.log(chol)
+            precisions = chol ** 2
+            distance = ((self.means ** 2).sum(axis=1) * precisions - 2 * (X @ self.means.T * precisions) + np.outer((X ** 2).sum(axis=1), precisions))
+        return -0.5 * (n_features * np.log(2 * np.pi) + distance) + log_det + self.log_weights
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        weighted = self._weighted_log_prob(X)
+        weighted -= weighted.max(axis=1, keepdims=True)
+        responsibilities = np.exp(weighted)
+        return responsibilities / responsibilities.sum(axis=1, keepdims=True)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._weighted_log_prob(X).argmax(axis=1)
+
+class CompactVoting:
+    """Voting ensemble over compact members, with soft (probability) or hard (label) voting."""
+
+    def __init__(self, arrays: dict, meta: dict, prefix: str = ''):
+        self.members = [_build(arrays, member, f'{prefix}{i}/') for i, member in enumerate(meta['members'])]
+        self.weights = meta['weights']
+        self.voting = meta['voting']
+        self.classes_ = np.array(meta['classes'])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.voting != 'soft':
+            raise AttributeError(f"predict_proba is not available when voting={self.voting!r}")
+        return np.average([member.predict_proba(X) for member in self.members], axis=0, weights=self.weights)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.voting == 'soft':
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        votes = np.stack([np.searchsorted(self.classes_, member.predict(X)) for member in self.members])
+        weights = np.ones(len(self.members)) if self.weights is None else np.asarray(self.weights, dtype=np.float64)
+        counts = np.stack([(weights[:, None] * (votes == i)).sum(axis=0) for i in range(len(self.classes_))], axis=1)
+        return self.classes_[counts.argmax(axis=1)]
+
+KINDS = {
+    'forest': CompactForest,
+    'boosting': CompactBoosting,
+    'isolation_forest': CompactIsolationForest,
+    'mlp': CompactMLP,
+    'elliptic_envelope': CompactEllipticEnvelope,
+    'gaussian_mixture': CompactGaussianMixture,
+    'voting': CompactVoting,
+}
+
+def _build(arrays: dict, meta: dict, prefix: str = ''):
+    return KINDS[meta['kind']](arrays, meta, prefix)
+
+def load_compact(path: str):
+    """Load a compact artifact as an estimator with the scikit-learn predict methods it supports."""
+    arrays, meta = load_arrays(path)
+    return _build(arrays, meta)
+
+def _flatten_trees(trees: list) -> tuple[dict, int]:
+    """Concatenate per-tree node arrays, rewriting child indices and making leaves point at themselves.
+
+    Each tree is ``(feature, threshold, left, right, value)`` with ``left == -1`` on leaves.
+    Returns the shared arrays and the deepest tree's depth.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for feature, threshold, left, right, value in trees:
+        nodes = np.arange(len(left))
+        leaf = left < 0
+        depth = np.zeros(len(left), dtype=np.int64)
+        # Children always follow their parent, so one pass in node order fills the depths
+        for node in nodes[~leaf]:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+        max_depth = max(max_depth, int(depth.max()))
+        features.append(np.where(leaf, 0, feature))
+        thresholds.append(threshold)
+        lefts.append(np.where(leaf, nodes, left) + offset)
+        rights.append(np.where(leaf, nodes, right) + offset)
+        values.append(value)
+        roots.append(offset)
+        offset += len(left)
+    index = np.int32 if offset < 2 ** 31 else np.int64
+    return {
+        'feature': np.concatenate(features).astype(index),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'children': np.column_stack([np.concatenate(rights), np.concatenate(lefts)]).astype(index),
+        'value': np.concatenate(values),
+        'roots': np.array(roots, dtype=index),
+    }, max_depth
+
+def _sklearn_tree(tree, value: np.ndarray, features: np.ndarray = None) -> tuple:
+    feature = tree.feature if features is None else np.where(tree.children_left < 0, 0, features[np.maximum(tree.feature, 0)])
+    return feature, tree.threshold, tree.children_left, tree.children_right, value
+
+def _average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Expected path length of an unsuccessful search in a binary search tree of n samples."""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    lengths[large] = 2.0 * (np.log(n_samples[large] - 1.0) + np.euler_gamma) - 2.0 * (n_samples[large] - 1.0) / n_samples[large]
+    return lengths
+
+def _export_forest(model) -> tuple[dict, dict]:
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        trees.append(_sklearn_tree(tree, value / normalizer))
+    arrays, max_depth = _flatten_trees(trees)
+    return arrays, {'kind': 'forest', 'classes': model.classes_.tolist(), 'max_depth': max_depth, 'n_features': int(model.n_features_in_)}
+
+def _export_gradient_boosting(model) -> tuple[dict, dict]:
+    if model.estimators_.shape[1] != 1:
+        raise ValueError("Only binary gradient boosting classifiers can be exported")
+    trees = [_sklearn_tree(stage.tree_, stage.tree_.value[:, 0, 0] * model.learning_rate) for stage in model.estimators_[:, 0]]
+    arrays, max_depth = _flatten_trees(trees)
+    # The initial estimator's raw prediction is constant, so one row gives it
+    base_margin = float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+    return arrays, {'kind': 'boosting', 'classes': model.classes_.tolist(), 'base_margin': base_margin,
+                    'max_depth': max_depth, 'n_features': int(model.n_features_in_)}
+
+def _export_isolation_forest(model) -> tuple[dict, dict]:
+    trees = []
+    for estimator, features in zip(model.estimators_, model.estimators_features_):
+        tree = estimator.tree_
+        depth = np.zeros(tree.node_count)
+        for node in range(tree.node_count):
+            if tree.children_left[node] >= 0:
+                depth[tree.children_left[node]] = depth[tree.children_right[node]] = depth[node] + 1
+        # A leaf's path length plus the expected length of the subtree it cut short
+        value = depth + _average_path_length(tree.n_node_samples)
+        trees.append(_sklearn_tree(tree, value, np.asarray(features)))
+    arrays, max_depth = _flatten_trees(trees)
+    denominator = len(model.estimators_) * float(_average_path_length([model.max_samples_])[0])
+    return arrays, {'kind': 'isolation_forest', 'offset': float(model.offset_), 'denominator': denominator,
+                    'max_depth': max_depth, 'n_features': int(model.n_features_in_)}
+
+def _export_mlp(model) -> tuple[dict, dict]:
+    if model.out_activation_ != 'logistic':
+        raise ValueError(f"Only binary MLP classifiers can be exported, got output activation {model.out_activation_}")
+    arrays = {}
+    for i, (weights, bias) in enumerate(zip(model.coefs_, model.intercepts_)):
+        arrays[f'coef_{i}'] = weights
+        arrays[f'intercept_{i}'] = bias
+    return arrays, {'kind': 'mlp', 'layers': len(model.coefs_), 'activation': model.activation,
+                    'classes': model.classes_.tolist(), 'n_features': int(model.n_features_in_)}
+
+def _export_elliptic_envelope(model) -> tuple[dict, dict]:
+    return {'location': model.location_, 'precision': model.get_precision()}, {'kind': 'elliptic_envelope', 'offset': float(model.offset_)}
+
+def _export_gaussian_mixture(model) -> tuple[dict, dict]:
+    arrays = {'means': model.means_, 'precisions_cholesky': model.precisions_cholesky_, 'weights': model.weights_}
+    return arrays, {'kind': 'gaussian_mixture', 'covariance_type': model.covariance_type}
+
+def _export_voting(model) -> tuple[dict, dict]:
+    arrays, members = {}, []
+    for i, estimator in enumerate(model.estimators_):
+        member_arrays, member_meta = export_estimator(estimator)
+        arrays.update({f'{i}/{name}': array for name, array in member_arrays.items()})
+        members.append(member_meta)
+    weights = None
+    if model.weights is not None:
+        # Weights of dropped estimators were never fitted, so keep only the fitted ones
+        weights = [float(weight) for (name, estimator), weight in zip(model.estimators, model.weights) if estimator != 'drop']
+    return arrays, {'kind': 'voting', 'voting': model.voting, 'weights': weights, 'members': members, 'classes': model.classes_.tolist()}
+
+EXPORTERS = {
+    'RandomForestClassifier': _export_forest,
+    'ExtraTreesClassifier': _export_forest,
+    'GradientBoostingClassifier': _export_gradient_boosting,
+    'IsolationForest': _export_isolation_forest,
+    'MLPClassifier': _export_mlp,
+    'EllipticEnvelope': _export_elliptic_envelope,
+    'GaussianMixture': _export_gaussian_mixture,
+    'VotingClassifier': _export_voting,
+}
+
+def export_estimator(model) -> tuple[dict, dict]:
+    """Convert a fitted estimator into compact arrays and a JSON description."""
+    exporter = EXPORTERS.get(type(model).__name__)
+    if exporter is None:
+        raise ValueError(f"No compact format for {type(model).__name__}")
+    return exporter(model)
+
+def deviation(model, compact, X: np.ndarray) -> float:
+    """Largest difference between the original and compact estimator on ``X``, relative above 1; inf when any label differs."""
+    if not np.array_equal(np.asarray(model.predict(X)), compact.predict(X)):
+        return math.inf
+    worst = 0.0
+    for method in ('predict_proba', 'decision_function', 'score_samples'):
+        if hasattr(model, method) and hasattr(compact, method):
+            try:
+                expected = getattr(model, method)(X)
+            except AttributeError:
+                continue
+            difference = np.abs(expected - getattr(compact, method)(X)) / np.maximum(np.abs(expected), 1.0)
+            worst = max(worst, float(np.max(difference, initial=0.0)))
+    return worst
+
+def export_model(folder: str, model_name: str) -> float:
+    """Export one strategy's model next to its ``.joblib`` after checking it on the test split.
+
+    Returns the deviation from the original estimator.
+    """
+    import joblib
+
+    model_path = os.path.join(RESULTS_DIR, folder, 'models', f'{model_name}.joblib')
+    model = joblib.load(model_path)
+    arrays, meta = export_estimator(model)
+    path = compact_path(model_path)
+    save_compact(path, arrays, meta)
+
+    X = np.load(os.path.join(PREPARED_DATA_DIR, folder, 'X_test.npy'))
+    worst = deviation(model, load_compact(path), X)
+    if worst > MAX_DEVIATION:
+        os.remove(path)
+        raise ValueError(f"compact model deviates by {worst:.3g} on the test split")
+    return worst
+
+def main():
+    parser = argparse.ArgumentParser(description='Export trained models to compact memory-mapped artifacts scored without pickle')
+    parser.add_argument('--strategies', default=None, help='Comma separated strategy folders (default: every folder in results)')
+    parser.add_argument('--models', default=','.join(EXPORTABLE_MODELS), help='Comma separated model names')
+    args = parser.parse_args()
+
+    if args.strategies:
+        folders = [folder.strip() for folder in args.strategies.split(',') if folder.strip()]
+    else:
+        folders = sorted(
+            folder for folder in os.listdir(RESULTS_DIR)
+            if os.path.isdir(os.path.join(RESULTS_DIR, folder, 'models'))
+        )
+    models = [model.strip() for model in args.models.split(',') if model.strip()]
+
+    failed = []
+    for folder in folders:
+        for model_name in models:
+            model_path = os.path.join(RESULTS_DIR, folder, 'models', f'{model_name}.joblib')
+            if not os.path.exists(model_path):
+                continue
+            try:
+                worst = export_model(folder, model_name)
+            except Exception as e:
+                print(f"Failed to export {folder}/{model_name}: {str(e)}", file=sys.stderr)
+                failed.append(f"{folder}/{model_name}")
+                continue
+            saved = os.path.getsize(compact_path(model_path))
+            print(f"Exported {folder}/{model_name}: {os.path.getsize(model_path)} -> {saved} bytes, deviation {worst:.3g}")
+    if failed:
+        # The prediction CLI refuses exportable models without an artifact, so a failed export is a failed build
+        print(f"{len(failed)} models could not be exported: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
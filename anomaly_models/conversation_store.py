@@ -0,0 +1,96 @@
+import threading
+import time
+
+from session_store import DEFAULT_IDLE_SECONDS, DEFAULT_MAX_SESSIONS, SessionNotFound, SessionStore
+
+# Prompt size a continuation may send, leaving room in an 8k context for the reply
+DEFAULT_TOKEN_BUDGET = 6000
+
+# Part of the budget reserved for the condensed digest of turns that no longer fit
+SUMMARY_TOKEN_BUDGET = 600
+
+# Characters of each dropped turn kept in the digest
+DIGEST_CHARS = 200
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def message_tokens(message: dict) -> int:
+    # Every message also costs a few tokens of role and framing
+    return estimate_tokens(message['content']) + 4
+
+def digest(message: dict) -> str:
+    """One line standing in for a turn that was dropped from the prompt."""
+    text = ' '.join(message['content'].split())
+    if len(text) > DIGEST_CHARS:
+        text = text[:DIGEST_CHARS].rsplit(' ', 1)[0] + '...'
+    return f"{message['role']}: {text}"
+
+class Conversation:
+    """One chat session: the assembled market context, recent turns and a digest of older ones."""
+
+    def __init__(self, context: list):
+        self.context = context  # System prompt and market context, built once per session
+        self.turns = []
+        self.summary = []
+        self.lock = threading.Lock()  # Held for a whole turn, so replies are recorded in order
+        self.last_used = time.time()
+
+    def _summary_message(self) -> list:
+        if not self.summary:
+            return []
+        lines = '\n'.join(f"- {line}" for line in self.summary)
+        return [{'role': 'system', 'content': f"Earlier in this conversation (condensed):\n{lines}"}]
+
+    def prompt(self, message: dict, token_budget: int) -> list:
+        """Messages for the next completion, fitted to ``token_budget``.
+
+        The newest turns that fit are sent verbatim; older ones move permanently into
+        the digest, whose oldest lines are dropped once it outgrows SUMMARY_TOKEN_BUDGET.
+        """
+        fixed = sum(message_tokens(m) for m in self.context) + SUMMARY_TOKEN_BUDGET
+        available = token_budget - fixed - message_tokens(message)
+        kept = 0
+        for turn in reversed(self.turns):
+            cost = message_tokens(turn)
+            if cost > available:
+                break
+            available -= cost
+            kept += 1
+
+        dropped, self.turns = self.turns[:len(self.turns) - kept], self.turns[len(self.turns) - kept:]
+        self.summary.extend(digest(turn) for turn in dropped)
+        while self.summary and sum(estimate_tokens(line) for line in self.summary) > SUMMARY_TOKEN_BUDGET:
+            self.summary.pop(0)
+
+        if available < 0:
+            # A single message larger than the budget is cut down to what is left
+            limit = max(len(message['content']) + available * 4, DIGEST_CHARS)
+            message = {**message, 'content': message['content'][:limit]}
+        return self.context + self._summary_message() + self.turns + [message]
+
+    def record(self, message: dict, reply: str):
+        self.turns.append(message)
+        self.turns.append({'role': 'assistant', 'content': reply})
+        self.last_used = time.time()
+
+class ConversationStore(SessionStore):
+    """Thread-safe in-memory chat sessions, evicted least recently used and after idling."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_seconds: float = DEFAULT_IDLE_SECONDS,
+                 token_budget: int = DEFAULT_TOKEN_BUDGET):
+        super().__init__('chat', max_sessions, idle_seconds)
+        self.token_budget = token_budget
+
+    def create(self, context: list, reply: str) -> str:
+        """Start a session from the context messages and the reply they produced."""
+        conversation = Conversation(context)
+        conversation.turns.append({'role': 'assistant', 'content': reply})
+        return self.add(conversation)
+
+def fit_history(messages: list, token_budget: int) -> list:
+    """Fit a client-supplied history to the budget the same way a session would."""
+    conversation = Conversation([])
+    conversation.turns = list(messages[:-1])
+    return conversation.prompt(messages[-1], token_budget)
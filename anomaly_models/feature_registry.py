@@ -0,0 +1,286 @@
+import json
+import os
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREPARED_DATA_DIR = os.path.join(SCRIPT_DIR, 'prepared_data')
+
+# Weekly bar fields feature expressions read; fetches materialize only these
+FEATURE_FIELDS = ('Close',)
+
+# Feature expressions are nested tuples, so identical sub-expressions used by several
+# features or strategies share one cache key and are computed once per FeatureGraph.
+def close(symbol): return ('close', symbol)
+def rounded(node): return ('round', node)
+def ratio(a, b): return ('div', a, b)
+def product(a, b): return ('mul', a, b)
+def spread(a, b): return ('sub', a, b)
+def scaled(node, factor): return ('scale', node, factor)
+def pct_change(node, periods): return ('pct_change', node, periods)
+def rolling_mean(node, window): return ('rolling_mean', node, window)
+def rolling_std(node, window): return ('rolling_std', node, window)
+def rolling_max(node, window): return ('rolling_max', node, window)
+# Cross-sectional statistics over several series at each week
+def maximum(*nodes): return ('max', *nodes)
+def minimum(*nodes): return ('min', *nodes)
+def cross_mean(*nodes): return ('cross_mean', *nodes)
+def cross_std(*nodes): return ('cross_std', *nodes)
+
+def _momentum_features(symbols, periods=(7, 14, 21)):
+    features = {}
+    for symbol in symbols:
+        prices = close(symbol)
+        for period in periods:
+            features[f"{symbol}_mom_{period}d"] = pct_change(prices, period)
+            # Training measured mean reversion as a rolling z-score of the price
+            features[f"{symbol}_mean_rev_{period}d"] = ratio(spread(prices, rolling_mean(prices, period)), rolling_std(prices, period))
+    return features
+
+def _volatility_regime_features(symbols):
+    features = {}
+    for symbol in symbols:
+        prices = close(symbol)
+        features[f"{symbol}_vol_regime"] = ratio(rolling_std(prices, 21), rolling_std(prices, 63))
+        features[f"{symbol}_trend"] = ratio(rolling_mean(prices, 7), rolling_mean(prices, 21))
+    return features
+
+def _yield_curve_metrics_features():
+    us_spread = spread(close('USGG30YR'), close('USGG2YR'))
+    ger_spread = spread(close('GTDEM30Y'), close('GTDEM2Y'))
+    features = {
+        'US_YIELD_SPREAD': us_spread,
+        'GER_YIELD_SPREAD': ger_spread,
+        'US_SPREAD_RATIO': ratio(close('USGG30YR'), close('USGG2YR')),
+        'GER_SPREAD_RATIO': ratio(close('GTDEM30Y'), close('GTDEM2Y')),
+        'SPREAD_DIFF': spread(us_spread, ger_spread),
+        'SPREAD_RATIO': ratio(us_spread, ger_spread),
+    }
+    for prefix, curve in (('US', us_spread), ('GER', ger_spread)):
+        features[f"{prefix}_YIELD_SPREAD_MA7"] = rolling_mean(curve, 7)
+        features[f"{prefix}_YIELD_SPREAD_STD7"] = rolling_std(curve, 7)
+        features[f"{prefix}_YIELD_SPREAD_TREND"] = spread(curve, rolling_mean(curve, 7))
+        features[f"{prefix}_YIELD_SPREAD_MOM"] = pct_change(curve, 7)
+    return features
+
+def _yield_curve_enhanced_features():
+    slope = spread(close('GT10'), close('USGG2YR'))
+    return {
+        'yield_curve_slope': slope,
+        'yield_slope_ma_ratio': ratio(slope, rolling_mean(slope, 21)),
+        'yield_curve_steepness': spread(close('USGG30YR'), close('USGG3M')),
+        'yield_curve_curvature': spread(spread(scaled(close('GT10'), 2), close('USGG2YR')), close('USGG30YR')),
+    }
+
+def _dispersion_features(prefix, symbols):
+    prices = [close(symbol) for symbol in symbols]
+    dispersion = spread(maximum(*prices), minimum(*prices))
+    return {
+        f"{prefix}_DISPERSION": dispersion,
+        f"{prefix}_STD": cross_std(*prices),
+        f"{prefix}_RANGE_RATIO": ratio(dispersion, cross_mean(*prices)),
+        f"{prefix}_DISP_MA7": rolling_mean(dispersion, 7),
+        f"{prefix}_DISP_STD7": rolling_std(dispersion, 7),
+    }
+
+def _spread_features(name, a, b):
+    # <name>, its 7 period change and its 7 period standard deviation
+    spread_node = spread(close(a), close(b))
+    return {
+        name: spread_node,
+        'Spread_7D_Change': pct_change(spread_node, 7),
+        'Spread_7D_StdDev': rolling_std(spread_node, 7),
+    }
+
+def _ratio_change_features(name, numerator, denominator, change_name):
+    # <A>_<B>_Ratio, <A>_7D_Change and the 7 period change of the unrounded ratio, as in training
+    ratio_node = ratio(close(numerator), close(denominator))
+    return {
+        name: ratio_node,
+        change_name: pct_change(close(numerator), 7),
+        f"{name}_7D_Change": pct_change(ratio_node, 7),
+    }
+
+# Derived feature expressions per strategy folder. Feature names that match a base
+# symbol are the rounded close of that symbol and need no entry here. Every output
+# column is rounded to 3 decimals with missing values set to 0.
+DERIVED_FEATURES = {
+    'equities_vs_commodities': {
+        'MXUS_XAU_CORR': product(rounded(close('MXUS')), rounded(close('XAU BGNL'))),
+        'MXUS_CL1_CORR': product(rounded(close('MXUS')), rounded(close('Cl1'))),
+    },
+    'volatility_vs_equities': {
+        'MXUS_VIX_CORR': product(rounded(close('MXUS')), rounded(close('VIX'))),
+        'MXUS_VIX_RATIO': ratio(rounded(close('MXUS')), rounded(close('VIX'))),
+    },
+    'yield_curve_metrics': _yield_curve_metrics_features(),
+    'volatility_regime': _volatility_regime_features(['VIX', 'MXUS', 'MXEU', 'MXJP', 'DXY', 'XAU BGNL']),
+    'cross_asset_momentum': _momentum_features(['MXUS', 'XAU BGNL', 'DXY', 'Cl1', 'BDIY']),
+    'yield_curve_enhanced': _yield_curve_enhanced_features(),
+    'vix_momentum': {
+        'VIX_7D_Change': pct_change(close('VIX'), 7),
+        'VIX_7D_High': rolling_max(close('VIX'), 7),
+        'VIX_7D_StdDev': rolling_std(close('VIX'), 7),
+    },
+    'yield_spread_momentum': _spread_features('2Y10Y_Spread', 'GT10', 'USGG2YR'),
+    'dxy_gold_correlation': {
+        'DXY_Gold_Ratio': ratio(close('DXY'), close('XAU BGNL')),
+        'DXY_7D_Change': pct_change(close('DXY'), 7),
+        'Gold_7D_Change': pct_change(close('XAU BGNL'), 7),
+    },
+    'em_vs_dm': _ratio_change_features('MXCN_MXUS_Ratio', 'MXCN', 'MXUS', 'MXCN_7D_Change'),
+    'oil_dxy_relationship': _ratio_change_features('Oil_DXY_Ratio', 'Cl1', 'DXY', 'Oil_7D_Change'),
+    'equity_vix_ratio': _ratio_change_features('MXUS_VIX_Ratio', 'MXUS', 'VIX', 'MXUS_7D_Change'),
+    'equities_vs_bonds': {
+        'MXUS_30Y_CORR': product(rounded(close('MXUS')), rounded(close('USGG30YR'))),
+        'MXUS_10Y_CORR': product(rounded(close('MXUS')), rounded(close('GT10'))),
+    },
+    'equity_dispersion': _dispersion_features('EQUITY', ['MXUS', 'MXEU', 'MXJP']),
+    'commodity_dispersion': _dispersion_features('COMMODITY', ['XAU BGNL', 'Cl1', 'CRY']),
+    'us_eu_yield_spread': _spread_features('US_EU_10Y_Spread', 'GT10', 'GTDEM10Y'),
+    'bond_market_stress': {
+        'Bond_7D_Change': pct_change(close('LUACTRUU'), 7),
+        'Yield_7D_Change': pct_change(close('GT10'), 7),
+        'Bond_Yield_Ratio': ratio(close('LUACTRUU'), close('GT10')),
+    },
+}
+
+# Reductions across the series of a cross-sectional node, one value per week
+CROSS_SECTIONAL = {
+    'max': lambda stacked: stacked.max(axis=0),
+    'min': lambda stacked: stacked.min(axis=0),
+    'cross_mean': lambda stacked: stacked.mean(axis=0),
+    'cross_std': lambda stacked: stacked.std(axis=0, ddof=1),
+}
+
+class FeatureGraph:
+    """Evaluates feature expressions over weekly close prices, computing each node once.
+
+    One graph is meant to live for a single request, so strategies scored together
+    share intermediates such as the 7 period change of MXUS.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._cache = {}
+
+    def evaluate(self, node) -> np.ndarray:
+        if node not in self._cache:
+            self._cache[node] = self._compute(node)
+        return self._cache[node]
+
+    def _close(self, symbol: str) -> np.ndarray:
+        column = f"{symbol}_Close"
+        if column not in self.data.columns:
+            raise ValueError(f"Required feature {symbol} not found in data")
+        return self.data[column].to_numpy(dtype=np.float64)
+
+    def _compute(self, node) -> np.ndarray:
+        op = node[0]
+        if op == 'close':
+            return self._close(node[1])
+        if op == 'round':
+            return np.round(self.evaluate(node[1]), 3)
+        if op == 'scale':
+            return self.evaluate(node[1]) * node[2]
+        if op in CROSS_SECTIONAL:
+            return CROSS_SECTIONAL[op](np.stack([self.evaluate(child) for child in node[1:]]))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if op in ('div', 'mul', 'sub'):
+                a, b = self.evaluate(node[1]), self.evaluate(node[2])
+                return a / b if op == 'div' else a * b if op == 'mul' else a - b
+
+            values, size = self.evaluate(node[1]), node[2]
+            result = np.full(len(values), np.nan)
+            if op == 'pct_change':
+                if len(values) > size:
+                    result[size:] = values[size:] / values[:-size] - 1
+                return result
+            if len(values) >= size:
+                windows = sliding_window_view(values, size)
+                if op == 'rolling_mean':
+                    result[size - 1:] = windows.mean(axis=1)
+                elif op == 'rolling_std':
+                    result[size - 1:] = windows.std(axis=1, ddof=1)
+                elif op == 'rolling_max':
+                    result[size - 1:] = windows.max(axis=1)
+                else:
+                    raise ValueError(f"Unknown feature operation: {op}")
+            return result
+
+def lookback(node) -> int:
+    """Earlier weeks a feature reads besides the current one, so a slice that starts this many rows early reproduces it exactly."""
+    op = node[0]
+    if op == 'close':
+        return 0
+    if op == 'pct_change':
+        return lookback(node[1]) + node[2]
+    if op in ('rolling_mean', 'rolling_std', 'rolling_max'):
+        return lookback(node[1]) + node[2] - 1
+    return max(lookback(child) for child in node[1:] if isinstance(child, tuple))
+
+class CompiledStrategy(NamedTuple):
+    folder: str
+    columns: list
+    nodes: list
+    symbols: list  # Base symbols whose weekly closes the strategy reads
+
+    def evaluate(self, graph: FeatureGraph) -> np.ndarray:
+        """Return the (weeks, features) matrix in the column order the models were trained on."""
+        matrix = np.empty((len(graph.data), len(self.nodes)))
+        for i, node in enumerate(self.nodes):
+            matrix[:, i] = graph.evaluate(rounded(node))
+        matrix[np.isnan(matrix)] = 0
+        return matrix
+
+    def lookback(self) -> int:
+        return max((lookback(node) for node in self.nodes), default=0)
+
+@lru_cache(maxsize=None)
+def load_strategies() -> dict:
+    """Strategy definitions from prepared_data/strategies.json keyed by string ID."""
+    with open(os.path.join(PREPARED_DATA_DIR, 'strategies.json')) as f:
+        return {str(strategy['id']): strategy for strategy in json.load(f)['strategies']}
+
+@lru_cache(maxsize=None)
+def load_feature_names(folder: str) -> list:
+    """Training-time feature order for a strategy folder."""
+    with open(os.path.join(PREPARED_DATA_DIR, folder, 'feature_names.txt')) as f:
+        return [line.strip() for line in f if line.strip()]
+
+def _symbols(node, found: dict):
+    if node[0] == 'close':
+        found[node[1]] = None
+    else:
+        for child in node[1:]:
+            if isinstance(child, tuple):
+                _symbols(child, found)
+
+@lru_cache(maxsize=None)
+def compile_strategy(strategy_id: str) -> Optional[CompiledStrategy]:
+    """Compile a strategy into its feature expressions, or None if a feature has no definition."""
+    strategy = load_strategies().get(str(strategy_id))
+    if strategy is None:
+        return None
+    folder = strategy['folder']
+    base = strategy['features']['base']
+    derived = DERIVED_FEATURES.get(folder, {})
+
+    columns = load_feature_names(folder)
+    nodes = []
+    for column in columns:
+        if column in derived:
+            nodes.append(derived[column])
+        elif column in base:
+            nodes.append(close(column))
+        else:
+            return None
+
+    symbols = {}
+    for node in nodes:
+        _symbols(node, symbols)
+    return CompiledStrategy(folder, columns, nodes, list(symbols))
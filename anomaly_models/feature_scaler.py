@@ -0,0 +1,143 @@
+import argparse
+import os
+import sys
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from feature_registry import FeatureGraph, compile_strategy, load_strategies, rounded
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PREPARED_DATA_DIR = os.path.join(SCRIPT_DIR, 'prepared_data')
+SCALER_FILENAME = 'scaler.npz'
+
+# Largest difference, in standardized units, tolerated between X_train/X_test and the
+# raw features rescaled with the recovered statistics. Training rounded some
+# intermediates differently, which leaves residuals around 1e-2; larger ones mean the
+# feature definition does not reproduce the training features and the fit is skipped.
+MAX_RESIDUAL = 0.05
+
+# Strategies whose training features cannot be rebuilt from the workbook, so no scaler
+# can be recovered for them and scoring them fails instead of guessing statistics
+UNRECOVERABLE = {
+    'market_stress': 'its 109 training features include composite stress indicators (vix_percentile, safe_haven_flow, ...) whose formulas were not kept',
+    'global_market_stress': 'its 147 training features include cross-market correlations whose windows were not kept',
+    'combined_stress': 'its 100 training features include composite stress indicators whose formulas were not kept',
+    'jpy_yield_correlation': 'training clipped the yield change and ratio columns at bounds that were not kept',
+}
+
+class FeatureScaler(NamedTuple):
+    """Training-time standardization statistics for one strategy's feature matrix."""
+    columns: list
+    mean: np.ndarray
+    scale: np.ndarray
+
+    def transform(self, data: np.ndarray, start: int = 0) -> np.ndarray:
+        """Standardize ``data`` in place and return it.
+
+        Rows before ``start`` are assumed to be standardized already, so appending
+        new rows to a scaled matrix only costs a pass over the new rows.
+        """
+        if data.shape[1] != len(self.mean):
+            raise ValueError(f"Feature count mismatch: scaler expects {len(self.mean)} features, got {data.shape[1]}")
+        rows = data[start:]
+        rows -= self.mean
+        rows *= 1.0 / self.scale
+        return data
+
+def scaler_path(folder: str) -> str:
+    return os.path.join(SCRIPT_DIR, 'results', folder, 'models', SCALER_FILENAME)
+
+def load_scaler(folder: str):
+    """Load a strategy's saved scaler, or None when it has not been fitted."""
+    path = scaler_path(folder)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as saved:
+        return FeatureScaler(
+            columns=saved['columns'].tolist(),
+            mean=saved['mean'].astype(np.float64),
+            scale=saved['scale'].astype(np.float64)
+        )
+
+def missing_scaler_reason(folder: str) -> str:
+    """Why a strategy has no saved scaler, for errors raised when it is scored."""
+    if folder in UNRECOVERABLE:
+        return UNRECOVERABLE[folder]
+    return f"{scaler_path(folder)} is missing; run feature_scaler.py to recover it"
+
+def save_scaler(folder: str, scaler: FeatureScaler):
+    np.savez(scaler_path(folder), columns=np.array(scaler.columns), mean=scaler.mean, scale=scaler.scale)
+
+def load_training_closes(path: str) -> pd.DataFrame:
+    """Weekly closes from the raw training workbook, as ``<symbol>_Close`` columns."""
+    raw = pd.read_excel(path, header=0)
+    closes = raw.drop(columns=['Y', 'Data']).astype(np.float64)
+    closes.columns = [f"{column}_Close" for column in closes.columns]
+    return closes.reset_index(drop=True)
+
+def recover_scaler(strategy_id: str, graph: FeatureGraph):
+    """Recover the StandardScaler statistics a strategy's models were trained with.
+
+    prepared_data only ships the standardized X_train/X_test, with rows shuffled.
+    Standardizing is affine per column, so matching the mean and standard deviation
+    of the raw training features against X_train and X_test combined gives the
+    scaler's mean and scale exactly. Returns the scaler and the worst residual.
+    """
+    compiled_strategy = compile_strategy(strategy_id)
+    if compiled_strategy is None:
+        raise ValueError("strategy has no feature definition")
+
+    folder = compiled_strategy.folder
+    standardized = np.concatenate([
+        np.load(os.path.join(PREPARED_DATA_DIR, folder, 'X_train.npy')),
+        np.load(os.path.join(PREPARED_DATA_DIR, folder, 'X_test.npy'))
+    ])
+    if standardized.shape[1] != len(compiled_strategy.nodes):
+        raise ValueError(f"prepared data has {standardized.shape[1]} features, definition has {len(compiled_strategy.nodes)}")
+
+    # Training back-filled the rolling-window warm-up rows
+    raw = pd.DataFrame({
+        column: graph.evaluate(rounded(node)) for column, node in zip(compiled_strategy.columns, compiled_strategy.nodes)
+    }).bfill().to_numpy()
+    if len(raw) != len(standardized):
+        raise ValueError(f"workbook has {len(raw)} rows, prepared data has {len(standardized)}")
+    if not np.isfinite(raw).all():
+        raise ValueError("raw features contain non-finite values")
+
+    scale = raw.std(axis=0) / standardized.std(axis=0)
+    mean = raw.mean(axis=0) - scale * standardized.mean(axis=0)
+    scale[~np.isfinite(scale) | (scale == 0)] = 1.0
+
+    residual = np.max(np.abs(np.sort((raw - mean) / scale, axis=0) - np.sort(standardized, axis=0)))
+    return FeatureScaler(list(compiled_strategy.columns), mean, scale), residual
+
+def main():
+    parser = argparse.ArgumentParser(description='Recover training-time scaler statistics and save them next to each strategy\'s models')
+    parser.add_argument('--data', default=os.path.join(SCRIPT_DIR, 'AnamolyData.xlsx'), help='Raw weekly training workbook')
+    parser.add_argument('--strategies', default=None, help='Comma separated strategy IDs (default: all)')
+    args = parser.parse_args()
+
+    graph = FeatureGraph(load_training_closes(args.data))
+    strategies = load_strategies()
+    strategy_ids = args.strategies.split(',') if args.strategies else list(strategies)
+
+    for strategy_id in strategy_ids:
+        folder = strategies[strategy_id]['folder']
+        if folder in UNRECOVERABLE:
+            print(f"Skipping strategy {strategy_id} ({folder}): {UNRECOVERABLE[folder]}", file=sys.stderr)
+            continue
+        try:
+            scaler, residual = recover_scaler(strategy_id, graph)
+        except ValueError as e:
+            print(f"Skipping strategy {strategy_id} ({folder}): {str(e)}", file=sys.stderr)
+            continue
+        if residual > MAX_RESIDUAL:
+            print(f"Skipping strategy {strategy_id} ({folder}): residual {residual:.3g} exceeds {MAX_RESIDUAL}", file=sys.stderr)
+            continue
+        save_scaler(folder, scaler)
+        print(f"Saved scaler for strategy {strategy_id} ({folder}), residual {residual:.3g}")
+
+if __name__ == '__main__':
+    main()
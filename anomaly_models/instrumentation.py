@@ -0,0 +1,191 @@
+import cProfile
+import contextvars
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Diagnostics go to stderr only when this is set, so stdout carries nothing but results
+VERBOSE = os.getenv('ANOMALY_VERBOSE', '') not in ('', '0')
+
+# Where --profile-slow-ms writes cProfile dumps of slow requests
+PROFILE_DIR = os.getenv('ANOMALY_PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'profiles'))
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+_current = contextvars.ContextVar('instrumentation_recorder', default=None)
+_sink_lock = threading.Lock()
+
+def debug(message: str):
+    """Print a diagnostic line to stderr when ANOMALY_VERBOSE is set."""
+    if VERBOSE:
+        print(message, file=sys.stderr)
+
+def peak_rss_mb():
+    """Highest resident set size this process has reached since it started, in MB, or None where it is not available.
+
+    In the long-lived worker this only ever grows, so it says nothing about one request.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, or None where it is not available (only Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * PAGE_SIZE / (1024 * 1024)
+
+def rss_delta_mb(started):
+    """Change in resident memory since ``started`` (a ``current_rss_mb`` reading), or None."""
+    if started is None:
+        return None
+    ended = current_rss_mb()
+    return None if ended is None else round(ended - started, 1)
+
+class Recorder:
+    """Collects the timed stages of one request.
+
+    Memory is reported as the change in resident memory over the request and over
+    each stage. Stages run concurrently in one process, so a stage's change also
+    includes whatever its neighbours allocated or freed meanwhile.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages = []
+        self.timings = None  # Final summary, set when the request finishes
+        self.profiles = None  # cProfile profiles of every thread that worked on the request, when profiling
+        self.lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._started_rss = current_rss_mb()
+
+    def summary(self) -> dict:
+        return {
+            'request': self.name,
+            'totalMs': round((time.perf_counter() - self._started) * 1000, 3),
+            'rssDeltaMb': rss_delta_mb(self._started_rss),
+            'processPeakRssMb': peak_rss_mb(),
+            'stages': self.stages,
+        }
+
+class Stage(dict):
+    """Attributes of one timed stage; ``set`` adds counters such as rows or cache hits."""
+
+    def set(self, **attributes):
+        self.update(attributes)
+
+@contextmanager
+def stage(name: str, **attributes):
+    """Time a block as a stage of the current request; a no-op outside of one."""
+    recorder = _current.get()
+    record = Stage(name=name, **attributes)
+    if recorder is None:
+        yield record
+        return
+    started, started_rss = time.perf_counter(), current_rss_mb()
+    try:
+        yield record
+    finally:
+        record['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        rss_delta = rss_delta_mb(started_rss)
+        if rss_delta is not None:
+            record['rssDeltaMb'] = rss_delta
+        recorder.stages.append(record)
+
+def timed(name: str, describe=None):
+    """Decorator form of ``stage`` for whole functions.
+
+    ``describe(result)`` may return counters for the stage, such as rows produced.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with stage(name) as record:
+                result = fn(*args, **kwargs)
+                if describe is not None:
+                    record.set(**describe(result))
+                return result
+        return wrapper
+    return decorator
+
+@contextmanager
+def profiled():
+    """Profile the calling thread for the block when the current request is being profiled.
+
+    Before Python 3.12 cProfile only sees the thread that enabled it, so pipeline
+    stages running on executor threads profile themselves and are merged into the
+    request's dump. From 3.12 one profiler sees every thread but only one may be
+    active, so enabling fails here and the request's profiler already covers the block.
+    """
+    recorder = _current.get()
+    if recorder is None or recorder.profiles is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        with recorder.lock:
+            recorder.profiles.append(profiler)
+
+@contextmanager
+def request(name: str, profile_slow_ms: float = None, metrics_file: str = None):
+    """Record the stages of one request.
+
+    With ``profile_slow_ms`` the request runs under cProfile and the profile is
+    dumped to PROFILE_DIR when it takes longer than that. The dump merges the
+    request thread with every stage wrapped in ``profiled`` (see StageGraph); work
+    submitted to other executors or processes is not included. With
+    ``metrics_file`` the summary is appended to that file as one JSON line.
+    """
+    recorder = Recorder(name)
+    token = _current.set(recorder)
+    profiler = None
+    if profile_slow_ms is not None:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            recorder.profiles = [profiler]
+        except ValueError:
+            # Another request in this process is already being profiled
+            profiler = None
+    try:
+        yield recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        _current.reset(token)
+        summary = recorder.timings = recorder.summary()
+        if profiler is not None and summary['totalMs'] > profile_slow_ms:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{int(summary['totalMs'])}ms.prof")
+            with recorder.lock:
+                stats = pstats.Stats(*recorder.profiles)
+            stats.dump_stats(path)
+            print(f"Slow {name} request ({summary['totalMs']:.0f} ms, {len(recorder.profiles)} profiled threads) profiled to {path}", file=sys.stderr)
+        if metrics_file:
+            with _sink_lock, open(metrics_file, 'a') as f:
+                f.write(json.dumps(summary, separators=(',', ':')) + '\n')
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from typing import NamedTuple, Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+from filelock import FileLock
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# How long the most recent bars are trusted before topping up from Yahoo
+DEFAULT_TTL_SECONDS = 15 * 60
+
+# How long to wait for another process that is refreshing the same symbol
+LOCK_TIMEOUT_SECONDS = 120
+
+class CachedHistory(NamedTuple):
+    frame: pd.DataFrame
+    fetched_at: float
+    coverage_start: Optional[pd.Timestamp]  # None when the full history is cached
+
+class MarketDataCache:
+    """On-disk store of processed daily OHLCV bars, one directory per cache key.
+
+    Each entry holds a UTC nanosecond timestamp column and a float64 OHLCV block as
+    .npy files that are memory-mapped on read, plus a small JSON metadata file.
+    Callers hold ``lock(key)`` around a load/refresh/store cycle so concurrent
+    workers never refresh the same symbol twice or read a half-written entry.
+    """
+
+    def __init__(self, root: str, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, quote(key, safe=''))
+
+    def lock(self, key: str) -> FileLock:
+        os.makedirs(self.root, exist_ok=True)
+        return FileLock(self._path(key) + '.lock', timeout=LOCK_TIMEOUT_SECONDS)
+
+    def load(self, key: str) -> Optional[CachedHistory]:
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+            values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+        # The block stays memory-mapped and read-only; callers that modify bars copy them first
+        frame = pd.DataFrame(
+            values,
+            index=pd.to_datetime(np.asarray(index), utc=True),
+            columns=OHLCV_COLUMNS,
+            copy=False
+        )
+        coverage_start = meta.get('coverageStart')
+        return CachedHistory(
+            frame=frame,
+            fetched_at=meta['fetchedAt'],
+            coverage_start=pd.Timestamp(coverage_start, tz='UTC') if coverage_start is not None else None
+        )
+
+    def store(self, key: str, frame: pd.DataFrame, coverage_start: Optional[pd.Timestamp]):
+        path = self._path(key)
+        os.makedirs(path, exist_ok=True)
+        index = frame.index.tz_convert('UTC').as_unit('ns').asi8
+        values = frame[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        meta = {
+            'fetchedAt': time.time(),
+            'coverageStart': coverage_start.value if coverage_start is not None else None,
+            'rows': len(frame),
+            'lastBar': int(index[-1]) if len(index) else None,
+        }
+
+        # Write everything next to the live files first so readers never see a partial entry
+        for name, array in (('index.npy', index), ('values.npy', values)):
+            with open(os.path.join(path, name + '.tmp'), 'wb') as f:
+                np.save(f, array)
+        with open(os.path.join(path, 'meta.json.tmp'), 'w') as f:
+            json.dump(meta, f)
+        for name in ('index.npy', 'values.npy', 'meta.json'):
+            os.replace(os.path.join(path, name + '.tmp'), os.path.join(path, name))
+
+    def version(self, key: str) -> Optional[tuple]:
+        """(last bar timestamp, fetch time) of an entry from its metadata alone, or None when missing.
+
+        Any refresh changes it, so it identifies the exact bars a result was computed from.
+        """
+        try:
+            with open(os.path.join(self._path(key), 'meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta.get('lastBar'), meta['fetchedAt']
+
+    def is_fresh(self, entry: CachedHistory) -> bool:
+        return time.time() - entry.fetched_at < self.ttl_seconds
+
+    @staticmethod
+    def covers(entry: CachedHistory, start: Optional[pd.Timestamp]) -> bool:
+        """Whether the cached bars reach back at least as far as ``start``."""
+        if entry.coverage_start is None:
+            return True
+        return start is not None and entry.coverage_start <= start
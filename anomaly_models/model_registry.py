@@ -0,0 +1,101 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Default memory budget for cached models, measured by artifact size on disk
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class ModelRegistry:
+    """Thread-safe LRU cache of loaded models keyed by (strategy, model name).
+
+    ``loader(strategy, model_name)`` must return ``(model, nbytes)`` where ``nbytes``
+    is the cost charged against the budget. Least recently used models are evicted
+    once the cached total exceeds ``max_bytes``; a model larger than the whole budget
+    is returned to the caller but not kept.
+    """
+
+    def __init__(self, loader, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._loader = loader
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (strategy, model_name) -> (model, nbytes)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    def __contains__(self, key) -> bool:
+        strategy, model_name = key
+        with self._lock:
+            return (str(strategy), model_name) in self._entries
+
+    def get(self, strategy: str, model_name: str):
+        """Return the cached model, loading it from disk on a miss."""
+        key = (str(strategy), model_name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given model; others wait and then hit the cache
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return self._entries[key][0]
+                self._misses += 1
+
+            started = time.perf_counter()
+            model, nbytes = self._loader(*key)
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._load_seconds += elapsed
+                self._key_locks.pop(key, None)
+                if nbytes <= self.max_bytes:
+                    self._entries[key] = (model, nbytes)
+                    self._total_bytes += nbytes
+                    self._evict()
+            return model
+
+    def preload(self, keys):
+        """Load a hot set of (strategy, model_name) pairs ahead of the first request.
+
+        Models that fail to load are reported on stderr and skipped.
+        """
+        for strategy, model_name in keys:
+            try:
+                self.get(strategy, model_name)
+            except Exception as e:
+                print(f"Could not preload model {strategy}:{model_name}: {str(e)}", file=sys.stderr)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'maxBytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'loadSeconds': round(self._load_seconds, 6),
+                'models': [f"{strategy}:{model_name}" for strategy, model_name in self._entries],
+            }
+
+    def _evict(self):
+        # Caller holds self._lock
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._total_bytes -= nbytes
+            self._evictions += 1
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Default memory budget for cached responses, measured by their serialized length
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+class ResultCache:
+    """Thread-safe LRU cache of serialized responses with request coalescing.
+
+    ``get_or_compute(key, compute)`` returns the cached string for ``key`` while it
+    is younger than ``ttl_seconds``. Otherwise one caller runs ``compute()`` and
+    every identical request arriving meanwhile waits for that same result instead
+    of running the pipeline again (singleflight); failures are shared but not cached.
+    Least recently used entries are evicted once the total length exceeds ``max_bytes``.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._in_flight = {}  # key -> Future shared by coalesced requests
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def get_or_compute(self, key, compute) -> str:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            return flight.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.set_exception(e)
+            raise
+
+        with self._lock:
+            # Stored in the same step that ends the flight, so no request slips in between and recomputes
+            self._in_flight.pop(key, None)
+            self._store(key, value)
+        flight.set_result(value)
+        return value
+
+    def put(self, key, value: str):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key, value: str):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._total_bytes -= len(previous[0])
+        if len(value) <= self.max_bytes:
+            self._entries[key] = (value, time.time())
+            self._total_bytes += len(value)
+            self._evict()
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl_seconds
+        while self._entries:
+            key, (value, stored_at) = next(iter(self._entries.items()))
+            if self._total_bytes <= self.max_bytes and stored_at >= cutoff:
+                break
+            del self._entries[key]
+            self._total_bytes -= len(value)
+            self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'maxBytes': self.max_bytes,
+                'ttlSeconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+            }
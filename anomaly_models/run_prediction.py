@@ -1,21 +1,47 @@
 import os
 import sys
-import site
 import json
 import argparse
+import base64
+import functools
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-import joblib
-import yfinance as yf
+from model_registry import ModelRegistry, DEFAULT_MAX_BYTES
+from market_cache import MarketDataCache, DEFAULT_TTL_SECONDS
+from result_cache import ResultCache, DEFAULT_MAX_BYTES as DEFAULT_RESULT_CACHE_BYTES
+from stage_graph import StageGraph
+from score_index import IndexedScores, ScoreIndex
+from feature_registry import compile_strategy, load_strategies, FeatureGraph, FEATURE_FIELDS
+from feature_scaler import load_scaler, missing_scaler_reason, scaler_path
+from streaming_scorer import StreamingScorer
+from session_store import SessionStore
+from binary_frame import encode_frame
+from compact_model import EXPORTABLE_MODELS, compact_path, load_compact
+from scoring import Scorer, scorer_for
+from instrumentation import debug, request as instrumented_request, stage, timed
 
-def escape_path(path):
-    """Escape spaces in path for Windows."""
-    return f'"{path}"' if ' ' in path else path
+# yfinance, joblib and scikit-learn take most of the startup time, so they are imported
+# on first use; `yf` stays a module attribute so tests and benchmarks can swap it out
+yf = None
+
+def yahoo():
+    """The yfinance module, imported the first time market data or news is requested."""
+    global yf
+    if yf is None:
+        import yfinance
+        yf = yfinance
+    return yf
 
 # Get the absolute path to the script's directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Training matrices, used to calibrate outlier detector scores
+PREPARED_DATA_DIR = os.path.join(SCRIPT_DIR, 'prepared_data')
+
 # Valid intervals for yfinance
 VALID_INTERVALS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
 
@@ -68,12 +94,77 @@ STRATEGY_FOLDERS = {
     "25": "equity_vix_ratio"
 }
 
-def load_model(strategy: str, model_name: str = 'voting_ensemble'):
-    """Load the trained model for the given strategy."""
+# Ways of mapping weekly predictions onto the daily chart bars
+ALIGNMENT_MODES = ['exact', 'asof']
+
+# Response encodings: JSON lists, or one typed-column binary frame (see binary_frame.py)
+OUTPUT_FORMATS = ['json', 'binary']
+
+# Number of requests a long-lived worker process serves at the same time
+DEFAULT_WORKER_CONCURRENCY = 4
+
+# Upper bound on concurrent Yahoo Finance requests made while fetching data
+FETCH_MAX_WORKERS = 8
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS)
+
+# Threads running the stages of concurrent requests (see StageGraph)
+STAGE_MAX_WORKERS = 16
+STAGE_EXECUTOR = ThreadPoolExecutor(max_workers=STAGE_MAX_WORKERS)
+
+# Quote summaries behind market stats change slowly next to a request rate, so they are reused briefly
+TICKER_INFO_TTL_SECONDS = float(os.getenv('TICKER_INFO_TTL_SECONDS', 60))
+TICKER_INFO_CACHE = ResultCache(ttl_seconds=TICKER_INFO_TTL_SECONDS, max_bytes=4 * 1024 * 1024)
+
+# Watchlist symbols fetched and aligned at the same time while screening
+SCREEN_MAX_WORKERS = 8
+
+# Processes used to score models for batch requests, created on first use
+SCORING_PROCESSES = min(4, os.cpu_count() or 1)
+SCORING_POOL = None
+SCORING_POOL_LOCK = threading.Lock()
+
+# Every request's timings are appended here as JSON lines when set (see --metrics-file)
+METRICS_FILE = os.getenv('ANOMALY_METRICS_FILE') or None
+
+# Live scoring sessions opened through the worker, evicted least recently used and after idling
+STREAM_SESSIONS = SessionStore('streaming')
+
+# Processed daily bars shared by every request and worker process on this machine
+MARKET_CACHE = MarketDataCache(
+    os.getenv('MARKET_CACHE_DIR', os.path.join(SCRIPT_DIR, 'cache', 'ohlcv')),
+    ttl_seconds=float(os.getenv('MARKET_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+)
+
+# Serialized worker responses keyed by request options and the version of every market
+# data entry they read; the TTL bounds how stale quote info and news can get
+RESULT_CACHE = ResultCache(
+    ttl_seconds=float(os.getenv('RESULT_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+    max_bytes=DEFAULT_RESULT_CACHE_BYTES
+)
+
+# Weekly features and scores of full-history requests, extended as new weeks close
+SCORE_INDEX = ScoreIndex(os.getenv('SCORE_INDEX_DIR', os.path.join(SCRIPT_DIR, 'cache', 'scores')))
+SCORE_INDEX_INTERVAL = 'max'
+
+# Most recent stored weeks recomputed on every request, so revised bars replace the rows they changed
+SCORE_INDEX_VERIFY_WEEKS = 8
+
+# Cached and re-downloaded closes of the same settled bar further apart than this (relative,
+# plus one rounding step) mean Yahoo re-adjusted the history for a split or dividend
+ADJUSTMENT_TOLERANCE = 5e-4
+
+# Registry name under which a strategy's training-time scaler is cached
+SCALER_NAME = 'scaler'
+
+def model_artifact_path(strategy: str, model_name: str) -> str:
+    """Validate a strategy and model name and return the model's artifact path."""
     strategy_folder = STRATEGY_FOLDERS.get(str(strategy))
     if not strategy_folder:
         raise ValueError(f"Invalid strategy ID: {strategy}")
     
+    if model_name == SCALER_NAME:
+        return scaler_path(strategy_folder)
+    
     # Validate model name
     valid_models = [
         'voting_ensemble',
@@ -89,13 +180,266 @@ def load_model(strategy: str, model_name: str = 'voting_ensemble'):
     if model_name not in valid_models:
         raise ValueError(f"Invalid model name: {model_name}. Must be one of {valid_models}")
         
-    model_path = escape_path(os.path.join(SCRIPT_DIR, 'results', strategy_folder, 'models', f'{model_name}.joblib'))
-    if not os.path.exists(model_path.strip('"')):  # Remove quotes for path existence check
+    model_path = os.path.join(SCRIPT_DIR, 'results', strategy_folder, 'models', f'{model_name}.joblib')
+    if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model not found at path: {model_path}")
-    return joblib.load(model_path.strip('"'))  # Remove quotes for joblib
+    return model_path
+
+def training_data(strategy: str):
+    """Loader for the feature matrix a strategy's models were fitted on, or None when it is not shipped."""
+    path = os.path.join(PREPARED_DATA_DIR, STRATEGY_FOLDERS[str(strategy)], 'X_train.npy')
+    return lambda: np.load(path) if os.path.exists(path) else None
+
+def _read_model(strategy: str, model_name: str):
+    """Load a trained model from disk, returning its Scorer with the artifact size in bytes."""
+    path = model_artifact_path(strategy, model_name)
+    if model_name == SCALER_NAME:
+        scaler = load_scaler(STRATEGY_FOLDERS[str(strategy)])
+        return scaler, os.path.getsize(path) if scaler is not None else 0
+    
+    # Exported array-backed models are memory-mapped and scored with NumPy alone
+    if model_name in EXPORTABLE_MODELS:
+        compact = compact_path(path)
+        if not os.path.exists(compact):
+            raise FileNotFoundError(f"No compact export of {model_name} for strategy {strategy}; run python compact_model.py")
+        return scorer_for(load_compact(compact), training_data(strategy)), os.path.getsize(compact)
+    
+    # Unpickling imports the model's own library (sklearn, xgboost) only when it is needed
+    import joblib
+    return scorer_for(joblib.load(path), training_data(strategy)), os.path.getsize(path)
+
+MODEL_REGISTRY = ModelRegistry(_read_model)
+
+def load_model(strategy: str, model_name: str = 'voting_ensemble') -> Scorer:
+    """Load the trained model for the given strategy through the in-process model cache."""
+    with stage('load_model', model=f"{strategy}:{model_name}") as record:
+        record.set(cacheHit=(strategy, model_name) in MODEL_REGISTRY)
+        return MODEL_REGISTRY.get(strategy, model_name)
+
+def parse_preload(value: str) -> list:
+    """Parse a comma separated hot set like ``"5:voting_ensemble,25:xgboost"``."""
+    keys = []
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        strategy, _, model_name = item.partition(':')
+        keys.append((strategy, model_name or 'voting_ensemble'))
+    return keys
 
-def fetch_data(symbol_mapping: dict, interval: str) -> tuple[pd.DataFrame, dict]:
-    """Fetch data for all required symbols using yfinance."""
+def download_daily_history(yahoo_symbols: list, interval: str = None, start: pd.Timestamp = None) -> dict:
+    """Download daily OHLCV bars for several Yahoo symbols in one batched request.
+
+    Either ``interval`` (a Yahoo period such as ``5y``) or ``start`` selects the range.
+    """
+    range_kwargs = {'start': start.strftime('%Y-%m-%d')} if start is not None else {'period': interval}
+    data = yahoo().download(
+        yahoo_symbols,
+        **range_kwargs,
+        interval='1d',
+        group_by='ticker',
+        auto_adjust=True,
+        actions=False,
+        threads=min(FETCH_MAX_WORKERS, len(yahoo_symbols)),
+        progress=False
+    )
+    
+    history = {}
+    for yahoo_symbol in yahoo_symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if yahoo_symbol not in data.columns.get_level_values(0):
+                history[yahoo_symbol] = pd.DataFrame()
+                continue
+            frame = data[yahoo_symbol]
+        else:
+            frame = data
+        # Rows where only the other tickers traded come back as all-NaN
+        history[yahoo_symbol] = frame[['Open', 'High', 'Low', 'Close', 'Volume']].dropna(how='all')
+    return history
+
+def process_daily_history(daily_data: pd.DataFrame, multiplier: float = 1) -> pd.DataFrame:
+    """Normalize a raw daily download to a UTC index and apply the price multiplier and rounding."""
+    daily_data = daily_data.copy()
+    
+    # Ensure indexes are timezone-aware and in UTC
+    if daily_data.index.tz is None:
+        daily_data.index = daily_data.index.tz_localize('UTC')
+    else:
+        daily_data.index = daily_data.index.tz_convert('UTC')
+    
+    # Apply multiplier if needed
+    if multiplier != 1:
+        daily_data[['Open', 'High', 'Low', 'Close']] = (daily_data[['Open', 'High', 'Low', 'Close']] * multiplier).round(3)
+    else:
+        daily_data[['Open', 'High', 'Low', 'Close']] = daily_data[['Open', 'High', 'Low', 'Close']].round(3)
+    return daily_data
+
+def period_start(interval: str, now: pd.Timestamp = None):
+    """First timestamp covered by a Yahoo period, or None for the full history."""
+    now = now if now is not None else pd.Timestamp.now(tz='UTC')
+    if interval == 'max':
+        return None
+    if interval == 'ytd':
+        return now.normalize().replace(month=1, day=1)
+    if interval.endswith('mo'):
+        return now.normalize() - pd.DateOffset(months=int(interval[:-2]))
+    if interval.endswith('y'):
+        return now.normalize() - pd.DateOffset(years=int(interval[:-1]))
+    return now.normalize() - pd.DateOffset(days=int(interval[:-1]))
+
+def market_cache_key(yahoo_symbol: str, multiplier: float) -> str:
+    return yahoo_symbol if multiplier == 1 else f"{yahoo_symbol}_x{multiplier}"
+
+def same_adjustment(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """Whether re-downloaded bars share the split and dividend adjustment of the cached ones.
+
+    Closes are compared on the settled bars both frames cover, which excludes the last
+    cached bar as it may have been captured mid-session.
+    """
+    overlap = fresh.index.intersection(cached.index[:-1])
+    if overlap.empty:
+        return False
+    return np.allclose(fresh.loc[overlap, 'Close'].to_numpy(), cached.loc[overlap, 'Close'].to_numpy(), rtol=ADJUSTMENT_TOLERANCE, atol=1e-3)
+
+def load_daily_history(symbols: list, interval: str) -> dict:
+    """Return processed daily bars for ``(yahoo_symbol, multiplier)`` pairs, keyed by pair.
+
+    Bars come from MARKET_CACHE where possible. Symbols whose cached history is
+    older than the cache TTL are topped up from their last cached bars, symbols that
+    are missing or cached over a shorter period are downloaded in full, and both
+    groups go out as one batched request each. A top-up whose overlapping bars no
+    longer match the cache (a split or dividend re-adjusted the history) replaces
+    the whole cached range instead of being spliced on. Per-symbol file locks are
+    held for the whole cycle so concurrent workers share a single refresh.
+    """
+    start = period_start(interval)
+    keys = {pair: market_cache_key(*pair) for pair in symbols}
+    history = {}
+    
+    with ExitStack() as stack:
+        record = stack.enter_context(stage('market_cache', symbols=len(keys)))
+        for key in sorted(set(keys.values())):
+            stack.enter_context(MARKET_CACHE.lock(key))
+        
+        full_refresh, top_up = [], []
+        for pair, key in keys.items():
+            entry = MARKET_CACHE.load(key)
+            if entry is None or entry.frame.empty or not MARKET_CACHE.covers(entry, start):
+                full_refresh.append(pair)
+            elif MARKET_CACHE.is_fresh(entry):
+                history[pair] = entry.frame
+            else:
+                top_up.append((pair, entry))
+        
+        if full_refresh:
+            downloaded = download_daily_history(list(dict.fromkeys(y for y, _ in full_refresh)), interval=interval)
+            for yahoo_symbol, multiplier in full_refresh:
+                raw = downloaded[yahoo_symbol]
+                history[(yahoo_symbol, multiplier)] = process_daily_history(raw, multiplier) if not raw.empty else raw
+                if not raw.empty:
+                    MARKET_CACHE.store(keys[(yahoo_symbol, multiplier)], history[(yahoo_symbol, multiplier)], start)
+        
+        readjusted = []
+        if top_up:
+            # Re-fetch the last cached bar, which may have been captured mid-session, and the
+            # settled bar before it, which must still match for the new bars to be spliced on
+            since = min(entry.frame.index[max(len(entry.frame) - 2, 0)] for _, entry in top_up)
+            downloaded = download_daily_history(list(dict.fromkeys(y for (y, _), _ in top_up)), start=since)
+            for (yahoo_symbol, multiplier), entry in top_up:
+                raw = downloaded[yahoo_symbol]
+                frame = entry.frame
+                if not raw.empty:
+                    fresh = process_daily_history(raw, multiplier)
+                    if not same_adjustment(frame, fresh):
+                        readjusted.append(((yahoo_symbol, multiplier), entry))
+                        continue
+                    frame = pd.concat([frame.iloc[:frame.index.searchsorted(fresh.index[0])], fresh])
+                history[(yahoo_symbol, multiplier)] = frame
+                MARKET_CACHE.store(keys[(yahoo_symbol, multiplier)], frame, entry.coverage_start)
+        
+        if readjusted:
+            # One range that covers every re-adjusted entry, so each keeps its coverage
+            starts = [entry.coverage_start for _, entry in readjusted]
+            coverage_start = None if None in starts else min(starts)
+            downloaded = download_daily_history(
+                list(dict.fromkeys(y for (y, _), _ in readjusted)),
+                interval='max' if coverage_start is None else None,
+                start=coverage_start
+            )
+            for (yahoo_symbol, multiplier), entry in readjusted:
+                raw = downloaded[yahoo_symbol]
+                frame = process_daily_history(raw, multiplier) if not raw.empty else entry.frame
+                history[(yahoo_symbol, multiplier)] = frame
+                if not raw.empty:
+                    MARKET_CACHE.store(keys[(yahoo_symbol, multiplier)], frame, coverage_start)
+    
+        record.set(cacheHits=len(keys) - len(full_refresh) - len(top_up), topUps=len(top_up) - len(readjusted),
+                   downloads=len(full_refresh), readjusted=len(readjusted))
+    
+    if start is not None:
+        # Positional slices keep memory-mapped cache entries as views
+        history = {pair: frame.iloc[frame.index.searchsorted(start):] for pair, frame in history.items()}
+    return history
+
+# How each daily field rolls up into a weekly bar
+WEEKLY_AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+def resample_weekly(daily_data: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate daily OHLCV bars into Monday-labelled weekly bars like Yahoo's 1wk interval."""
+    weekly_data = daily_data.resample('W-MON', label='left', closed='left').agg(WEEKLY_AGGREGATIONS)
+    return weekly_data.dropna(subset=['Close'])
+
+def fetch_ticker_info(yahoo_symbol: str) -> dict:
+    """Fetch the quote summary used to build market stats, reused for TICKER_INFO_TTL_SECONDS."""
+    # Concurrent requests for the same symbol share one lookup
+    info = TICKER_INFO_CACHE.get_or_compute(yahoo_symbol, lambda: json.dumps(yahoo().Ticker(yahoo_symbol).info, default=str))
+    return json.loads(info)
+
+def build_market_stats(info: dict, symbol: str, closes: pd.Series) -> dict:
+    """Build the market stats block shown next to the chart."""
+    # Get market status
+    market_hours = info.get('regularMarketTime', '')
+    try:
+        market_time = pd.Timestamp(market_hours, unit='s', tz='America/New_York')
+        market_time_str = market_time.strftime('%B %d, %I:%M %p EST')
+    except:
+        market_time_str = ''
+    
+    # Get price changes
+    current_price = closes.iloc[-1] if not closes.empty else info.get('regularMarketPrice', 0)
+    previous_close = info.get('regularMarketPreviousClose', 0)
+    price_change = current_price - previous_close
+    price_change_percent = (price_change / previous_close * 100) if previous_close else 0
+    
+    return {
+        'marketCap': info.get('marketCap'),
+        'peRatio': info.get('trailingPE'),
+        'divYield': info.get('dividendYield'),
+        'week52High': info.get('fiftyTwoWeekHigh'),
+        'week52Low': info.get('fiftyTwoWeekLow'),
+        'longName': info.get('longName', symbol),
+        'shortName': info.get('shortName', symbol),
+        'currency': info.get('currency', 'USD'),
+        'marketState': info.get('marketState', 'CLOSED'),
+        'marketTime': market_time_str,
+        'priceChange': price_change,
+        'priceChangePercent': price_change_percent,
+        'currentPrice': current_price,
+        'previousClose': previous_close,
+    }
+
+@timed('fetch_data', lambda result: {'dailyRows': len(result[0]), 'weeklyRows': len(result[1])})
+def fetch_data(symbol_mapping: dict, interval: str, with_market_stats: bool = True) -> tuple[pd.DataFrame, dict]:
+    """Fetch data for all required symbols using yfinance.
+
+    Daily bars for every symbol come from the on-disk market cache, topped up with
+    batched downloads (see load_daily_history), weekly bars are resampled from them
+    locally, and the quote info for the main symbol (the first one) is fetched
+    concurrently with the download unless ``with_market_stats`` is false.
+    """
     if interval not in VALID_INTERVALS:
         raise ValueError(f"Invalid interval: {interval}. Must be one of {VALID_INTERVALS}")
 
@@ -103,36 +447,25 @@ def fetch_data(symbol_mapping: dict, interval: str) -> tuple[pd.DataFrame, dict]
     all_data_weekly = {}
     market_stats = {}
     
+    # Map the symbols to their Yahoo Finance equivalents if they exist
+    yahoo_symbols = {feature: YAHOO_SYMBOL_MAP.get(symbol, symbol) for feature, symbol in symbol_mapping.items()}
+    multipliers = {feature: MULTIPLIER_MAPPING.get(symbol, 1) for feature, symbol in symbol_mapping.items()}
+    main_feature = next(iter(symbol_mapping), None)
+    
+    debug(f"Fetching data for symbols: {', '.join(f'{symbol} (Yahoo: {yahoo_symbols[feature]})' for feature, symbol in symbol_mapping.items())}")
+    info_future = FETCH_EXECUTOR.submit(fetch_ticker_info, yahoo_symbols[main_feature]) if with_market_stats and main_feature is not None else None
+    pairs = list(dict.fromkeys((yahoo_symbols[feature], multipliers[feature]) for feature in symbol_mapping))
+    history = load_daily_history(pairs, interval) if pairs else {}
+    
     for feature, symbol in symbol_mapping.items():
+        yahoo_symbol = yahoo_symbols[feature]
         try:
-            # Map the symbol to its Yahoo Finance equivalent if it exists
-            yahoo_symbol = YAHOO_SYMBOL_MAP.get(symbol, symbol)
-            print(f"Fetching data for symbol: {symbol} (Yahoo: {yahoo_symbol})")
-            
-            ticker = yf.Ticker(yahoo_symbol)
+            daily_data = history[(yahoo_symbol, multipliers[feature])]
             
-            # Get both daily and weekly data
-            daily_data = ticker.history(period=interval, interval='1d')
-            weekly_data = ticker.history(period=interval, interval='1wk')
-            
-            if daily_data.empty or weekly_data.empty:
+            if daily_data.empty:
                 raise ValueError(f"No data returned for symbol ({symbol}). Please check if the symbol is correct.")
             
-            # Ensure indexes are timezone-aware and in UTC
-            for data in [daily_data, weekly_data]:
-                if data.index.tz is None:
-                    data.index = data.index.tz_localize('UTC')
-                else:
-                    data.index = data.index.tz_convert('UTC')
-            
-            # Apply multiplier if needed
-            multiplier = MULTIPLIER_MAPPING.get(symbol, 1)
-            if multiplier != 1:
-                daily_data[['Open', 'High', 'Low', 'Close']] = (daily_data[['Open', 'High', 'Low', 'Close']] * multiplier).round(3)
-                weekly_data[['Open', 'High', 'Low', 'Close']] = (weekly_data[['Open', 'High', 'Low', 'Close']] * multiplier).round(3)
-            else:
-                daily_data[['Open', 'High', 'Low', 'Close']] = daily_data[['Open', 'High', 'Low', 'Close']].round(3)
-                weekly_data[['Open', 'High', 'Low', 'Close']] = weekly_data[['Open', 'High', 'Low', 'Close']].round(3)
+            weekly_data = resample_weekly(daily_data)
             
             # Store OHLCV data for all symbols (both daily and weekly)
             # Daily data for display
@@ -150,44 +483,13 @@ def fetch_data(symbol_mapping: dict, interval: str) -> tuple[pd.DataFrame, dict]
             all_data_weekly[f"{feature}_Volume"] = weekly_data['Volume']
             
             # Get market stats for the main symbol (usually the first one)
-            if feature == list(symbol_mapping.keys())[0]:
-                info = ticker.info
-                
-                # Get market status
-                market_hours = info.get('regularMarketTime', '')
-                try:
-                    market_time = pd.Timestamp(market_hours, unit='s', tz='America/New_York')
-                    market_time_str = market_time.strftime('%B %d, %I:%M %p EST')
-                except:
-                    market_time_str = ''
-                
-                # Get price changes
-                current_price = daily_data['Close'].iloc[-1] if not daily_data.empty else info.get('regularMarketPrice', 0)
-                previous_close = info.get('regularMarketPreviousClose', 0)
-                price_change = current_price - previous_close
-                price_change_percent = (price_change / previous_close * 100) if previous_close else 0
-                
-                market_stats = {
-                    'marketCap': info.get('marketCap'),
-                    'peRatio': info.get('trailingPE'),
-                    'divYield': info.get('dividendYield'),
-                    'week52High': info.get('fiftyTwoWeekHigh'),
-                    'week52Low': info.get('fiftyTwoWeekLow'),
-                    'longName': info.get('longName', symbol),
-                    'shortName': info.get('shortName', symbol),
-                    'currency': info.get('currency', 'USD'),
-                    'marketState': info.get('marketState', 'CLOSED'),
-                    'marketTime': market_time_str,
-                    'priceChange': price_change,
-                    'priceChangePercent': price_change_percent,
-                    'currentPrice': current_price,
-                    'previousClose': previous_close,
-                }
+            if info_future is not None and feature == main_feature:
+                market_stats = build_market_stats(info_future.result(), symbol, daily_data['Close'])
                 
-            print(f"Successfully fetched {len(daily_data)} daily points and {len(weekly_data)} weekly points for {symbol}")
+            debug(f"Successfully fetched {len(daily_data)} daily points and {len(weekly_data)} weekly points for {symbol}")
             
         except Exception as e:
-            print(f"Error fetching data for {symbol} (Yahoo: {yahoo_symbol}): {str(e)}")
+            print(f"Error fetching data for {symbol} (Yahoo: {yahoo_symbol}): {str(e)}", file=sys.stderr)
             raise
 
     df_daily = pd.DataFrame(all_data)
@@ -199,350 +501,897 @@ def fetch_data(symbol_mapping: dict, interval: str) -> tuple[pd.DataFrame, dict]
     df_daily = df_daily.ffill().bfill()
     df_weekly = df_weekly.ffill().bfill()
     
-    print(f"Final daily dataset shape: {df_daily.shape}")
-    print(f"Final weekly dataset shape: {df_weekly.shape}")
+    debug(f"Final daily dataset shape: {df_daily.shape}")
+    debug(f"Final weekly dataset shape: {df_weekly.shape}")
     
     return df_daily, df_weekly, market_stats
 
-def calculate_momentum_features(data: pd.DataFrame, periods=[7, 14, 21]) -> pd.DataFrame:
-    """Calculate momentum and mean reversion features for given data."""
-    features = pd.DataFrame(index=data.index)
-    
-    required_features = ['MXUS', 'XAU BGNL', 'DXY', 'Cl1', 'BDIY']
-    
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
-            
-        prices = data[f"{feature}_Close"]
-        
-        features[feature] = prices.round(3)
-        
-        for period in periods:
+def fill_gaps(block: np.ndarray) -> np.ndarray:
+    """Forward fill, then back fill, the NaNs of every column of a 2D block in place."""
+    rows = np.arange(len(block))[:, None]
+    valid = ~np.isnan(block)
+    last_valid = np.where(valid, rows, 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    np.copyto(block, np.take_along_axis(block, last_valid, axis=0))
+    # Only leading gaps are left; they take each column's first value
+    first_valid = valid.argmax(axis=0)
+    for column, first in enumerate(first_valid):
+        block[:first, column] = block[first, column]
+    return block
 
-            mom = (prices / prices.shift(period) - 1).round(3)
-            features[f"{feature}_mom_{period}d"] = mom
-            
-            ma = prices.rolling(window=period).mean()
-            mean_rev = ((prices - ma) / ma).round(3)
-            features[f"{feature}_mean_rev_{period}d"] = mean_rev
-    
-    features = features.fillna(0)
-    
-    expected_features = len(required_features) * (1 + 2 * len(periods))  # base features + (momentum + mean_rev) * periods
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
-    
-    return features
+@timed('fetch_weekly', lambda frame: {'weeklyRows': len(frame), 'columns': frame.shape[1]})
+def fetch_weekly_columns(symbol_mapping: dict, interval: str, fields: tuple = FEATURE_FIELDS) -> pd.DataFrame:
+    """Weekly bars of only the given fields for every symbol, as ``<feature>_<field>`` columns.
 
-def calculate_volatility_regime_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate volatility regime features for strategy 13."""
-    features = pd.DataFrame(index=data.index)
-    
-    vol_cols = ['VIX', 'MXUS', 'MXEU', 'MXJP', 'DXY', 'XAU BGNL']
+    Daily bars come from the market cache like fetch_data, but only ``fields`` (and
+    Close, which decides the weeks a symbol has) are copied into one float64 block
+    and resampled together. The weekly rows match fetch_data's weekly frame: a
+    week exists when any symbol traded in it, and gaps are filled in place.
+    """
+    if interval not in VALID_INTERVALS:
+        raise ValueError(f"Invalid interval: {interval}. Must be one of {VALID_INTERVALS}")
+    if not symbol_mapping:
+        raise ValueError("No data available for the specified symbols")
     
-    for col in vol_cols:
-        if f"{col}_Close" not in data.columns:
-            raise ValueError(f"Required feature {col} not found in data")
-            
-        prices = data[f"{col}_Close"]
-        features[col] = prices.round(3)
-        
-        features[f'{col}_vol_regime'] = (
-            prices.rolling(21).std() / prices.rolling(63).std()
-        ).round(3)
-        
-        features[f'{col}_trend'] = (
-            prices.rolling(7).mean() / prices.rolling(21).mean()
-        ).round(3)
+    fields = list(dict.fromkeys([*fields, 'Close']))
+    pairs = {feature: (YAHOO_SYMBOL_MAP.get(symbol, symbol), MULTIPLIER_MAPPING.get(symbol, 1)) for feature, symbol in symbol_mapping.items()}
+    history = load_daily_history(list(dict.fromkeys(pairs.values())), interval)
+    for feature, symbol in symbol_mapping.items():
+        if history[pairs[feature]].empty:
+            print(f"Error fetching data for {symbol} (Yahoo: {pairs[feature][0]}): No data returned for symbol ({symbol}). Please check if the symbol is correct.", file=sys.stderr)
+            raise ValueError(f"No data returned for symbol ({symbol}). Please check if the symbol is correct.")
     
-    features = features.fillna(0)
+    daily_index = functools.reduce(lambda a, b: a.union(b), (history[pair].index for pair in dict.fromkeys(pairs.values())))
+    columns = [f"{feature}_{field}" for feature in symbol_mapping for field in fields]
+    daily = np.full((len(daily_index), len(columns)), np.nan)
+    for i, feature in enumerate(symbol_mapping):
+        daily_data = history[pairs[feature]]
+        daily[daily_index.get_indexer(daily_data.index), i * len(fields):(i + 1) * len(fields)] = daily_data[fields].to_numpy(dtype=np.float64)
     
-    expected_features = len(vol_cols) * 3  # base features + vol_regime + trend
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    # One resample for every symbol, so pandas builds the weekly bins once
+    weekly = pd.DataFrame(daily, index=daily_index, columns=columns, copy=False).resample('W-MON', label='left', closed='left')
+    if all(WEEKLY_AGGREGATIONS[field] == 'last' for field in fields):
+        weekly = weekly.last()
+    else:
+        weekly = weekly.agg({column: WEEKLY_AGGREGATIONS[column.rsplit('_', 1)[1]] for column in columns})
     
-    return features
+    block = weekly.to_numpy(dtype=np.float64)
+    traded = ~np.isnan(block[:, fields.index('Close')::len(fields)])
+    keep = traded.any(axis=1)
+    block, traded = block[keep], traded[keep]
+    for i in range(len(symbol_mapping)):
+        # A symbol's other fields only count in weeks it has a close, like resample_weekly
+        block[~traded[:, i], i * len(fields):(i + 1) * len(fields)] = np.nan
+    return pd.DataFrame(fill_gaps(block), index=weekly.index[keep], columns=columns, copy=False)
 
-def calculate_equities_vs_commodities_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate cross-asset correlation features for equities vs commodities (strategy 5)."""
-    features = pd.DataFrame(index=data.index)
-    
-    required_features = ['MXUS', 'XAU BGNL', 'Cl1']
-    
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
-            
-        prices = data[f"{feature}_Close"]
-        features[feature] = prices.round(3)
-    
-    features['MXUS_XAU_CORR'] = (features['MXUS'] * features['XAU BGNL']).round(3)
-    features['MXUS_CL1_CORR'] = (features['MXUS'] * features['Cl1']).round(3)
-    
-    features = features.fillna(0)
-    
-    expected_features = len(required_features) + 2  # base features + correlation features
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
-    
-    return features
+def get_symbol_news(symbol):
+    ticker = yahoo().Search(symbol, news_count=10)
+    return ticker.news
 
-def calculate_volatility_vs_equities_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate cross-asset correlation features for volatility vs equities (strategy 7)."""
-    features = pd.DataFrame(index=data.index)
-    
-    required_features = ['MXUS', 'VIX']
-    
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
-            
-        prices = data[f"{feature}_Close"]
-        features[feature] = prices.round(3)
-    
-    features['MXUS_VIX_CORR'] = (features['MXUS'] * features['VIX']).round(3)
-    features['MXUS_VIX_RATIO'] = (features['MXUS'] / features['VIX']).round(3)
-    
-    features = features.fillna(0)
+@timed('align', lambda result: {'rows': len(result[0])})
+def align_weekly_to_daily(weekly_index: pd.DatetimeIndex, daily_index: pd.DatetimeIndex,
+                          predictions: np.ndarray, probabilities: np.ndarray,
+                          mode: str = 'exact') -> tuple[np.ndarray, np.ndarray]:
+    """Map weekly predictions onto daily bars.
+
+    In ``exact`` mode only the daily bar dated on each weekly bar gets that week's
+    prediction and every other day stays zero. In ``asof`` mode every daily bar
+    carries the most recent weekly prediction at or before it.
+    """
+    if mode not in ALIGNMENT_MODES:
+        raise ValueError(f"Invalid alignment: {mode}. Must be one of {ALIGNMENT_MODES}")
     
-    expected_features = len(required_features) + 2  # base features + correlation features
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    daily_predictions = np.zeros(len(daily_index))
+    daily_probabilities = np.zeros((len(daily_index), 2))
+    if len(weekly_index) == 0:
+        return daily_predictions, daily_probabilities
     
-    return features
+    if mode == 'asof':
+        positions = weekly_index.searchsorted(daily_index, side='right') - 1
+    else:
+        positions = weekly_index.get_indexer(daily_index)
+    matched = positions >= 0
+    daily_predictions[matched] = np.asarray(predictions)[positions[matched]]
+    daily_probabilities[matched] = np.asarray(probabilities)[positions[matched]]
+    return daily_predictions, daily_probabilities
 
-def calculate_vix_momentum_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate VIX momentum and extreme value features for strategy 17."""
-    features = pd.DataFrame(index=data.index)
+@timed('downsample', lambda result: {'points': len(result[0])})
+def downsample_bars(primary_data: pd.DataFrame, predictions: np.ndarray, probabilities: np.ndarray,
+                    max_points: int) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Merge consecutive daily bars into at most ``max_points`` OHLCV buckets.
+
+    Each bucket is dated on its first bar and keeps that bar's open, the highest
+    high, the lowest low, the last close and the summed volume. Its prediction
+    and probabilities come from its most anomalous bar: the anomalous bar with
+    the highest anomaly probability, or the most probable bar when none is.
+    Runs of anomalous bars get buckets of their own, so every anomaly survives
+    (an isolated one as its own point), and the evenly spaced buckets shrink to
+    make room for them. When there are too many runs to separate, the runs with
+    the shortest gaps between them share a bucket, so anomalous buckets may
+    absorb the normal bars between close runs but the result never has more
+    than ``max_points`` rows.
+    """
+    if max_points is not None and max_points < 1:
+        raise ValueError(f"Invalid max points: {max_points}. Must be at least 1")
+    rows = len(primary_data)
+    if max_points is None or rows <= max_points:
+        return primary_data, predictions, probabilities
     
-    if 'VIX_Close' not in data.columns:
-        raise ValueError("Required feature VIX not found in data")
-            
-    vix = data['VIX_Close']
-    features['VIX'] = vix.round(3)
+    # Every run of consecutive anomalous bars starts and ends a bucket, as (start, end) pairs
+    flagged = np.concatenate([[False], predictions == 1, [False]])
+    edges = np.flatnonzero(flagged[1:] != flagged[:-1])
+    # Edges inside the series each add a bucket to the evenly spaced ones, which always start at 0
+    runs = (max_points - 1) // 2
+    if np.count_nonzero((edges > 0) & (edges < rows)) > max_points - 1:
+        # Keep only the widest gaps between runs, merging the runs on either side of the others
+        run_starts, run_ends = edges[0::2], edges[1::2]
+        kept_gaps = np.sort(np.argsort(run_ends[:-1] - run_starts[1:], kind='stable')[:runs - 1]) if runs > 1 else np.empty(0, dtype=np.intp)
+        edges = np.column_stack([
+            run_starts[np.concatenate([[0], kept_gaps + 1])],
+            run_ends[np.append(kept_gaps, len(run_ends) - 1)],
+        ]).ravel() if runs else np.empty(0, dtype=np.intp)
+    buckets = max_points - np.count_nonzero((edges > 0) & (edges < rows))
+    starts = np.unique(np.concatenate([
+        np.linspace(0, rows, buckets, endpoint=False).astype(np.intp),
+        edges[edges < rows],
+    ]))
+    ends = np.append(starts[1:], rows)
     
-    features['VIX_7D_Change'] = vix.pct_change(7).round(3)
-    features['VIX_7D_High'] = vix.rolling(7).max().round(3)
-    features['VIX_7D_StdDev'] = vix.rolling(7).std().round(3)
+    # Representative bar per bucket: the first anomalous one with the bucket's highest anomaly
+    # probability, ranking anomalous bars above normal ones for buckets holding merged runs
+    rank = probabilities[:, 1] + 2.0 * (predictions == 1)
+    highest = np.maximum.reduceat(rank, starts)
+    bucket_of = np.repeat(np.arange(len(starts)), ends - starts)
+    hits = np.flatnonzero(rank == highest[bucket_of])
+    representative = hits[np.searchsorted(bucket_of[hits], np.arange(len(starts)))]
     
-    features = features.fillna(0)
+    downsampled = pd.DataFrame({
+        'symbol_Open': primary_data['symbol_Open'].to_numpy()[starts],
+        'symbol_High': np.maximum.reduceat(primary_data['symbol_High'].to_numpy(), starts),
+        'symbol_Low': np.minimum.reduceat(primary_data['symbol_Low'].to_numpy(), starts),
+        'symbol_Close': primary_data['symbol_Close'].to_numpy()[ends - 1],
+        'symbol_Volume': np.add.reduceat(primary_data['symbol_Volume'].to_numpy(), starts),
+    }, index=primary_data.index[starts])
+    return downsampled, predictions[representative], probabilities[representative]
+
+@timed('features', lambda matrix: {'rows': matrix.shape[0], 'features': matrix.shape[1]})
+def build_feature_matrix(strategy: str, base_data_weekly: pd.DataFrame, base_features: list, graph: FeatureGraph = None) -> np.ndarray:
+    """Build the weekly feature matrix a strategy's models expect.
+
+    Strategies with a feature definition are computed from the registry, sharing
+    intermediates through ``graph`` when one is passed; for the rest, just use Close prices.
+    """
+    compiled_strategy = compile_strategy(strategy)
+    if compiled_strategy is not None:
+        return compiled_strategy.evaluate(graph if graph is not None else FeatureGraph(base_data_weekly))
+    return np.column_stack([
+        base_data_weekly[f"{feature}_Close"].round(3).to_numpy() for feature in base_features
+    ])
+
+def strategy_base_features(strategy: str) -> list:
+    """Base features a strategy reads, as named in prepared_data/strategies.json."""
+    compiled_strategy = compile_strategy(strategy)
+    if compiled_strategy is not None:
+        return compiled_strategy.symbols
+    return load_strategies()[str(strategy)]['features']['base']
+
+@timed('scaling')
+def scale_features(strategy: str, feature_data: np.ndarray) -> np.ndarray:
+    """Standardize a feature matrix in place with the strategy's training-time scaler."""
+    scaler = MODEL_REGISTRY.get(strategy, SCALER_NAME)
+    if scaler is None:
+        # Statistics fitted on the request window would make scores depend on the interval
+        reason = missing_scaler_reason(STRATEGY_FOLDERS[str(strategy)])
+        print(f"No training-time scaler for strategy {strategy}: {reason}", file=sys.stderr)
+        raise ValueError(f"Strategy {strategy} cannot be scored: no training-time scaler ({reason})")
+    return scaler.transform(feature_data)
+
+@timed('predict', lambda result: {'rows': len(result[0])})
+def predict_with_probabilities(model: Scorer, scaled_data: np.ndarray, shared: dict = None) -> tuple[np.ndarray, np.ndarray]:
+    """Return predicted labels (1 for an anomaly) and [normal, anomaly] probabilities for every row."""
+    return model.score(scaled_data, shared)
+
+def score_index_entry(strategy: str, model_name: str, base_features_mapping: dict) -> tuple[str, str]:
+    """Score index key and fingerprint of one model scoring one set of base symbols.
+
+    The fingerprint changes with the model and scaler artifacts, the training data
+    outlier scores are calibrated on and the feature definition, which rebuilds the entry.
+    """
+    symbols = {
+        feature: market_cache_key(YAHOO_SYMBOL_MAP.get(symbol, symbol), MULTIPLIER_MAPPING.get(symbol, 1))
+        for feature, symbol in base_features_mapping.items()
+    }
+    symbols_digest = hashlib.sha256(json.dumps(symbols, sort_keys=True).encode('utf-8')).hexdigest()[:16]
     
-    expected_features = 4  # VIX + 7D_Change + 7D_High + 7D_StdDev
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    model_path = model_artifact_path(strategy, model_name)
+    folder = STRATEGY_FOLDERS[str(strategy)]
+    artifacts = [
+        compact_path(model_path) if model_name in EXPORTABLE_MODELS else model_path,
+        scaler_path(folder),
+        os.path.join(PREPARED_DATA_DIR, folder, 'X_train.npy'),
+    ]
+    compiled_strategy = compile_strategy(strategy)
+    inputs = {
+        'artifacts': [[os.path.relpath(path, SCRIPT_DIR), stat.st_size, stat.st_mtime_ns] for path, stat in
+                      ((path, os.stat(path)) for path in artifacts if os.path.exists(path))],
+        'features': repr(compiled_strategy.nodes) if compiled_strategy is not None else list(base_features_mapping),
+    }
+    fingerprint = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"{strategy}-{model_name}-{symbols_digest}", fingerprint
+
+def score_weeks(strategy: str, model: Scorer, base_data_weekly: pd.DataFrame, base_features: list, start: int) -> IndexedScores:
+    """Features, labels and probabilities of the weekly rows from ``start`` on.
+
+    Features are computed over just enough earlier rows to reproduce them exactly.
+    """
+    compiled_strategy = compile_strategy(strategy)
+    first = max(start - (compiled_strategy.lookback() if compiled_strategy is not None else 0), 0)
+    features = build_feature_matrix(strategy, base_data_weekly.iloc[first:], base_features)[start - first:]
+    predictions, probabilities = predict_with_probabilities(model, scale_features(strategy, features.copy()))
+    return IndexedScores(base_data_weekly.index[start:].as_unit('ns').asi8, features, predictions, probabilities)
+
+def indexed_predictions(strategy: str, model_name: str, base_features_mapping: dict, model: Scorer,
+                        base_data_weekly: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Weekly labels and probabilities for a full history, reading settled weeks from SCORE_INDEX.
+
+    Only the last SCORE_INDEX_VERIFY_WEEKS stored weeks and the weeks after them are
+    scored. Stored rows from the first one that no longer matches are replaced, and
+    every closed week is appended; the current, still forming week is never stored.
+    """
+    base_features = list(base_features_mapping.keys())
+    key, fingerprint = score_index_entry(strategy, model_name, base_features_mapping)
+    timestamps = base_data_weekly.index.as_unit('ns').asi8
     
-    return features
+    with stage('score_index') as record, SCORE_INDEX.lock(key):
+        # Only the requested weeks are read; stored weeks past the fetched history are replaced below
+        stored = SCORE_INDEX.query(key, fingerprint, int(timestamps[0]), int(timestamps[-1])) if len(timestamps) else None
+        verify_from = 0
+        if stored is not None and len(stored) and stored.timestamps[0] == timestamps[0]:
+            verify_from = max(len(stored) - SCORE_INDEX_VERIFY_WEEKS, 0)
+            # Weeks before the check line up when both histories reach the same week at the same row
+            if int(np.searchsorted(timestamps, stored.timestamps[verify_from])) != verify_from:
+                verify_from = 0
+        fresh = score_weeks(strategy, model, base_data_weekly, base_features, verify_from)
+        
+        keep = verify_from
+        if verify_from:
+            overlap = len(stored) - verify_from
+            matches = (stored.timestamps[verify_from:] == fresh.timestamps[:overlap]) & \
+                      (stored.features[verify_from:] == fresh.features[:overlap]).all(axis=1)
+            keep += overlap if matches.all() else int(np.argmin(matches))
+        
+        predictions = np.concatenate([stored.predictions[:keep], fresh.predictions[keep - verify_from:]]) if keep else fresh.predictions
+        probabilities = np.concatenate([stored.probabilities[:keep], fresh.probabilities[keep - verify_from:]]) if keep else fresh.probabilities
+        
+        closed = len(timestamps) - 1
+        stored_rows = len(stored) if verify_from else 0
+        if closed > keep or keep < stored_rows:
+            SCORE_INDEX.extend(key, fingerprint, keep, fresh.slice(keep - verify_from, max(closed, keep) - verify_from))
+        record.set(storedWeeks=keep, scoredWeeks=len(fresh))
+    return predictions, probabilities
+
+def score_models(strategy: str, model_names: list, scaled_data: np.ndarray) -> dict:
+    """Load and score several models on one scaled feature matrix; runs inside the scoring process pool.
+
+    Returns ``(predictions, probabilities)`` or an error message per model name.
+    Models share their scores, so a voting ensemble requested alongside its
+    members evaluates each constituent once.
+    """
+    shared, scores = {}, {}
+    for model_name in model_names:
+        try:
+            scores[model_name] = predict_with_probabilities(load_model(strategy, model_name), scaled_data, shared)
+        except Exception as e:
+            scores[model_name] = str(e)
+    return scores
+
+def get_scoring_pool() -> ProcessPoolExecutor:
+    """Process pool shared by batch requests, so its processes keep their models cached."""
+    global SCORING_POOL
+    with SCORING_POOL_LOCK:
+        if SCORING_POOL is None:
+            SCORING_POOL = ProcessPoolExecutor(max_workers=SCORING_PROCESSES)
+        return SCORING_POOL
+
+def add_instrumentation_arguments(parser: argparse.ArgumentParser):
+    """Per-request instrumentation options shared by every request parser."""
+    parser.add_argument('--timings', action='store_true', help='Add a timings block with per-stage wall time, rows and cache hits to the result')
+    parser.add_argument('--profile-slow-ms', type=float, default=None, help='Run the request and its pipeline stages under cProfile and keep the merged dump when it takes longer than this many milliseconds')
+
+def run_instrumented(name: str, handler, args: argparse.Namespace, *handler_args) -> dict:
+    """Run a request handler while recording its stages, attaching them as ``timings`` if asked."""
+    with instrumented_request(name, args.profile_slow_ms, METRICS_FILE) as recorder:
+        result = handler(args, *handler_args)
+    if args.timings:
+        result['timings'] = recorder.timings
+    return result
+
+def primary_frame_columns(primary_data: pd.DataFrame) -> dict:
+    """Timestamps and OHLCV of the primary symbol as binary frame columns."""
+    return {
+        'timestamp': ('int64', primary_data.index.as_unit('ms').asi8),
+        'open': ('float64', primary_data['symbol_Open'].to_numpy()),
+        'high': ('float64', primary_data['symbol_High'].to_numpy()),
+        'low': ('float64', primary_data['symbol_Low'].to_numpy()),
+        'close': ('float64', primary_data['symbol_Close'].to_numpy()),
+        'volume': ('float64', primary_data['symbol_Volume'].to_numpy()),
+    }
+
+def build_parser(parser_class=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Build the argument parser shared by the CLI and the worker request handler."""
+    parser = parser_class(description='Run anomaly detection predictions')
+    parser.add_argument('--strategy', required=True, help='Strategy ID to use')
+    parser.add_argument('--symbol-mapping', required=True, type=json.loads, help='JSON mapping of features to symbols')
+    parser.add_argument('--interval', required=True, help=f'Time interval for data. Must be one of {VALID_INTERVALS}')
+    parser.add_argument('--model', default='voting_ensemble', help='Model to use for predictions')
+    parser.add_argument('--primary-symbol', required=True, help='Primary symbol to chart predictions against')
+    parser.add_argument('--alignment', default='exact', choices=ALIGNMENT_MODES, help='How weekly predictions are mapped onto daily bars: only on matching dates (exact) or carried forward to every following day (asof)')
+    parser.add_argument('--format', default='json', choices=OUTPUT_FORMATS, help='Response encoding; binary returns typed columns with int64 epoch millisecond timestamps and a float32 anomaly probability')
+    parser.add_argument('--no-news', action='store_true', help='Skip the news search and return an empty news list')
+    parser.add_argument('--max-points', type=int, default=None, help='Merge daily bars into at most this many OHLCV buckets for charting; buckets holding an anomalous bar are always flagged')
+    add_instrumentation_arguments(parser)
+    return parser
 
-def calculate_dxy_gold_correlation_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate DXY-Gold correlation features for strategy 19."""
-    features = pd.DataFrame(index=data.index)
+def fetch_primary_daily(symbol: str, interval: str) -> pd.DataFrame:
+    """Daily bars of the symbol predictions are charted against, indexed by UTC date."""
+    primary_data, _, _ = fetch_data({'symbol': symbol}, interval, with_market_stats=False)
+    primary_data.index = primary_data.index.tz_convert('UTC').normalize()
+    return primary_data
+
+def fetch_base_weekly(base_features_mapping: dict, interval: str) -> pd.DataFrame:
+    """Weekly closes of a strategy's base features, the only field features read, indexed by UTC date."""
+    base_data_weekly = fetch_weekly_columns(base_features_mapping, interval)
+    base_data_weekly.index = base_data_weekly.index.tz_convert('UTC').normalize()
+    return base_data_weekly
+
+def schedule_primary_stages(graph: StageGraph, args: argparse.Namespace):
+    """Schedule the primary symbol's bars and its market stats, whose quote info is fetched alongside."""
+    graph.add('primary', fetch_primary_daily, args.primary_symbol, args.interval)
+    graph.add('info', fetch_ticker_info, YAHOO_SYMBOL_MAP.get(args.primary_symbol, args.primary_symbol))
+    graph.add('market_stats', lambda info, primary_data: build_market_stats(info, args.primary_symbol, primary_data['symbol_Close']),
+              after=('info', 'primary'))
+
+def run_prediction(args: argparse.Namespace) -> dict:
+    """Run the full prediction pipeline for one set of parsed arguments.
+
+    Model loading, the primary and base feature fetches, the quote info and the news
+    search are independent stages that run concurrently; features, scoring and the
+    market stats each start as soon as their inputs are ready.
+    """
+    # Bad strategy or model names still fail before any download
+    model_artifact_path(args.strategy, args.model)
+    base_features_mapping = {k: v for k, v in args.symbol_mapping.items() if k != 'PRIMARY_SYMBOL'}
     
-    required_features = ['DXY', 'XAU BGNL']
+    graph = StageGraph(STAGE_EXECUTOR)
+    schedule_primary_stages(graph, args)
+    if not args.no_news:
+        graph.add('news', get_symbol_news, args.primary_symbol)
+    graph.add('model', load_model, args.strategy, args.model)
+    graph.add('base', fetch_base_weekly, base_features_mapping, args.interval)
+    if args.interval == SCORE_INDEX_INTERVAL and MODEL_REGISTRY.get(args.strategy, SCALER_NAME) is not None:
+        # Full histories only change at the end, so settled weeks come from the score index
+        graph.add('scores', indexed_predictions, args.strategy, args.model, base_features_mapping, after=('model', 'base'))
+    else:
+        # Features are scaled with the statistics the model was trained on
+        graph.add('features', lambda base_data_weekly: scale_features(
+            args.strategy, build_feature_matrix(args.strategy, base_data_weekly, list(base_features_mapping.keys()))
+        ), after=('base',))
+        graph.add('scores', predict_with_probabilities, after=('model', 'features'))
     
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
+    primary_data = graph.result('primary')
+    base_data_weekly = graph.result('base')
     
-    dxy = data['DXY_Close']
-    gold = data['XAU BGNL_Close']
+    # Ensure timestamps match between primary and base data
+    #common_dates = primary_data.index.intersection(base_data_weekly.index)
+    #if len(common_dates) == 0:
+    #    raise ValueError("No overlapping dates between primary symbol and base features")
+        
+    # Filter both datasets to only include common dates
+    #primary_data = primary_data.loc[common_dates]
+    #base_data_weekly = base_data_weekly.loc[common_dates]
     
-    features['DXY_Gold_Ratio'] = (dxy / gold).round(3)
-    features['DXY_7D_Change'] = dxy.pct_change(7).round(3)
-    features['Gold_7D_Change'] = gold.pct_change(7).round(3)
+    predictions, probabilities = graph.result('scores')
     
-    features = features.fillna(0)
+    daily_predictions, daily_probabilities = align_weekly_to_daily(
+        base_data_weekly.index, primary_data.index, predictions, probabilities, args.alignment
+    )
+    market_stats = graph.result('market_stats')
+    news = [] if args.no_news else graph.result('news')
     
-    expected_features = 3  # DXY_Gold_Ratio + DXY_7D_Change + Gold_7D_Change
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    source_points = len(primary_data)
+    primary_data, daily_predictions, daily_probabilities = downsample_bars(
+        primary_data, daily_predictions, daily_probabilities, args.max_points
+    )
     
-    return features
-
-def calculate_em_vs_dm_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate emerging vs developed markets features for strategy 20."""
-    features = pd.DataFrame(index=data.index)
+    if args.format == 'binary':
+        columns = primary_frame_columns(primary_data)
+        columns['prediction'] = ('int8', daily_predictions)
+        columns['probability'] = ('float32', daily_probabilities[:, 1])
+        return {'frame': encode_frame(columns, {
+            'marketStats': market_stats,
+            'news': news,
+            'sourcePoints': source_points
+        })}
     
-    required_features = ['MXCN', 'MXUS']
+    # Prepare the response with primary symbol's OHLC data
+    return {
+        'timestamps': primary_data.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+        'predictions': daily_predictions.tolist(),
+        'probabilities': daily_probabilities.tolist(),
+        'ohlc': {
+            'open': primary_data['symbol_Open'].tolist(),
+            'high': primary_data['symbol_High'].tolist(),
+            'low': primary_data['symbol_Low'].tolist(),
+            'close': primary_data['symbol_Close'].tolist(),
+            'volume': primary_data['symbol_Volume'].tolist()
+        },
+        'marketStats': market_stats,
+        'news': news,  # Add news data
+        'sourcePoints': source_points  # Daily bars before any --max-points downsampling
+    }
+
+def build_batch_parser(parser_class=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Build the argument parser for scoring several strategies and models in one request."""
+    parser = parser_class(description='Score several strategies and models against one primary symbol')
+    parser.add_argument('--strategies', required=True, type=lambda value: [item.strip() for item in value.split(',') if item.strip()], help='Comma separated strategy IDs')
+    parser.add_argument('--models', default='voting_ensemble', type=lambda value: [item.strip() for item in value.split(',') if item.strip()], help='Comma separated model names scored for every strategy')
+    parser.add_argument('--symbol-mapping', default={}, type=json.loads, help='JSON mapping of features to symbols; features not listed map to themselves')
+    parser.add_argument('--interval', required=True, help=f'Time interval for data. Must be one of {VALID_INTERVALS}')
+    parser.add_argument('--primary-symbol', required=True, help='Primary symbol to chart predictions against')
+    parser.add_argument('--alignment', default='exact', choices=ALIGNMENT_MODES, help='How weekly predictions are mapped onto daily bars')
+    parser.add_argument('--format', default='json', choices=OUTPUT_FORMATS, help='Response encoding; binary returns typed columns with int64 epoch millisecond timestamps and a float32 anomaly probability')
+    add_instrumentation_arguments(parser)
+    return parser
+
+def run_batch_prediction(args: argparse.Namespace) -> dict:
+    """Score every (strategy, model) pair against one primary symbol in a single pass.
+
+    The base features of all strategies are fetched together, features are built on
+    one shared FeatureGraph and the models are scored in the process pool. The
+    result is columnar: one anomaly probability and prediction series per
+    ``"<strategy>:<model>"`` column, all aligned to the same daily timestamps.
+    Pairs that fail (for example a model a strategy does not ship) are reported under
+    ``errors`` without failing the rest of the batch.
+    """
+    for strategy in args.strategies:
+        if strategy not in STRATEGY_FOLDERS:
+            raise ValueError(f"Invalid strategy ID: {strategy}")
     
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
+    base_features = {strategy: strategy_base_features(strategy) for strategy in args.strategies}
+    base_features_mapping = {}
+    for features in base_features.values():
+        for feature in features:
+            base_features_mapping.setdefault(feature, args.symbol_mapping.get(feature, feature))
     
-    mxcn = data['MXCN_Close']
-    mxus = data['MXUS_Close']
+    stages = StageGraph(STAGE_EXECUTOR)
+    schedule_primary_stages(stages, args)
+    stages.add('base', fetch_base_weekly, base_features_mapping, args.interval)
+    base_data_weekly = stages.result('base')
     
-    features['MXCN_MXUS_Ratio'] = (mxcn / mxus).round(3)
-    features['MXCN_7D_Change'] = mxcn.pct_change(7).round(3)
-    features['MXCN_MXUS_Ratio_7D_Change'] = features['MXCN_MXUS_Ratio'].pct_change(7).round(3)
+    graph = FeatureGraph(base_data_weekly)
+    pool = get_scoring_pool()
+    futures = {}
+    for strategy in args.strategies:
+        feature_data = build_feature_matrix(strategy, base_data_weekly, base_features[strategy], graph)
+        scaled_data = scale_features(strategy, feature_data)
+        # A voting ensemble is scored in the same task as the other models so they can share constituents
+        groups = [args.models] if 'voting_ensemble' in args.models else [[model_name] for model_name in args.models]
+        for model_names in groups:
+            future = pool.submit(score_models, strategy, model_names, scaled_data)
+            futures.update({f"{strategy}:{model_name}": (future, model_name) for model_name in model_names})
     
-    features = features.fillna(0)
+    primary_data = stages.result('primary')
+    market_stats = stages.result('market_stats')
+    columns, predictions, probabilities, errors = [], {}, {}, {}
+    frame_columns = primary_frame_columns(primary_data) if args.format == 'binary' else None
+    for column, (future, model_name) in futures.items():
+        try:
+            scores = future.result()[model_name]
+        except Exception as e:
+            scores = str(e)
+        if isinstance(scores, str):
+            errors[column] = scores
+            continue
+        weekly_predictions, weekly_probabilities = scores
+        daily_predictions, daily_probabilities = align_weekly_to_daily(
+            base_data_weekly.index, primary_data.index, weekly_predictions, weekly_probabilities, args.alignment
+        )
+        columns.append(column)
+        if frame_columns is not None:
+            frame_columns[f"prediction:{column}"] = ('int8', daily_predictions)
+            frame_columns[f"probability:{column}"] = ('float32', daily_probabilities[:, 1])
+            continue
+        predictions[column] = daily_predictions.tolist()
+        probabilities[column] = daily_probabilities[:, 1].tolist()
     
-    expected_features = 3  # MXCN_MXUS_Ratio + MXCN_7D_Change + MXCN_MXUS_Ratio_7D_Change
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    if frame_columns is not None:
+        return {'frame': encode_frame(frame_columns, {'columns': columns, 'errors': errors, 'marketStats': market_stats})}
     
-    return features
+    return {
+        'timestamps': primary_data.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+        'columns': columns,
+        'predictions': predictions,
+        'probabilities': probabilities,  # Anomaly probability per column
+        'errors': errors,
+        'ohlc': {
+            'open': primary_data['symbol_Open'].tolist(),
+            'high': primary_data['symbol_High'].tolist(),
+            'low': primary_data['symbol_Low'].tolist(),
+            'close': primary_data['symbol_Close'].tolist(),
+            'volume': primary_data['symbol_Volume'].tolist()
+        },
+        'marketStats': market_stats
+    }
 
-def calculate_oil_dxy_relationship_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate Oil-DXY relationship features for strategy 21."""
-    features = pd.DataFrame(index=data.index)
-    
-    required_features = ['Cl1', 'DXY']
-    
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
+def build_screen_parser(parser_class=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Build the argument parser for screening a watchlist against one strategy and model."""
+    parser = parser_class(description='Screen a watchlist of primary symbols against one strategy')
+    parser.add_argument('--strategy', required=True, help='Strategy ID to use')
+    parser.add_argument('--symbol-mapping', required=True, type=json.loads, help='JSON mapping of features to symbols')
+    parser.add_argument('--interval', required=True, help=f'Time interval for data. Must be one of {VALID_INTERVALS}')
+    parser.add_argument('--model', default='voting_ensemble', help='Model to use for predictions')
+    parser.add_argument('--watchlist', required=True, type=lambda value: [item.strip() for item in value.split(',') if item.strip()], help='Comma separated primary symbols to screen')
+    parser.add_argument('--alignment', default='exact', choices=ALIGNMENT_MODES, help='How weekly predictions are mapped onto daily bars')
+    parser.add_argument('--include-series', action='store_true', help='Include the full daily series for every symbol, not just the summary')
+    add_instrumentation_arguments(parser)
+    return parser
+
+def score_strategy(strategy: str, model_name: str, base_features_mapping: dict, interval: str) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """Fetch and score a strategy's base features, returning the weekly index, predictions and probabilities."""
+    model = load_model(strategy, model_name)
+    base_data_weekly = fetch_base_weekly(base_features_mapping, interval)
     
-    oil = data['Cl1_Close']
-    dxy = data['DXY_Close']
+    feature_data = build_feature_matrix(strategy, base_data_weekly, list(base_features_mapping.keys()))
+    scaled_data = scale_features(strategy, feature_data)
+    predictions, probabilities = predict_with_probabilities(model, scaled_data)
+    return base_data_weekly.index, predictions, probabilities
+
+def screen_symbol(symbol: str, args: argparse.Namespace, weekly_index: pd.DatetimeIndex,
+                  predictions: np.ndarray, probabilities: np.ndarray) -> dict:
+    """Align precomputed weekly predictions onto one watchlist symbol's daily bars."""
+    primary_data, _, market_stats = fetch_data({'symbol': symbol}, args.interval)
+    primary_data.index = primary_data.index.tz_convert('UTC').normalize()
     
-    features['Oil_DXY_Ratio'] = (oil / dxy).round(3)
-    features['Oil_7D_Change'] = oil.pct_change(7).round(3)
-    features['Oil_DXY_Ratio_7D_Change'] = features['Oil_DXY_Ratio'].pct_change(7).round(3)
+    daily_predictions, daily_probabilities = align_weekly_to_daily(
+        weekly_index, primary_data.index, predictions, probabilities, args.alignment
+    )
+    anomaly_positions = np.flatnonzero(daily_predictions == 1)
+    timestamps = primary_data.index.strftime('%Y-%m-%d %H:%M:%S')
     
-    features = features.fillna(0)
+    result = {
+        'symbol': symbol,
+        'lastTimestamp': timestamps[-1],
+        'lastClose': float(primary_data['symbol_Close'].iloc[-1]),
+        'anomalyCount': int(len(anomaly_positions)),
+        'lastAnomaly': timestamps[anomaly_positions[-1]] if len(anomaly_positions) else None,
+        'maxAnomalyProbability': float(daily_probabilities[:, 1].max()) if len(daily_probabilities) else 0.0,
+        'marketStats': market_stats
+    }
+    if args.include_series:
+        result.update({
+            'timestamps': timestamps.tolist(),
+            'predictions': daily_predictions.tolist(),
+            'probabilities': daily_probabilities.tolist(),
+            'ohlc': {
+                'open': primary_data['symbol_Open'].tolist(),
+                'high': primary_data['symbol_High'].tolist(),
+                'low': primary_data['symbol_Low'].tolist(),
+                'close': primary_data['symbol_Close'].tolist(),
+                'volume': primary_data['symbol_Volume'].tolist()
+            }
+        })
+    return result
+
+def run_screening(args: argparse.Namespace, emit) -> dict:
+    """Screen every watchlist symbol against one strategy and model.
+
+    The base features are fetched and scored once; only the primary series and the
+    alignment are repeated per symbol, concurrently. ``emit`` is called with each
+    symbol's result (or ``{"symbol": ..., "error": ...}``) as soon as it is ready,
+    and the returned summary lists the symbols that failed.
+    """
+    base_features_mapping = {k: v for k, v in args.symbol_mapping.items() if k != 'PRIMARY_SYMBOL'}
+    weekly_index, predictions, probabilities = score_strategy(args.strategy, args.model, base_features_mapping, args.interval)
     
-    expected_features = 3  # Oil_DXY_Ratio + Oil_7D_Change + Oil_DXY_Ratio_7D_Change
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    failed = []
+    with ThreadPoolExecutor(max_workers=SCREEN_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(screen_symbol, symbol, args, weekly_index, predictions, probabilities): symbol
+            for symbol in dict.fromkeys(args.watchlist)
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                emit(future.result())
+            except Exception as e:
+                failed.append(symbol)
+                emit({'symbol': symbol, 'error': str(e), 'type': type(e).__name__})
     
-    return features
+    return {'done': True, 'screened': len(futures) - len(failed), 'failed': failed}
+
+def build_stream_parser(parser_class=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Build the argument parser for opening a live scoring session."""
+    parser = parser_class(description='Open a streaming scoring session for one strategy and model')
+    parser.add_argument('--strategy', required=True, help='Strategy ID to use')
+    parser.add_argument('--symbol-mapping', default={}, type=json.loads, help='JSON mapping of features to symbols; features not listed map to themselves')
+    parser.add_argument('--interval', required=True, help=f'History used to warm up the rolling windows. Must be one of {VALID_INTERVALS}')
+    parser.add_argument('--model', default='voting_ensemble', help='Model to use for predictions')
+    add_instrumentation_arguments(parser)
+    return parser
+
+class StreamSession:
+    """An open live scoring session and the week its open bar belongs to."""
+
+    def __init__(self, scorer: StreamingScorer, multipliers: dict, week: pd.Timestamp):
+        self.scorer = scorer
+        self.multipliers = multipliers
+        self.week = week
+        self.lock = threading.Lock()  # Held while a bar is applied, so ticks update the state in order
+        self.last_used = None
+
+def week_start(timestamp) -> pd.Timestamp:
+    """Monday of the UTC week a timestamp falls in, matching the weekly bar labels."""
+    timestamp = pd.Timestamp(timestamp)
+    timestamp = timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+    return timestamp.normalize() - pd.Timedelta(days=timestamp.weekday())
+
+def open_stream(args: argparse.Namespace) -> dict:
+    """Warm up a streaming scorer on the strategy's history and score the latest weekly bar.
 
-def calculate_equity_vix_ratio_features(data: pd.DataFrame) -> pd.DataFrame:
-    """Calculate equity-VIX ratio features for strategy 25."""
-    features = pd.DataFrame(index=data.index)
+    The returned ``session`` ID is passed to update_stream() with each new bar, which
+    then only updates the rolling state instead of recomputing the full history.
+    """
+    compiled_strategy = compile_strategy(args.strategy)
+    if compiled_strategy is None:
+        raise ValueError(f"Strategy {args.strategy} has no feature definition to stream")
+    scaler = MODEL_REGISTRY.get(args.strategy, SCALER_NAME)
+    if scaler is None:
+        raise ValueError(f"Strategy {args.strategy} has no saved scaler statistics to stream with ({missing_scaler_reason(STRATEGY_FOLDERS[str(args.strategy)])})")
+    model = load_model(args.strategy, args.model)
     
-    required_features = ['MXUS', 'VIX']
+    base_features_mapping = {feature: args.symbol_mapping.get(feature, feature) for feature in compiled_strategy.symbols}
+    base_data_weekly = fetch_base_weekly(base_features_mapping, args.interval)
     
-    for feature in required_features:
-        if f"{feature}_Close" not in data.columns:
-            raise ValueError(f"Required feature {feature} not found in data")
+    scorer = StreamingScorer(compiled_strategy, model, scaler)
+    closes = {feature: base_data_weekly[f"{feature}_Close"].to_numpy() for feature in compiled_strategy.symbols}
+    scorer.prime({feature: values[:-1] for feature, values in closes.items()})
+    latest = scorer.update({feature: values[-1] for feature, values in closes.items()})
     
-    mxus = data['MXUS_Close']
-    vix = data['VIX_Close']
+    multipliers = {feature: MULTIPLIER_MAPPING.get(symbol, 1) for feature, symbol in base_features_mapping.items()}
+    session_id = STREAM_SESSIONS.add(StreamSession(scorer, multipliers, base_data_weekly.index[-1]))
+    return {
+        'session': session_id,
+        'symbols': compiled_strategy.symbols,
+        'timestamp': base_data_weekly.index[-1].strftime('%Y-%m-%d %H:%M:%S'),
+        **latest
+    }
+
+def update_stream(request_args: dict) -> dict:
+    """Score a tick of the open weekly bar, or a new bar, for an open session.
+
+    ``request_args`` holds the ``session`` ID, ``closes`` keyed by base feature in
+    Yahoo units (the same multipliers as fetch_data are applied) and an optional
+    ``timestamp`` echoed back. Ticks whose timestamp falls in the open bar's week
+    revise that bar and later weeks start a new one; ``new_bar`` overrides this, and
+    without a timestamp every update starts a new bar unless ``new_bar`` is false.
+    """
+    session = STREAM_SESSIONS.get(request_args.get('session'))
+    scorer = session.scorer
     
-    features['MXUS_VIX_Ratio'] = (mxus / vix).round(3)
-    features['MXUS_7D_Change'] = mxus.pct_change(7).round(3)
-    features['MXUS_VIX_Ratio_7D_Change'] = features['MXUS_VIX_Ratio'].pct_change(7).round(3)
+    closes = request_args.get('closes', {})
+    missing = [feature for feature in scorer.symbols if feature not in closes]
+    if missing:
+        raise ValueError(f"Missing closes for features: {', '.join(missing)}")
+    timestamp = request_args.get('timestamp')
+    week = week_start(timestamp) if timestamp is not None else None
+    with session.lock:
+        if week is not None and week < session.week:
+            raise ValueError(f"Tick at {timestamp} is older than the open bar's week of {session.week.strftime('%Y-%m-%d')}")
+        new_bar = request_args.get('new_bar')
+        if new_bar is None:
+            new_bar = week is None or week > session.week
+        result = scorer.update({
+            feature: round(float(closes[feature]) * session.multipliers[feature], 3) for feature in scorer.symbols
+        }, new_bar=bool(new_bar))
+        if week is not None:
+            session.week = week
+        elif new_bar:
+            session.week += pd.Timedelta(weeks=1)
+        bars = scorer.features.bars
+    return {'timestamp': timestamp, 'bars': bars, 'newBar': bool(new_bar), **result}
+
+def close_stream(request_args: dict) -> dict:
+    """Drop an open session's rolling state."""
+    return {'closed': STREAM_SESSIONS.close(request_args.get('session'))}
+
+class RequestArgumentParser(argparse.ArgumentParser):
+    """Argument parser that raises instead of exiting, for use inside the worker."""
+
+    def error(self, message):
+        raise ValueError(f"Invalid arguments: {message}")
+
+def parse_request_args(request: dict, parser_builder=build_parser) -> argparse.Namespace:
+    """Parse a worker request into the same namespace main() builds from sys.argv.
+
+    A request either carries a raw ``argv`` list or an ``args`` object whose keys
+    are the CLI option names, e.g. ``{"strategy": "5", "symbol_mapping": {...}}``.
+    List values are joined with commas and booleans become flags.
+    """
+    if 'argv' in request:
+        argv = [str(arg) for arg in request['argv']]
+    else:
+        argv = []
+        for key, value in request.get('args', {}).items():
+            if isinstance(value, bool):
+                # Booleans are store_true flags: present when true, omitted when false
+                if value:
+                    argv.append(f"--{key.replace('_', '-')}")
+                continue
+            argv.append(f"--{key.replace('_', '-')}")
+            if isinstance(value, list):
+                value = ','.join(str(item) for item in value)
+            argv.append(value if isinstance(value, str) else json.dumps(value))
+    return parser_builder(RequestArgumentParser).parse_args(argv)
+
+def worker_result(result: dict) -> dict:
+    """Make a result JSON-safe for the worker protocol; binary frames travel base64 encoded."""
+    if isinstance(result.get('frame'), bytes):
+        result['frame'] = base64.b64encode(result['frame']).decode('ascii')
+    return result
+
+def request_symbols(args: argparse.Namespace) -> list:
+    """Symbols whose market data a predict or batch request reads."""
+    if hasattr(args, 'strategies'):
+        features = {feature for strategy in args.strategies for feature in strategy_base_features(strategy)}
+        symbols = [args.symbol_mapping.get(feature, feature) for feature in features]
+    else:
+        symbols = list(args.symbol_mapping.values())
+    return sorted(set(symbols) | {args.primary_symbol})
+
+def result_cache_key(op: str, args: argparse.Namespace) -> tuple:
+    """Request options plus the (last bar, fetch time) of every market data entry the request reads."""
+    options = {name: value for name, value in vars(args).items() if name not in ('timings', 'profile_slow_ms')}
+    versions = [
+        MARKET_CACHE.version(market_cache_key(YAHOO_SYMBOL_MAP.get(symbol, symbol), MULTIPLIER_MAPPING.get(symbol, 1)))
+        for symbol in request_symbols(args)
+    ]
+    return op, json.dumps(options, sort_keys=True), json.dumps(versions)
+
+def cached_worker_result(op: str, handler, args: argparse.Namespace) -> str:
+    """A request's serialized worker result, shared through RESULT_CACHE by identical requests.
+
+    Requests asking for timings or profiling always run, since their diagnostics are per run.
+    """
+    def compute() -> str:
+        return json.dumps(worker_result(run_instrumented(op, handler, args)), separators=(',', ':'), allow_nan=False)
     
-    features = features.fillna(0)
+    if args.timings or args.profile_slow_ms is not None or RESULT_CACHE.ttl_seconds <= 0:
+        return compute()
+    try:
+        key = result_cache_key(op, args)
+    except Exception:
+        # Invalid strategies fail inside the pipeline with the usual error
+        return compute()
+    result = RESULT_CACHE.get_or_compute(key, compute)
+    # A first run fills the market cache, so file the result under the versions it was computed from too
+    settled_key = result_cache_key(op, args)
+    if settled_key != key:
+        RESULT_CACHE.put(settled_key, result)
+    return result
+
+def serve_worker(max_concurrency: int = DEFAULT_WORKER_CONCURRENCY):
+    """Serve NDJSON prediction requests from stdin until it is closed.
+
+    Every request line gets exactly one response line tagged with the request's
+    ``id``, either ``{"id": ..., "result": {...}}`` or ``{"id": ..., "error": ..., "type": ...}``.
+    Responses are written as requests finish, so they may arrive out of order.
+    Results requested with ``format: "binary"`` carry the frame base64 encoded under ``frame``.
+    Identical predict and batch requests share one pipeline run and its result through
+    RESULT_CACHE. A request of ``{"id": ..., "op": "stats"}`` returns the model and result cache counters and
+    ``{"id": ..., "op": "batch", "args": {...}}`` runs run_batch_prediction.
+    ``{"id": ..., "op": "screen", "args": {...}}`` streams one ``{"id": ..., "partial": {...}}``
+    line per watchlist symbol before its final result line.
+    ``stream_open``, ``stream_update`` and ``stream_close`` manage live scoring sessions;
+    updates are handled in arrival order on the reading thread so bars are never reordered.
+    """
+    response_stream = sys.stdout
+    # Diagnostics printed by the pipeline must not interleave with responses
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def write_line(line: str):
+        with write_lock:
+            response_stream.write(line + '\n')
+            response_stream.flush()
     
-    expected_features = 3  # MXUS_VIX_Ratio + MXUS_7D_Change + MXUS_VIX_Ratio_7D_Change
-    if len(features.columns) != expected_features:
-        raise ValueError(f"Generated {len(features.columns)} features, but model expects {expected_features}")
+    def respond(payload: dict):
+        write_line(json.dumps(payload, separators=(',', ':'), allow_nan=False))
     
-    return features
+    def respond_serialized(request_id, result: str):
+        # Cached results are already JSON, so they are spliced in rather than parsed and re-encoded
+        write_line(f'{{"id":{json.dumps(request_id)},"result":{result}}}')
 
-def get_symbol_news(symbol):
-    ticker = yf.Search(symbol, news_count=10)
-    return ticker.news
+    def handle(request: dict):
+        request_id = request.get('id')
+        try:
+            if request.get('op') == 'stats':
+                respond({'id': request_id, 'result': {'modelCache': MODEL_REGISTRY.stats(), 'resultCache': RESULT_CACHE.stats()}})
+                return
+            if request.get('op') == 'screen':
+                args = parse_request_args(request, build_screen_parser)
+                summary = run_instrumented('screen', run_screening, args, lambda partial: respond({'id': request_id, 'partial': partial}))
+                respond({'id': request_id, 'result': summary})
+                return
+            if request.get('op') == 'stream_open':
+                args = parse_request_args(request, build_stream_parser)
+                respond({'id': request_id, 'result': run_instrumented('stream_open', open_stream, args)})
+                return
+            if request.get('op') == 'stream_update':
+                respond({'id': request_id, 'result': update_stream(request.get('args', {}))})
+                return
+            if request.get('op') == 'stream_close':
+                respond({'id': request_id, 'result': close_stream(request.get('args', {}))})
+                return
+            if request.get('op') == 'batch':
+                args = parse_request_args(request, build_batch_parser)
+                respond_serialized(request_id, cached_worker_result('batch', run_batch_prediction, args))
+                return
+            args = parse_request_args(request)
+            respond_serialized(request_id, cached_worker_result('predict', run_prediction, args))
+        except Exception as e:
+            respond({'id': request_id, 'error': str(e), 'type': type(e).__name__})
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        respond({'ready': True})
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                respond({'id': None, 'error': f"Malformed request: {str(e)}", 'type': type(e).__name__})
+                continue
+            if request.get('op') == 'stream_update':
+                handle(request)
+            else:
+                executor.submit(handle, request)
 
 def main():
+    global METRICS_FILE
+    worker_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    worker_parser.add_argument('--worker', action='store_true', help='Serve NDJSON requests on stdin/stdout instead of running once')
+    worker_parser.add_argument('--batch', action='store_true', help='Score several strategies and models at once (see --strategies and --models)')
+    worker_parser.add_argument('--screen', action='store_true', help='Screen a watchlist against one strategy, printing one JSON line per symbol (see --watchlist)')
+    worker_parser.add_argument('--max-concurrency', type=int, default=DEFAULT_WORKER_CONCURRENCY, help='Maximum number of requests served concurrently in worker mode')
+    worker_parser.add_argument('--model-cache-bytes', type=int, default=DEFAULT_MAX_BYTES, help='Memory budget for cached models, measured by artifact size')
+    worker_parser.add_argument('--preload', default='', help='Comma separated strategy:model pairs to load at startup, e.g. "5:voting_ensemble,25:xgboost"')
+    worker_parser.add_argument('--result-cache-bytes', type=int, default=DEFAULT_RESULT_CACHE_BYTES, help='Memory budget for cached prediction responses, measured by serialized size')
+    worker_parser.add_argument('--result-cache-ttl', type=float, default=RESULT_CACHE.ttl_seconds, help='Seconds a cached prediction response is served; 0 disables the cache')
+    worker_parser.add_argument('--metrics-file', default=METRICS_FILE, help='Append every request\'s stage timings to this file as JSON lines')
+    worker_args, remaining_argv = worker_parser.parse_known_args()
+    METRICS_FILE = worker_args.metrics_file
+    if worker_args.worker:
+        MODEL_REGISTRY.max_bytes = worker_args.model_cache_bytes
+        RESULT_CACHE.max_bytes = worker_args.result_cache_bytes
+        RESULT_CACHE.ttl_seconds = worker_args.result_cache_ttl
+        MODEL_REGISTRY.preload(parse_preload(worker_args.preload))
+        serve_worker(worker_args.max_concurrency)
+        return
+
     try:
-        parser = argparse.ArgumentParser(description='Run anomaly detection predictions')
-        parser.add_argument('--strategy', required=True, help='Strategy ID to use')
-        parser.add_argument('--symbol-mapping', required=True, type=json.loads, help='JSON mapping of features to symbols')
-        parser.add_argument('--interval', required=True, help=f'Time interval for data. Must be one of {VALID_INTERVALS}')
-        parser.add_argument('--model', default='voting_ensemble', help='Model to use for predictions')
-        parser.add_argument('--primary-symbol', required=True, help='Primary symbol to chart predictions against')
-        
-        args = parser.parse_args()
-        
-        model = load_model(args.strategy, args.model)
-        
-        primary_data, primary_data_weekly, market_stats = fetch_data({'symbol': args.primary_symbol}, args.interval)
-        
-        base_features_mapping = {k: v for k, v in args.symbol_mapping.items() if k != 'PRIMARY_SYMBOL'}
-        _, base_data_weekly, _ = fetch_data(base_features_mapping, args.interval)
-        
-        primary_data.index = primary_data.index.tz_convert('UTC').normalize()
-        base_data_weekly.index = base_data_weekly.index.tz_convert('UTC').normalize()
-        
-        # Ensure timestamps match between primary and base data
-        #common_dates = primary_data.index.intersection(base_data_weekly.index)
-        #if len(common_dates) == 0:
-        #    raise ValueError("No overlapping dates between primary symbol and base features")
-            
-        # Filter both datasets to only include common dates
-        #primary_data = primary_data.loc[common_dates]
-        #base_data_weekly = base_data_weekly.loc[common_dates]
-        
-        # Additional features for specific strategies     
-        if args.strategy == "5":  # equities_vs_commodities
-            feature_data = calculate_equities_vs_commodities_features(base_data_weekly)
-        elif args.strategy == "7":  # volatility_vs_equities
-            feature_data = calculate_volatility_vs_equities_features(base_data_weekly)
-        elif args.strategy == "13":  # volatility_regime
-            feature_data = calculate_volatility_regime_features(base_data_weekly)
-        elif args.strategy == "14":  # cross_asset_momentum
-            feature_data = calculate_momentum_features(base_data_weekly)
-        elif args.strategy == "17":  # vix_momentum
-            feature_data = calculate_vix_momentum_features(base_data_weekly)
-        elif args.strategy == "19":  # dxy_gold_correlation
-            feature_data = calculate_dxy_gold_correlation_features(base_data_weekly)
-        elif args.strategy == "20":  # em_vs_dm
-            feature_data = calculate_em_vs_dm_features(base_data_weekly)
-        elif args.strategy == "21":  # oil_dxy_relationship
-            feature_data = calculate_oil_dxy_relationship_features(base_data_weekly)
-        elif args.strategy == "25":  # equity_vix_ratio
-            feature_data = calculate_equity_vix_ratio_features(base_data_weekly)
+        if worker_args.screen:
+            def emit(partial: dict):
+                print(json.dumps(partial, separators=(',', ':'), allow_nan=False), flush=True)
+            result = run_instrumented('screen', run_screening, build_screen_parser().parse_args(remaining_argv), emit)
+        elif worker_args.batch:
+            result = run_instrumented('batch', run_batch_prediction, build_batch_parser().parse_args(remaining_argv))
         else:
-            # For other strategies, just use Close prices
-            feature_data = pd.DataFrame()
-            for feature in base_features_mapping.keys():
-                feature_data[feature] = base_data_weekly[f"{feature}_Close"].round(3)
-        
-        #print("Feature data before scaling:")
-        #print(feature_data)
-        
-        # Scale the feature data
-        scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(feature_data)
-        
-        #print("Feature data after scaling:")
-        #print(pd.DataFrame(scaled_data, columns=feature_data.columns))
-        
-        # Make predictions
-        predictions = model.predict(scaled_data)
-        try:
-            # Try to get probabilities - some models like isolation_forest don't have predict_proba
-            probabilities = model.predict_proba(scaled_data)
-        except (AttributeError, NotImplementedError):
-            # If predict_proba is not available, create binary probabilities from predictions
-            probabilities = np.zeros((len(predictions), 2))
-            for i, pred in enumerate(predictions):
-                probabilities[i] = [1 - pred, pred]  # [normal_prob, anomaly_prob]
-        
-        # Initialize arrays for daily data
-        daily_predictions = np.zeros(len(primary_data))
-        daily_probabilities = np.zeros((len(primary_data), 2))
-        
-        # Create a mapping between weekly and daily dates
-        for i, weekly_date in enumerate(base_data_weekly.index):
-            # Find the matching daily date
-            matching_date = primary_data.index[primary_data.index == weekly_date]
-            if len(matching_date) > 0:
-                idx = primary_data.index.get_loc(matching_date[0])
-                daily_predictions[idx] = predictions[i]
-                daily_probabilities[idx] = probabilities[i]
-        
-        # Prepare the response with primary symbol's OHLC data
-        result = {
-            'timestamps': primary_data.index.strftime('%Y-%m-%d %H:%M:%S').tolist(),
-            'predictions': daily_predictions.tolist(),
-            'probabilities': daily_probabilities.tolist(),
-            'ohlc': {
-                'open': primary_data['symbol_Open'].tolist(),
-                'high': primary_data['symbol_High'].tolist(),
-                'low': primary_data['symbol_Low'].tolist(),
-                'close': primary_data['symbol_Close'].tolist(),
-                'volume': primary_data['symbol_Volume'].tolist()
-            },
-            'marketStats': market_stats,
-            'news': get_symbol_news(args.primary_symbol)  # Add news data
-        }
-        
+            result = run_instrumented('predict', run_prediction, build_parser().parse_args(remaining_argv))
+        if isinstance(result.get('frame'), bytes):
+            sys.stdout.buffer.write(result['frame'])
+            sys.stdout.flush()
+            return
         print(json.dumps(result, separators=(',', ':'), allow_nan=False))
         
     except Exception as e:
@@ -554,4 +1403,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
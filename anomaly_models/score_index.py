@@ -0,0 +1,110 @@
+import json
+import os
+from typing import NamedTuple, Optional
+from urllib.parse import quote
+
+import numpy as np
+from filelock import FileLock
+
+# How long to wait for another process that is extending the same index
+LOCK_TIMEOUT_SECONDS = 120
+
+# Column files of an entry, each a flat little-endian array with one fixed-size record per week
+COLUMNS = {
+    'timestamps': np.dtype('<i8'),
+    'features': np.dtype('<f8'),
+    'predictions': np.dtype('<i8'),
+    'probabilities': np.dtype('<f8'),
+}
+
+class IndexedScores(NamedTuple):
+    timestamps: np.ndarray  # UTC nanoseconds of each weekly bar, ascending
+    features: np.ndarray  # (weeks, features) unscaled feature matrix
+    predictions: np.ndarray
+    probabilities: np.ndarray  # (weeks, 2) [normal, anomaly]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def slice(self, start: int, stop: int) -> 'IndexedScores':
+        return IndexedScores(*(column[start:stop] for column in self))
+
+class ScoreIndex:
+    """On-disk, append-only history of one model's weekly features, labels and probabilities.
+
+    Each entry is a directory of raw column files that are memory-mapped on read,
+    plus a JSON metadata file holding the row count and a fingerprint of everything
+    the scores depend on (model artifact, scaler, feature definition, symbols).
+    New weeks are appended to the column files before the metadata is replaced, so
+    a reader never sees a partial row. Callers hold ``lock(key)`` around a
+    load/extend cycle, like MarketDataCache.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, quote(key, safe=''))
+
+    def lock(self, key: str) -> FileLock:
+        os.makedirs(self.root, exist_ok=True)
+        return FileLock(self._path(key) + '.lock', timeout=LOCK_TIMEOUT_SECONDS)
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self._path(key), 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key: str, meta: dict):
+        path = self._path(key)
+        with open(os.path.join(path, 'meta.json.tmp'), 'w') as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(path, 'meta.json.tmp'), os.path.join(path, 'meta.json'))
+
+    def load(self, key: str, fingerprint: str) -> Optional[IndexedScores]:
+        """Memory-mapped columns of an entry, or None when it is missing or was built from other inputs."""
+        meta = self._read_meta(key)
+        if meta is None or meta.get('fingerprint') != fingerprint:
+            return None
+        rows, width = meta['rows'], meta['width']
+        shapes = {'timestamps': (rows,), 'features': (rows, width), 'predictions': (rows,), 'probabilities': (rows, 2)}
+        if rows == 0:
+            return IndexedScores(*(np.empty(shapes[name], dtype=dtype) for name, dtype in COLUMNS.items()))
+        try:
+            return IndexedScores(*(
+                np.memmap(os.path.join(self._path(key), f'{name}.bin'), dtype=dtype, mode='r', shape=shapes[name])
+                for name, dtype in COLUMNS.items()
+            ))
+        except (OSError, ValueError):
+            return None
+
+    def query(self, key: str, fingerprint: str, start_ns: int = None, end_ns: int = None) -> Optional[IndexedScores]:
+        """Weeks with ``start_ns <= timestamp <= end_ns``, found by binary search on the mapped timestamp column."""
+        scores = self.load(key, fingerprint)
+        if scores is None:
+            return None
+        start = 0 if start_ns is None else int(np.searchsorted(scores.timestamps, start_ns, side='left'))
+        stop = len(scores) if end_ns is None else int(np.searchsorted(scores.timestamps, end_ns, side='right'))
+        return scores.slice(start, max(start, stop))
+
+    def extend(self, key: str, fingerprint: str, keep: int, scores: IndexedScores):
+        """Keep the first ``keep`` rows and append ``scores`` after them.
+
+        A fingerprint different from the stored one starts the entry over.
+        """
+        path = self._path(key)
+        os.makedirs(path, exist_ok=True)
+        meta = self._read_meta(key)
+        if meta is None or meta.get('fingerprint') != fingerprint:
+            keep = 0
+        width = scores.features.shape[1]
+        for name, dtype in COLUMNS.items():
+            column = np.ascontiguousarray(getattr(scores, name), dtype=dtype)
+            record_bytes = dtype.itemsize * (width if name == 'features' else 2 if name == 'probabilities' else 1)
+            with open(os.path.join(path, f'{name}.bin'), 'ab') as f:
+                # Rows past ``keep`` (replaced weeks or an interrupted append) are dropped first
+                f.truncate(keep * record_bytes)
+                f.write(column.tobytes())
+        self._write_meta(key, {'fingerprint': fingerprint, 'rows': keep + len(scores), 'width': width})
@@ -0,0 +1,141 @@
+import numpy as np
+
+# Classifiers whose predict is the argmax of predict_proba, so one probability pass yields both.
+# Others (SVC's Platt-scaled probabilities for one) keep a separate predict call.
+ARGMAX_CLASSIFIERS = {
+    'RandomForestClassifier', 'ExtraTreesClassifier', 'DecisionTreeClassifier', 'GradientBoostingClassifier',
+    'XGBClassifier', 'MLPClassifier', 'LogisticRegression', 'KNeighborsClassifier', 'GaussianNB',
+    'CompactForest', 'CompactBoosting', 'CompactMLP',
+}
+
+# Outlier detectors: negative decision_function means an outlier (predict returns -1)
+OUTLIER_DETECTORS = {'IsolationForest', 'EllipticEnvelope', 'CompactIsolationForest', 'CompactEllipticEnvelope'}
+
+MIXTURES = {'GaussianMixture', 'CompactGaussianMixture'}
+
+VOTING = {'VotingClassifier', 'CompactVoting'}
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _binary_proba(positive: np.ndarray) -> np.ndarray:
+    positive = np.asarray(positive, dtype=np.float64)
+    return np.column_stack([1 - positive, positive])
+
+class Scorer:
+    """Scores a feature matrix with one estimator, returning labels and [normal, anomaly] probabilities.
+
+    ``score(X, shared)`` reuses the result of an identical estimator already scored on
+    the same matrix when given a ``shared`` dict, so a voting ensemble and its member
+    models requested together evaluate each constituent once.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._fingerprint = None
+
+    def fingerprint(self) -> str:
+        """Content hash of the fitted estimator; separately loaded copies of one model match."""
+        if self._fingerprint is None:
+            import joblib
+            self._fingerprint = joblib.hash(self.model)
+        return self._fingerprint
+
+    def score(self, X: np.ndarray, shared: dict = None) -> tuple[np.ndarray, np.ndarray]:
+        if shared is None:
+            return self._score(X, shared)
+        key = self.fingerprint()
+        if key not in shared:
+            shared[key] = self._score(X, shared)
+        return shared[key]
+
+    def _score(self, X: np.ndarray, shared: dict) -> tuple[np.ndarray, np.ndarray]:
+        # Estimators without probabilities score their hard labels
+        predictions = np.asarray(self.model.predict(X))
+        return predictions, _binary_proba(predictions)
+
+class ProbabilityScorer(Scorer):
+    """Classifiers with predict_proba."""
+
+    def _score(self, X: np.ndarray, shared: dict) -> tuple[np.ndarray, np.ndarray]:
+        probabilities = self.model.predict_proba(X)
+        if type(self.model).__name__ in ARGMAX_CLASSIFIERS:
+            return np.asarray(self.model.classes_)[probabilities.argmax(axis=1)], probabilities
+        return np.asarray(self.model.predict(X)), probabilities
+
+class OutlierScorer(Scorer):
+    """Outlier detectors, relabelled to 1 for an anomaly and 0 otherwise.
+
+    The anomaly probability is ``expit(-decision / scale)``, where ``scale`` is the
+    median distance of the training rows from the decision boundary. It is 0.5
+    exactly on the boundary, so it always agrees with the label, and it grows
+    continuously with how far past the boundary a row lies.
+    """
+
+    def __init__(self, model, scale: float = 1.0):
+        super().__init__(model)
+        self.scale = scale
+
+    @classmethod
+    def calibrated(cls, model, training_data: np.ndarray):
+        distances = np.abs(model.decision_function(training_data))
+        scale = float(np.median(distances)) if len(distances) else 0.0
+        return cls(model, scale if scale > 0 else 1.0)
+
+    def _score(self, X: np.ndarray, shared: dict) -> tuple[np.ndarray, np.ndarray]:
+        decision = np.asarray(self.model.decision_function(X), dtype=np.float64)
+        return (decision < 0).astype(np.int64), _binary_proba(_expit(-decision / self.scale))
+
+class MixtureScorer(Scorer):
+    """Gaussian mixtures, whose component posteriors are the probabilities and whose label is the likeliest component."""
+
+    def _score(self, X: np.ndarray, shared: dict) -> tuple[np.ndarray, np.ndarray]:
+        probabilities = self.model.predict_proba(X)
+        return probabilities.argmax(axis=1), probabilities
+
+class VotingScorer(Scorer):
+    """Voting ensembles combined from their members' scores, so each member runs once.
+
+    Soft voting averages member probabilities. Hard voting takes the weighted
+    majority label, with the weighted share of anomaly votes as its probability.
+    """
+
+    def __init__(self, model, members: list):
+        super().__init__(model)
+        self.members = members
+        self.voting = model.voting
+        self.weights = model.weights
+        if self.weights is not None and hasattr(model, 'estimators'):
+            # scikit-learn keeps the weights of dropped estimators too; compact ensembles only the fitted ones
+            self.weights = [weight for (_, estimator), weight in zip(model.estimators, model.weights) if estimator != 'drop']
+        self.classes = np.asarray(model.classes_)
+
+    def _score(self, X: np.ndarray, shared: dict) -> tuple[np.ndarray, np.ndarray]:
+        scores = [member.score(X, shared) for member in self.members]
+        if self.voting == 'soft':
+            probabilities = np.average([member_probabilities for _, member_probabilities in scores], axis=0, weights=self.weights)
+            return self.classes[probabilities.argmax(axis=1)], probabilities
+        # Members are fitted on encoded labels, so their labels index the ensemble's classes
+        votes = np.stack([np.asarray(labels, dtype=np.intp) for labels, _ in scores])
+        weights = np.ones(len(self.members)) if self.weights is None else np.asarray(self.weights, dtype=np.float64)
+        counts = np.stack([(weights[:, None] * (votes == i)).sum(axis=0) for i in range(len(self.classes))], axis=1)
+        return self.classes[counts.argmax(axis=1)], counts / weights.sum()
+
+def scorer_for(model, training_data=None) -> Scorer:
+    """Wrap a fitted estimator in the scorer for its family.
+
+    ``training_data`` is a callable returning the matrix the model was fitted on,
+    read only when an outlier detector needs calibrating.
+    """
+    kind = type(model).__name__
+    if kind in VOTING:
+        members = model.estimators_ if hasattr(model, 'estimators_') else model.members
+        return VotingScorer(model, [scorer_for(member, training_data) for member in members])
+    if kind in OUTLIER_DETECTORS:
+        data = training_data() if training_data is not None else None
+        return OutlierScorer.calibrated(model, data) if data is not None else OutlierScorer(model)
+    if kind in MIXTURES:
+        return MixtureScorer(model)
+    if hasattr(model, 'predict_proba'):
+        return ProbabilityScorer(model)
+    return Scorer(model)
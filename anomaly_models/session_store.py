@@ -0,0 +1,59 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_IDLE_SECONDS = 2 * 60 * 60
+
+class SessionNotFound(LookupError):
+    """The session expired or was never created by this worker."""
+
+class SessionStore:
+    """Thread-safe in-memory sessions keyed by random ID, evicted least recently used and after idling.
+
+    Stored values carry a ``last_used`` timestamp, refreshed on every ``get``; values
+    may refresh it themselves when they finish work that should count as activity.
+    """
+
+    def __init__(self, kind: str, max_sessions: int = DEFAULT_MAX_SESSIONS, idle_seconds: float = DEFAULT_IDLE_SECONDS):
+        self.kind = kind
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, value) -> str:
+        session = uuid.uuid4().hex
+        value.last_used = time.time()
+        with self._lock:
+            self._sessions[session] = value
+            self._evict()
+        return session
+
+    def get(self, session: str):
+        with self._lock:
+            self._evict()
+            value = self._sessions.get(session)
+            if value is None:
+                raise SessionNotFound(f"Unknown or expired {self.kind} session: {session}")
+            self._sessions.move_to_end(session)
+            value.last_used = time.time()
+            return value
+
+    def close(self, session: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict()
+            return len(self._sessions)
+
+    def _evict(self):
+        cutoff = time.time() - self.idle_seconds
+        while self._sessions:
+            session, value = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and value.last_used >= cutoff:
+                break
+            del self._sessions[session]
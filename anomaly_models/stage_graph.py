@@ -0,0 +1,71 @@
+import contextvars
+import threading
+from concurrent.futures import Executor, Future
+
+from instrumentation import profiled
+
+def _run_profiled(fn, *args, **kwargs):
+    with profiled():
+        return fn(*args, **kwargs)
+
+class StageGraph:
+    """Runs named pipeline stages on an executor as soon as the stages they depend on finish.
+
+    ``add(name, fn, *args, after=(...))`` schedules ``fn(*args, *dependency_results)``.
+    Stages never block a worker thread waiting on each other: a stage is only
+    submitted once all of its dependencies are done, and a failed dependency fails
+    every stage downstream of it with the same exception. Each stage runs in a copy
+    of the caller's context, so instrumentation records and profiles it under the
+    current request.
+    """
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, fn, *args, after: tuple = (), **kwargs) -> Future:
+        with self._lock:
+            if name in self._futures:
+                raise ValueError(f"Stage {name} is already scheduled")
+            missing = [dependency for dependency in after if dependency not in self._futures]
+            if missing:
+                raise ValueError(f"Stage {name} depends on unscheduled stages: {', '.join(missing)}")
+            dependencies = [self._futures[dependency] for dependency in after]
+            future = self._futures[name] = Future()
+        context = contextvars.copy_context()
+        remaining = [len(dependencies)]
+        remaining_lock = threading.Lock()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(context.run(_run_profiled, fn, *args, *(dependency.result() for dependency in dependencies), **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        def submit():
+            failed = next((dependency for dependency in dependencies if dependency.exception() is not None), None)
+            if failed is not None:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(failed.exception())
+                return
+            self.executor.submit(run)
+
+        def dependency_done(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                submit()
+
+        if not dependencies:
+            submit()
+        for dependency in dependencies:
+            dependency.add_done_callback(dependency_done)
+        return future
+
+    def result(self, name: str, timeout: float = None):
+        """Wait for a stage and return its result, re-raising its exception."""
+        return self._futures[name].result(timeout)
@@ -0,0 +1,281 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from feature_registry import CROSS_SECTIONAL, CompiledStrategy
+from scoring import Scorer
+
+class _Operator:
+    """One node of a strategy's feature graph with O(1) per-bar update state."""
+    value = math.nan
+
+    def __init__(self, node, children):
+        self.node = node
+        self.children = children
+
+    def update(self):
+        raise NotImplementedError
+
+    def save(self):
+        """Rolling state before the open bar; stateless operators recompute everything from their children."""
+        return None
+
+    def restore(self, state):
+        pass
+
+class _Close(_Operator):
+    # Set directly from the incoming bar
+    def update(self):
+        pass
+
+class _Round(_Operator):
+    def update(self):
+        # np.round, not round(), so values match FeatureGraph to the last digit
+        self.value = float(np.round(self.children[0].value, 3))
+
+class _Scale(_Operator):
+    def update(self):
+        self.value = self.children[0].value * self.node[2]
+
+class _Binary(_Operator):
+    def update(self):
+        a, b = self.children[0].value, self.children[1].value
+        op = self.node[0]
+        if op == 'sub':
+            self.value = a - b
+        elif op == 'mul':
+            self.value = a * b
+        elif b != 0 or math.isnan(b):
+            self.value = a / b
+        else:
+            # Match NumPy division semantics used by FeatureGraph
+            self.value = math.nan if a == 0 or math.isnan(a) else math.copysign(math.inf, a)
+
+class _CrossSection(_Operator):
+    def update(self):
+        # Same NumPy reduction as FeatureGraph, so NaN handling and rounding agree
+        values = np.fromiter((child.value for child in self.children), dtype=np.float64, count=len(self.children))
+        self.value = float(CROSS_SECTIONAL[self.node[0]](values))
+
+class _PctChange(_Operator):
+    def __init__(self, node, children):
+        super().__init__(node, children)
+        self.history = deque(maxlen=node[2] + 1)
+
+    def update(self):
+        self.history.append(self.children[0].value)
+        if len(self.history) < self.history.maxlen:
+            self.value = math.nan
+            return
+        lagged = self.history[0]
+        current = self.history[-1]
+        if lagged != 0 or math.isnan(lagged):
+            self.value = current / lagged - 1
+        else:
+            self.value = math.nan if current == 0 or math.isnan(current) else math.copysign(math.inf, current)
+
+    def save(self):
+        return tuple(self.history)
+
+    def restore(self, state):
+        self.history = deque(state, maxlen=self.history.maxlen)
+
+class _RollingMoments(_Operator):
+    """Rolling mean or sample standard deviation from running shifted sums.
+
+    Sums are taken relative to a reference value to avoid cancellation on large
+    prices, and rebuilt from the window every ``window`` bars so rounding error
+    cannot accumulate. Windows holding a non-finite value fall back to NumPy.
+    """
+
+    def __init__(self, node, children):
+        super().__init__(node, children)
+        self.window = node[2]
+        self.buffer = deque(maxlen=self.window)
+        self.non_finite = 0
+        self.reference = 0.0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.since_rebuild = 0
+
+    def _rebuild(self):
+        finite = [x for x in self.buffer if math.isfinite(x)]
+        self.reference = finite[-1] if finite else 0.0
+        self.total = sum(x - self.reference for x in finite)
+        self.total_squares = sum((x - self.reference) ** 2 for x in finite)
+        self.since_rebuild = 0
+
+    def update(self):
+        x = self.children[0].value
+        if len(self.buffer) == self.window:
+            dropped = self.buffer[0]
+            if math.isfinite(dropped):
+                self.total -= dropped - self.reference
+                self.total_squares -= (dropped - self.reference) ** 2
+            else:
+                self.non_finite -= 1
+        self.buffer.append(x)
+        if math.isfinite(x):
+            self.total += x - self.reference
+            self.total_squares += (x - self.reference) ** 2
+        else:
+            self.non_finite += 1
+
+        self.since_rebuild += 1
+        if self.since_rebuild >= self.window:
+            self._rebuild()
+
+        if len(self.buffer) < self.window:
+            self.value = math.nan
+        elif self.non_finite:
+            values = np.fromiter(self.buffer, dtype=np.float64, count=self.window)
+            with np.errstate(invalid='ignore'):
+                self.value = float(values.mean() if self.node[0] == 'rolling_mean' else values.std(ddof=1))
+        elif self.node[0] == 'rolling_mean':
+            self.value = self.reference + self.total / self.window
+        else:
+            variance = (self.total_squares - self.total * self.total / self.window) / (self.window - 1)
+            self.value = math.sqrt(variance) if variance > 0 else 0.0
+
+    def save(self):
+        return tuple(self.buffer), self.non_finite, self.reference, self.total, self.total_squares, self.since_rebuild
+
+    def restore(self, state):
+        buffer, self.non_finite, self.reference, self.total, self.total_squares, self.since_rebuild = state
+        self.buffer = deque(buffer, maxlen=self.window)
+
+class _RollingMax(_Operator):
+    # Monotonic deque of (position, value) pairs; the front is the window maximum
+    def __init__(self, node, children):
+        super().__init__(node, children)
+        self.window = node[2]
+        self.candidates = deque()
+        self.nan_positions = deque()
+        self.position = -1
+
+    def update(self):
+        x = self.children[0].value
+        self.position += 1
+        oldest = self.position - self.window + 1
+        while self.candidates and self.candidates[0][0] < oldest:
+            self.candidates.popleft()
+        while self.nan_positions and self.nan_positions[0] < oldest:
+            self.nan_positions.popleft()
+
+        if math.isnan(x):
+            self.nan_positions.append(self.position)
+        else:
+            while self.candidates and self.candidates[-1][1] <= x:
+                self.candidates.pop()
+            self.candidates.append((self.position, x))
+
+        if oldest < 0 or self.nan_positions or not self.candidates:
+            self.value = math.nan
+        else:
+            self.value = self.candidates[0][1]
+
+    def save(self):
+        return tuple(self.candidates), tuple(self.nan_positions), self.position
+
+    def restore(self, state):
+        candidates, nan_positions, self.position = state
+        self.candidates, self.nan_positions = deque(candidates), deque(nan_positions)
+
+_OPERATORS = {
+    'close': _Close,
+    'round': _Round,
+    'scale': _Scale,
+    'div': _Binary,
+    'mul': _Binary,
+    'sub': _Binary,
+    'pct_change': _PctChange,
+    'rolling_mean': _RollingMoments,
+    'rolling_std': _RollingMoments,
+    'rolling_max': _RollingMax,
+    **{op: _CrossSection for op in CROSS_SECTIONAL},
+}
+
+class StreamingFeatures:
+    """Incremental counterpart of ``CompiledStrategy.evaluate`` for one bar at a time.
+
+    The strategy's feature expressions are compiled once into operators in
+    dependency order, sharing identical sub-expressions, so each new bar costs a
+    single pass over the operators regardless of how much history was seen.
+    The newest bar stays open: ``update(closes, new_bar=False)`` replaces it, so
+    several ticks within one week leave the same state as a single weekly bar.
+    """
+
+    def __init__(self, compiled_strategy: CompiledStrategy):
+        self.compiled_strategy = compiled_strategy
+        self._operators = {}
+        self._order = []
+        self._inputs = {}
+        self._outputs = [self._compile(('round', node)) for node in compiled_strategy.nodes]
+        self._before_open_bar = None  # Operator states saved before the open bar was applied
+        self.bars = 0
+
+    def _compile(self, node) -> _Operator:
+        if node in self._operators:
+            return self._operators[node]
+        children = [self._compile(child) for child in node[1:] if isinstance(child, tuple)]
+        operator = _OPERATORS[node[0]](node, children)
+        self._operators[node] = operator
+        self._order.append(operator)
+        if node[0] == 'close':
+            self._inputs[node[1]] = operator
+        return operator
+
+    def update(self, closes: dict, new_bar: bool = True) -> np.ndarray:
+        """Apply one bar of closes keyed by base symbol and return its feature row.
+
+        With ``new_bar`` the closes start a new bar; otherwise they revise the open
+        bar, as if its earlier closes had never been applied.
+        """
+        missing = [symbol for symbol in self._inputs if symbol not in closes]
+        if missing:
+            raise ValueError(f"Required feature {missing[0]} not found in data")
+        if new_bar or self._before_open_bar is None:
+            self._before_open_bar = [operator.save() for operator in self._order]
+            self.bars += 1
+        else:
+            for operator, state in zip(self._order, self._before_open_bar):
+                operator.restore(state)
+        for symbol, operator in self._inputs.items():
+            operator.value = float(closes[symbol])
+        for operator in self._order:
+            operator.update()
+
+        row = np.fromiter((output.value for output in self._outputs), dtype=np.float64, count=len(self._outputs))
+        row[np.isnan(row)] = 0
+        return row
+
+class StreamingScorer:
+    """Keeps a strategy's rolling feature state and scores each new bar with one model."""
+
+    def __init__(self, compiled_strategy: CompiledStrategy, model: Scorer, scaler):
+        self.features = StreamingFeatures(compiled_strategy)
+        self.model = model
+        self.scaler = scaler
+
+    @property
+    def symbols(self) -> list:
+        return self.features.compiled_strategy.symbols
+
+    def prime(self, closes: dict):
+        """Feed historical closes (symbol -> equal length arrays) without scoring them."""
+        columns = [np.asarray(closes[symbol], dtype=np.float64) for symbol in self.symbols]
+        for values in zip(*columns):
+            self.features.update(dict(zip(self.symbols, values)))
+
+    def update(self, closes: dict, new_bar: bool = True) -> dict:
+        """Append or revise the open bar and return its features, prediction and [normal, anomaly] probabilities."""
+        row = self.features.update(closes, new_bar)
+        scaled = self.scaler.transform(row.reshape(1, -1).copy())
+        predictions, probabilities = self.model.score(scaled)
+        prediction, probabilities = predictions[0], probabilities[0]
+        return {
+            'features': dict(zip(self.features.compiled_strategy.columns, row.tolist())),
+            'prediction': prediction.item() if hasattr(prediction, 'item') else prediction,
+            'probabilities': probabilities.tolist(),
+        }
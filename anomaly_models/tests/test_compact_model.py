@@ -0,0 +1,76 @@
+import glob
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+from sklearn.neural_network import MLPClassifier
+
+import run_prediction
+from compact_model import (EXPORTABLE_MODELS, MAX_DEVIATION, PREPARED_DATA_DIR, RESULTS_DIR, deviation, export_estimator, load_compact,
+                           save_compact)
+
+SOURCE_MODELS = sorted(
+    path for model_name in EXPORTABLE_MODELS
+    for path in glob.glob(os.path.join(RESULTS_DIR, '*', 'models', f'{model_name}.joblib'))
+)
+
+def prepared_split(folder: str) -> tuple:
+    path = os.path.join(PREPARED_DATA_DIR, folder)
+    return np.load(os.path.join(path, 'X_train.npy')), np.load(os.path.join(path, 'y_train.npy')), np.load(os.path.join(path, 'X_test.npy'))
+
+@pytest.mark.filterwarnings('ignore::sklearn.exceptions.InconsistentVersionWarning')
+@pytest.mark.parametrize('path', SOURCE_MODELS, ids=lambda path: os.path.relpath(path, RESULTS_DIR))
+def test_exported_trained_models_match_their_source_model(tmp_path, path):
+    folder = os.path.basename(os.path.dirname(os.path.dirname(path)))
+    try:
+        model = joblib.load(path)
+    except ModuleNotFoundError as e:
+        pytest.skip(f"pickle needs another scikit-learn: {e}")
+    compact = str(tmp_path / 'model.compact')
+    save_compact(compact, *export_estimator(model))
+    assert deviation(model, load_compact(compact), prepared_split(folder)[2]) <= MAX_DEVIATION
+
+def test_exportable_model_without_artifact_fails_to_load(monkeypatch, tmp_path):
+    monkeypatch.setattr(run_prediction, 'compact_path', lambda path: str(tmp_path / 'missing.compact'))
+    with pytest.raises(FileNotFoundError, match='compact_model.py'):
+        run_prediction._read_model(5, 'random_forest')
+
+# The committed gradient boosting and voting pickles need an older scikit-learn to load,
+# so those exporters are checked against models of the same shape fitted here
+FITTED_MODELS = {
+    'gradient_boosting': lambda: GradientBoostingClassifier(n_estimators=40, subsample=0.8, random_state=0),
+    'gradient_boosting_zero_init': lambda: GradientBoostingClassifier(n_estimators=20, init='zero', random_state=0),
+    'soft_voting': lambda: VotingClassifier([
+        ('random_forest', RandomForestClassifier(n_estimators=20, random_state=0)),
+        ('gradient_boosting', GradientBoostingClassifier(n_estimators=20, random_state=0)),
+    ], voting='soft'),
+    'weighted_soft_voting_with_dropped_member': lambda: VotingClassifier([
+        ('random_forest', RandomForestClassifier(n_estimators=10, random_state=0)),
+        ('dropped', 'drop'),
+        ('gradient_boosting', GradientBoostingClassifier(n_estimators=10, random_state=0)),
+    ], voting='soft', weights=[1, 5, 2]),
+    'weighted_hard_voting': lambda: VotingClassifier([
+        ('random_forest', RandomForestClassifier(n_estimators=10, random_state=0)),
+        ('gradient_boosting', GradientBoostingClassifier(n_estimators=10, random_state=0)),
+        ('neural_net', MLPClassifier(hidden_layer_sizes=(16,), max_iter=300, random_state=0)),
+    ], voting='hard', weights=[1, 2, 1]),
+}
+
+@pytest.mark.filterwarnings('ignore::sklearn.exceptions.ConvergenceWarning')
+@pytest.mark.parametrize('name', FITTED_MODELS)
+@pytest.mark.parametrize('folder', ['vix_momentum', 'all_features'])
+def test_exported_boosting_and_voting_match_the_fitted_model(tmp_path, name, folder):
+    X_train, y_train, X_test = prepared_split(folder)
+    model = FITTED_MODELS[name]().fit(X_train, y_train)
+    path = str(tmp_path / f'{name}.compact')
+    save_compact(path, *export_estimator(model))
+    compact = load_compact(path)
+    assert deviation(model, compact, X_test) <= MAX_DEVIATION
+    if hasattr(model, 'predict_proba') and getattr(model, 'voting', 'soft') == 'soft':
+        np.testing.assert_allclose(compact.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=MAX_DEVIATION)
+
+def test_xgboost_is_not_exported():
+    with pytest.raises(ValueError, match='No compact format'):
+        export_estimator(type('XGBClassifier', (), {})())
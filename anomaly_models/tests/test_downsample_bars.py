@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from run_prediction import downsample_bars
+
+ROWS = 6990
+
+def daily_bars(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({
+        'symbol_Open': close * (1 + rng.normal(0, 0.002, rows)),
+        'symbol_High': close * 1.01,
+        'symbol_Low': close * 0.99,
+        'symbol_Close': close,
+        'symbol_Volume': rng.integers(1_000, 10_000, rows).astype(np.float64),
+    }, index=pd.date_range('1998-01-01', periods=rows, freq='D', tz='UTC'))
+
+def scores(rows: int, anomaly_rate: float, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    anomaly = rng.random(rows)
+    predictions = (anomaly < anomaly_rate).astype(int)
+    # Probabilities that disagree with some labels, as thresholded voting can produce
+    probability = np.where(predictions == 1, anomaly * 0.5, 0.2 + 0.8 * anomaly)
+    return predictions, np.column_stack([1 - probability, probability])
+
+@pytest.mark.parametrize('max_points', [1, 2, 3, 10, 300, 1500])
+@pytest.mark.parametrize('anomaly_rate', [0.0, 0.002, 0.05, 0.5])
+def test_downsampled_series_never_exceeds_max_points(max_points, anomaly_rate):
+    bars = daily_bars(ROWS, seed=max_points)
+    predictions, probabilities = scores(ROWS, anomaly_rate, seed=max_points)
+    downsampled, bucket_predictions, bucket_probabilities = downsample_bars(bars, predictions, probabilities, max_points)
+
+    assert len(downsampled) <= max_points
+    assert len(bucket_predictions) == len(bucket_probabilities) == len(downsampled)
+    assert downsampled['symbol_Volume'].sum() == bars['symbol_Volume'].sum()
+    assert downsampled['symbol_High'].max() == bars['symbol_High'].max()
+
+    # A bucket is flagged exactly when it holds an anomalous bar, at that bar's probability
+    starts = bars.index.get_indexer(downsampled.index)
+    holds_anomaly = np.add.reduceat(predictions, starts) > 0
+    np.testing.assert_array_equal(bucket_predictions == 1, holds_anomaly)
+    best = np.maximum.reduceat(np.where(predictions == 1, probabilities[:, 1], -1), starts)
+    np.testing.assert_array_equal(bucket_probabilities[holds_anomaly, 1], best[holds_anomaly])
+
+def test_separate_anomaly_runs_keep_their_own_buckets_when_they_fit():
+    bars = daily_bars(ROWS, seed=0)
+    predictions, probabilities = scores(ROWS, 0.002, seed=0)
+    downsampled, bucket_predictions, _ = downsample_bars(bars, predictions, probabilities, 300)
+
+    anomalous = bars.index[predictions == 1]
+    assert bucket_predictions.sum() == len(anomalous)
+    assert downsampled.index[bucket_predictions == 1].equals(anomalous)
+
+def test_short_series_is_returned_unchanged():
+    bars = daily_bars(100, seed=0)
+    predictions, probabilities = scores(100, 0.5, seed=0)
+    downsampled, bucket_predictions, bucket_probabilities = downsample_bars(bars, predictions, probabilities, 100)
+    assert downsampled is bars and bucket_predictions is predictions and bucket_probabilities is probabilities
@@ -0,0 +1,10 @@
+import benchmark
+
+# Importing run_prediction took about 1.8 s when sklearn, yfinance and joblib loaded with it
+IMPORT_BUDGET_MS = 750
+
+def test_run_prediction_imports_within_budget_without_heavy_libraries():
+    assert {'sklearn', 'yfinance', 'pandas_datareader', 'joblib'} <= set(benchmark.LAZY_MODULES)
+    result = benchmark.measure_import(repeat=3)
+    assert result['eager'] == []
+    assert result['bestMs'] < IMPORT_BUDGET_MS
@@ -0,0 +1,88 @@
+import json
+import pstats
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import instrumentation
+from instrumentation import request, stage, timed
+from stage_graph import StageGraph
+
+@timed('double', lambda result: {'rows': len(result)})
+def double(values: list) -> list:
+    return values * 2
+
+def test_stages_are_recorded_in_order_with_their_counters():
+    with request('predict') as recorder:
+        with stage('fetch', symbols=3) as record:
+            record.set(cacheHits=2)
+        double([1, 2])
+
+    assert [record['name'] for record in recorder.stages] == ['fetch', 'double']
+    assert recorder.stages[0]['symbols'] == 3 and recorder.stages[0]['cacheHits'] == 2
+    assert recorder.stages[1]['rows'] == 4
+    assert all(record['ms'] >= 0 for record in recorder.stages)
+    assert recorder.timings['request'] == 'predict' and recorder.timings['stages'] is recorder.stages
+
+def test_stages_outside_a_request_are_not_recorded():
+    with stage('fetch') as record:
+        pass
+    assert 'ms' not in record
+    assert double([1]) == [1, 1]
+
+def test_summary_is_appended_to_the_metrics_file(tmp_path):
+    metrics = tmp_path / 'metrics.ndjson'
+    for _ in range(2):
+        with request('predict', metrics_file=str(metrics)):
+            double([1])
+    lines = [json.loads(line) for line in metrics.read_text().splitlines()]
+    assert len(lines) == 2 and lines[0]['stages'][0]['name'] == 'double'
+
+def test_slow_requests_are_profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'PROFILE_DIR', str(tmp_path))
+    with request('predict', profile_slow_ms=0):
+        double([1])
+    [dump] = tmp_path.glob('*-predict-*ms.prof')
+    functions = {function for _, _, function in pstats.Stats(str(dump)).stats}
+    assert 'double' in functions
+
+def test_fast_requests_are_not_profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'PROFILE_DIR', str(tmp_path))
+    with request('predict', profile_slow_ms=60_000):
+        double([1])
+    assert list(tmp_path.iterdir()) == []
+
+def stage_work(values: list) -> list:
+    return sorted(values)
+
+def test_stage_graph_stages_on_executor_threads_are_profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'PROFILE_DIR', str(tmp_path))
+    with ThreadPoolExecutor(max_workers=2) as executor, request('predict', profile_slow_ms=0):
+        graph = StageGraph(executor)
+        graph.add('sorted', stage_work, [3, 1, 2])
+        assert graph.result('sorted') == [1, 2, 3]
+    [dump] = tmp_path.glob('*-predict-*ms.prof')
+    functions = {function for _, _, function in pstats.Stats(str(dump)).stats}
+    assert 'stage_work' in functions
+
+def test_request_summary_labels_the_lifetime_peak_as_process_wide():
+    with request('predict') as recorder:
+        double([1])
+    assert 'peakRssMb' not in recorder.timings
+    assert 'processPeakRssMb' in recorder.timings
+    assert all('processPeakRssMb' not in record for record in recorder.stages)
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='current resident memory is read from /proc')
+def test_stages_record_their_own_resident_memory_change():
+    with request('predict') as recorder:
+        with stage('allocate'):
+            block = np.ones(64 * 1024 * 1024 // 8)
+        with stage('idle'):
+            pass
+    allocate, idle = recorder.stages
+    assert allocate['rssDeltaMb'] >= 48
+    assert abs(idle['rssDeltaMb']) < 8
+    assert recorder.timings['rssDeltaMb'] >= 48
+    del block
@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import run_prediction
+from feature_registry import compile_strategy
+from feature_scaler import FeatureScaler
+from scoring import Scorer
+from session_store import SessionNotFound, SessionStore
+from streaming_scorer import StreamingScorer
+
+class Session:
+    last_used = None
+
+def test_least_recently_used_sessions_are_evicted():
+    store = SessionStore('test', max_sessions=2)
+    first, second = store.add(Session()), store.add(Session())
+    store.get(first)
+    third = store.add(Session())
+
+    assert len(store) == 2
+    store.get(first)
+    store.get(third)
+    with pytest.raises(SessionNotFound):
+        store.get(second)
+
+def test_idle_sessions_expire(monkeypatch):
+    store = SessionStore('test', idle_seconds=60)
+    session = store.add(Session())
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+
+    with pytest.raises(SessionNotFound):
+        store.get(session)
+    assert len(store) == 0
+
+class ThresholdModel:
+    def predict(self, X):
+        return (X[:, 0] > 0).astype(np.int64)
+
+def open_session(monkeypatch, weeks: int = 30) -> tuple[str, StreamingScorer]:
+    compiled = compile_strategy('17')
+    closes = 20 + np.arange(weeks, dtype=np.float64)
+    scaler = FeatureScaler(compiled.columns, np.zeros(len(compiled.columns)), np.ones(len(compiled.columns)))
+    scorer = StreamingScorer(compiled, Scorer(ThresholdModel()), scaler)
+    scorer.prime({'VIX': closes})
+    monkeypatch.setattr(run_prediction, 'STREAM_SESSIONS', SessionStore('streaming'))
+    week = pd.Timestamp('2026-10-12', tz='UTC')
+    return run_prediction.STREAM_SESSIONS.add(run_prediction.StreamSession(scorer, {'VIX': 1}, week)), scorer
+
+def test_stream_ticks_in_the_open_week_revise_its_bar(monkeypatch):
+    session, scorer = open_session(monkeypatch)
+    bars = scorer.features.bars
+
+    tick = run_prediction.update_stream({'session': session, 'closes': {'VIX': 60}, 'timestamp': '2026-10-14T15:00:00Z'})
+    assert not tick['newBar'] and tick['bars'] == bars
+    tick = run_prediction.update_stream({'session': session, 'closes': {'VIX': 61}, 'timestamp': '2026-10-19T15:00:00Z'})
+    assert tick['newBar'] and tick['bars'] == bars + 1
+
+    with pytest.raises(ValueError):
+        run_prediction.update_stream({'session': session, 'closes': {'VIX': 61}, 'timestamp': '2026-10-16T15:00:00Z'})
+
+def test_closed_stream_sessions_are_gone(monkeypatch):
+    session, _ = open_session(monkeypatch)
+    assert run_prediction.close_stream({'session': session}) == {'closed': True}
+    with pytest.raises(SessionNotFound):
+        run_prediction.update_stream({'session': session, 'closes': {'VIX': 60}})
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_registry import FeatureGraph, compile_strategy, load_strategies
+from streaming_scorer import StreamingFeatures
+
+STRATEGIES = [strategy for strategy in load_strategies() if compile_strategy(strategy) is not None]
+
+def weekly_closes(symbols: list, weeks: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        f"{symbol}_Close": np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.03, weeks))), 3) for symbol in symbols
+    })
+
+def bar(closes: pd.DataFrame, symbols: list, week: int) -> dict:
+    return {symbol: closes[f"{symbol}_Close"].iloc[week] for symbol in symbols}
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_weekly_bars_match_batch_features(strategy):
+    compiled = compile_strategy(strategy)
+    closes = weekly_closes(compiled.symbols, 60)
+    expected = compiled.evaluate(FeatureGraph(closes))
+
+    features = StreamingFeatures(compiled)
+    rows = np.array([features.update(bar(closes, compiled.symbols, week)) for week in range(len(closes))])
+    np.testing.assert_allclose(rows, expected, rtol=0, atol=1e-3)
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_ticks_revising_the_open_bar_match_batch_features(strategy):
+    compiled = compile_strategy(strategy)
+    closes = weekly_closes(compiled.symbols, 60)
+    expected = compiled.evaluate(FeatureGraph(closes))
+    rng = np.random.default_rng(1)
+
+    plain, ticked = StreamingFeatures(compiled), StreamingFeatures(compiled)
+    for week in range(len(closes)):
+        final = bar(closes, compiled.symbols, week)
+        # A few intraweek ticks, the first of which opens the week's bar
+        for tick in range(3):
+            ticked.update({symbol: round(close * (1 + rng.normal(0, 0.02)), 3) for symbol, close in final.items()}, new_bar=tick == 0)
+        row = ticked.update(final, new_bar=False)
+
+        np.testing.assert_array_equal(row, plain.update(final))
+        np.testing.assert_allclose(row, expected[week], rtol=0, atol=1e-3)
+    assert ticked.bars == plain.bars == len(closes)
+
+def test_open_bar_tick_matches_batch_over_the_revised_series():
+    compiled = compile_strategy('14')
+    closes = weekly_closes(compiled.symbols, 40)
+    features = StreamingFeatures(compiled)
+    for week in range(len(closes)):
+        features.update(bar(closes, compiled.symbols, week))
+
+    revised = closes.copy()
+    revised.iloc[-1] = revised.iloc[-1] * 1.05
+    row = features.update(bar(revised, compiled.symbols, len(closes) - 1), new_bar=False)
+    np.testing.assert_allclose(row, compiled.evaluate(FeatureGraph(revised))[-1], rtol=0, atol=1e-3)
@@ -1,5 +1,5 @@
 import express, { Request, Response, RequestHandler } from 'express';
-import { spawn } from 'child_process';
+import { spawn, ChildProcess } from 'child_process';
 import path from 'path';
 import { fileURLToPath } from 'url';
 import fs from 'fs/promises';
@@ -10,6 +10,44 @@ interface PredictionRequest {
     base_features: { [key: string]: string };  // Base features needed for prediction
     interval: string;
     model: string;
+    alignment?: 'exact' | 'asof';  // How weekly predictions are spread over daily bars
+    timings?: boolean;  // Include per-stage timings in the response
+    format?: 'json' | 'binary';  // binary answers with a typed-column frame (application/octet-stream)
+    news?: boolean;  // false skips the news search
+    max_points?: number;  // Merge daily bars into at most this many buckets, flagging any bucket holding an anomalous bar
+}
+
+interface BatchPredictionRequest {
+    strategies: string[];
+    models: string[];
+    symbol: string;  // Primary symbol to chart predictions against
+    base_features?: { [key: string]: string };  // Overrides for feature to symbol mapping
+    interval: string;
+    alignment?: 'exact' | 'asof';
+    format?: 'json' | 'binary';
+}
+
+interface ScreenRequest {
+    strategy: string;
+    watchlist: string[];  // Primary symbols to screen
+    base_features: { [key: string]: string };
+    interval: string;
+    model: string;
+    alignment?: 'exact' | 'asof';
+    include_series?: boolean;
+}
+
+interface StreamOpenRequest {
+    strategy: string;
+    base_features?: { [key: string]: string };
+    interval: string;  // History used to warm up the rolling windows
+    model: string;
+}
+
+interface StreamUpdateRequest {
+    closes: { [feature: string]: number };  // Latest weekly close per base feature
+    timestamp?: string;  // Ticks in the open bar's week revise it, later weeks start a new bar
+    new_bar?: boolean;  // Overrides the timestamp: start a new bar or revise the open one
 }
 
 interface PredictionResponse {
@@ -28,125 +66,354 @@ const __dirname = path.dirname(__filename);
 
 const router = express.Router();
 
+interface WorkerReply {
+    id?: number;
+    ready?: boolean;
+    partial?: any;
+    result?: any;
+    error?: string;
+    type?: string;
+}
+
+interface PendingRequest {
+    resolve: (reply: WorkerReply) => void;
+    reject: (error: Error) => void;
+    onPartial?: (partial: any) => void;
+}
+
+// Long-lived Python process (run_prediction.py or ai_chat.py) started with --worker,
+// which keeps imports, models and HTTP clients warm between requests.
+// Requests and responses are exchanged as NDJSON lines tagged with an id.
+class PythonWorker {
+    private process: ChildProcess | null = null;
+    private pending = new Map<number, PendingRequest>();
+    private nextId = 1;
+    private buffer = '';
+
+    constructor(private script: string, private label: string) {}
+
+    private start(): ChildProcess {
+        const scriptPath = path.join(__dirname, '../../anomaly_models', this.script);
+        const venvPythonPath = process.platform === 'win32'
+            ? path.join(__dirname, '../../anomaly_models/.venv/Scripts/python.exe')
+            : path.join(__dirname, '../../anomaly_models/.venv/bin/python');
+
+        console.log(`Starting ${this.label}:`, { scriptPath, venvPythonPath });
+
+        const workerProcess = spawn('"' + venvPythonPath + '"', [
+            '-u',
+            '"' + scriptPath + '"',
+            '--worker'
+        ], {
+            cwd: path.join(__dirname, '../../anomaly_models'),
+            shell: true,
+            windowsVerbatimArguments: true
+        });
+
+        workerProcess.stdout.on('data', (data) => {
+            this.buffer += data.toString();
+            let newlineIndex: number;
+            while ((newlineIndex = this.buffer.indexOf('\n')) !== -1) {
+                const line = this.buffer.slice(0, newlineIndex).trim();
+                this.buffer = this.buffer.slice(newlineIndex + 1);
+                if (line) {
+                    this.handleLine(line);
+                }
+            }
+        });
+
+        workerProcess.stderr.on('data', (data) => {
+            console.log(`${this.label} stderr:`, data.toString());
+        });
+
+        workerProcess.on('close', (code) => {
+            console.error(`${this.label} exited with code:`, code);
+            this.process = null;
+            this.buffer = '';
+            for (const request of this.pending.values()) {
+                request.reject(new Error(`${this.label} exited with code ${code}`));
+            }
+            this.pending.clear();
+        });
+
+        return workerProcess;
+    }
+
+    private handleLine(line: string) {
+        let reply: WorkerReply;
+        try {
+            reply = JSON.parse(line);
+        } catch {
+            console.warn('Ignoring malformed worker output:', line);
+            return;
+        }
+        if (reply.id === undefined || reply.id === null) {
+            if (reply.error) {
+                console.error(`${this.label} error:`, reply.error);
+            }
+            return;
+        }
+        const request = this.pending.get(reply.id);
+        if (request && reply.partial !== undefined) {
+            request.onPartial?.(reply.partial);
+            return;
+        }
+        if (request) {
+            this.pending.delete(reply.id);
+            request.resolve(reply);
+        }
+    }
+
+    request(args: { [key: string]: any }, op?: string, onPartial?: (partial: any) => void): Promise<WorkerReply> {
+        if (!this.process) {
+            this.process = this.start();
+        }
+        const id = this.nextId++;
+        const workerProcess = this.process;
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject, onPartial });
+            workerProcess.stdin?.write(JSON.stringify({ id, ...(op ? { op } : {}), args }) + '\n');
+        });
+    }
+}
+
+const predictionWorker = new PythonWorker('run_prediction.py', 'Prediction worker');
+const chatWorker = new PythonWorker('ai_chat.py', 'Chat worker');
+
+// Binary results arrive base64 encoded over the worker pipe; the client gets the raw frame.
+const sendFrame = (res: Response, result: { frame: string; timings?: any }) => {
+    if (result.timings) {
+        res.setHeader('X-Prediction-Timings', JSON.stringify(result.timings));
+    }
+    res.type('application/octet-stream').send(Buffer.from(result.frame, 'base64'));
+};
+
 const predictHandler: RequestHandler = async (req: Request<{}, any, PredictionRequest>, res: Response): Promise<void> => {
     try {
-        const { strategy, symbol, base_features, interval, model } = req.body;
-        console.log('Received prediction request:', { strategy, symbol, base_features, interval, model });
+        const { strategy, symbol, base_features, interval, model, alignment, timings, format, news, max_points } = req.body;
+        console.log('Received prediction request:', { strategy, symbol, base_features, interval, model, alignment });
 
         if (!strategy || !symbol || !base_features || !interval || !model) {
             res.status(400).json({ error: 'Missing required parameters' });
             return;
         }
 
-        const scriptPath = path.join(__dirname, '../../anomaly_models/run_prediction.py');
-        const venvPythonPath = path.join(__dirname, '../../anomaly_models/.venv/Scripts/python.exe');
-        
-        console.log('Python script path:', scriptPath);
-        console.log('Virtual env Python path:', venvPythonPath);
-        
         const symbol_mapping = {
             ...base_features,
             PRIMARY_SYMBOL: symbol
         };
-        
-        const symbolMappingJson = JSON.stringify(symbol_mapping).replace(/"/g, '\\"');
-        
-        const pythonProcess = spawn('"' + venvPythonPath + '"', [
-            '-u', 
-            '"' + scriptPath + '"',
-            '--strategy', strategy.toString(),
-            '--symbol-mapping', `"${symbolMappingJson}"`,
-            '--interval', interval,
-            '--model', model,
-            '--primary-symbol', symbol 
-        ], {
-            cwd: path.join(__dirname, '../../anomaly_models'),
-            shell: true,
-            windowsVerbatimArguments: true
+
+        const reply = await predictionWorker.request({
+            strategy: strategy.toString(),
+            symbol_mapping,
+            interval,
+            model,
+            primary_symbol: symbol,
+            ...(alignment ? { alignment } : {}),
+            ...(timings ? { timings: true } : {}),
+            ...(format ? { format } : {}),
+            ...(news === false ? { no_news: true } : {}),
+            ...(max_points ? { max_points } : {})
         });
 
-        let result = '';
-        let error = '';
+        if (reply.error) {
+            console.error('Prediction error:', reply.error);
+            const error = JSON.stringify({ error: reply.error, type: reply.type });
+            const wrongSymbol = reply.error.includes('no price data found') || reply.error.includes('No data returned for symbol');
+            res.status(wrongSymbol ? 400 : 500).json({
+                error,
+                details: {
+                    type: reply.type,
+                    stderr: error
+                }
+            });
+            return;
+        }
 
-        pythonProcess.stdout.on('data', (data) => {
-            const output = data.toString();
-            console.log('Python stdout:', output);
-            result += output;
-        });
+        if (format === 'binary') {
+            sendFrame(res, reply.result);
+            return;
+        }
+
+        const predictions = reply.result;
+        if (!predictions.marketStats) {
+            console.warn('Market stats missing from Python response');
+        }
+
+        res.json(predictions);
 
-        pythonProcess.stderr.on('data', (data) => {
-            const errorOutput = data.toString();
-            console.error('Python stderr:', errorOutput);
-            error += errorOutput;
+    } catch (error) {
+        console.error('Error in anomaly prediction:', error);
+        res.status(500).json({ 
+            error: 'Internal server error',
+            details: error instanceof Error ? error.message : String(error)
         });
+    }
+};
 
-        pythonProcess.on('close', (code) => {
-            console.log('Python process exited with code:', code);
-            if (code !== 0) {
-                console.error('Python process error:', error);
-                try {
-                    if (error.includes('no price data found')) {
-                        res.status(400).json({ 
-                            error: error || 'Wrong Symbol',
-                            details: {
-                            exitCode: code,
-                            stderr: error
-                        }
-                    });
-                        return;
-                    }
-                    else {
-                        res.status(500).json({ 
-                            error: error || 'An error occurred during prediction',
-                            details: {
-                            exitCode: code,
-                            stderr: error
-                        }
-                    });
-                    return;
-                    }
-                } catch {
-                    res.status(500).json({ 
-                        error: error || 'An error occurred during prediction',
-                        details: {
-                            exitCode: code,
-                            stderr: error
-                        }
-                    });
-                    return;
-                }
-            }
+const batchPredictHandler: RequestHandler = async (req: Request<{}, any, BatchPredictionRequest>, res: Response): Promise<void> => {
+    try {
+        const { strategies, models, symbol, base_features, interval, alignment, format } = req.body;
+        console.log('Received batch prediction request:', { strategies, models, symbol, interval, alignment });
 
-            try {
-                const lastLine = result.trim().split('\n').pop() || '';
-                const predictions = JSON.parse(lastLine);
-                
-                if (!predictions.marketStats) {
-                    console.warn('Market stats missing from Python response');
+        if (!Array.isArray(strategies) || strategies.length === 0 || !Array.isArray(models) || models.length === 0 || !symbol || !interval) {
+            res.status(400).json({ error: 'Missing required parameters' });
+            return;
+        }
+
+        const reply = await predictionWorker.request({
+            strategies: strategies.map(String),
+            models,
+            symbol_mapping: base_features || {},
+            interval,
+            primary_symbol: symbol,
+            ...(alignment ? { alignment } : {}),
+            ...(format ? { format } : {})
+        }, 'batch');
+
+        if (reply.error) {
+            console.error('Batch prediction error:', reply.error);
+            const error = JSON.stringify({ error: reply.error, type: reply.type });
+            const wrongSymbol = reply.error.includes('no price data found') || reply.error.includes('No data returned for symbol');
+            res.status(wrongSymbol ? 400 : 500).json({
+                error,
+                details: {
+                    type: reply.type,
+                    stderr: error
                 }
-                
-                res.json(predictions);
-            } catch (e) {
-                console.error('Failed to parse prediction results:', e);
-                res.status(500).json({ 
-                    error: 'Failed to parse prediction results',
-                    details: {
-                        parseError: e instanceof Error ? e.message : String(e),
-                        rawResult: result
-                    }
-                });
-            }
+            });
+            return;
+        }
+
+        if (format === 'binary') {
+            sendFrame(res, reply.result);
+            return;
+        }
+        res.json(reply.result);
+
+    } catch (error) {
+        console.error('Error in batch anomaly prediction:', error);
+        res.status(500).json({
+            error: 'Internal server error',
+            details: error instanceof Error ? error.message : String(error)
+        });
+    }
+};
+
+// Streams one NDJSON line per watchlist symbol as the worker finishes it,
+// followed by a summary line.
+const screenHandler: RequestHandler = async (req: Request<{}, any, ScreenRequest>, res: Response): Promise<void> => {
+    try {
+        const { strategy, watchlist, base_features, interval, model, alignment, include_series } = req.body;
+        console.log('Received screening request:', { strategy, symbols: watchlist?.length, interval, model });
+
+        if (!strategy || !Array.isArray(watchlist) || watchlist.length === 0 || !base_features || !interval || !model) {
+            res.status(400).json({ error: 'Missing required parameters' });
+            return;
+        }
+
+        res.status(200);
+        res.setHeader('Content-Type', 'application/x-ndjson');
+
+        const reply = await predictionWorker.request({
+            strategy: strategy.toString(),
+            symbol_mapping: base_features,
+            interval,
+            model,
+            watchlist,
+            ...(alignment ? { alignment } : {}),
+            include_series: Boolean(include_series)
+        }, 'screen', (partial) => {
+            res.write(JSON.stringify(partial) + '\n');
         });
 
+        if (reply.error) {
+            console.error('Screening error:', reply.error);
+            res.write(JSON.stringify({ error: reply.error, type: reply.type }) + '\n');
+        } else {
+            res.write(JSON.stringify(reply.result) + '\n');
+        }
+        res.end();
+
     } catch (error) {
-        console.error('Error in anomaly prediction:', error);
-        res.status(500).json({ 
+        console.error('Error in watchlist screening:', error);
+        if (res.headersSent) {
+            res.end(JSON.stringify({ error: 'Internal server error' }) + '\n');
+            return;
+        }
+        res.status(500).json({
             error: 'Internal server error',
             details: error instanceof Error ? error.message : String(error)
         });
     }
 };
 
+// Live scoring: open a session once, then post each new weekly bar to it.
+const streamOpenHandler: RequestHandler = async (req: Request<{}, any, StreamOpenRequest>, res: Response): Promise<void> => {
+    try {
+        const { strategy, base_features, interval, model } = req.body;
+        if (!strategy || !interval || !model) {
+            res.status(400).json({ error: 'Missing required parameters' });
+            return;
+        }
+
+        const reply = await predictionWorker.request({
+            strategy: strategy.toString(),
+            symbol_mapping: base_features || {},
+            interval,
+            model
+        }, 'stream_open');
+
+        if (reply.error) {
+            console.error('Stream open error:', reply.error);
+            res.status(400).json({ error: reply.error, type: reply.type });
+            return;
+        }
+        res.json(reply.result);
+
+    } catch (error) {
+        console.error('Error opening scoring stream:', error);
+        res.status(500).json({
+            error: 'Internal server error',
+            details: error instanceof Error ? error.message : String(error)
+        });
+    }
+};
+
+const streamUpdateHandler: RequestHandler = async (req: Request<{ session: string }, any, StreamUpdateRequest>, res: Response): Promise<void> => {
+    try {
+        const { closes, timestamp, new_bar } = req.body;
+        if (!closes) {
+            res.status(400).json({ error: 'Missing required parameters' });
+            return;
+        }
+
+        const reply = await predictionWorker.request({ session: req.params.session, closes, timestamp, new_bar }, 'stream_update');
+        if (reply.error) {
+            res.status(400).json({ error: reply.error, type: reply.type });
+            return;
+        }
+        res.json(reply.result);
+
+    } catch (error) {
+        console.error('Error updating scoring stream:', error);
+        res.status(500).json({
+            error: 'Internal server error',
+            details: error instanceof Error ? error.message : String(error)
+        });
+    }
+};
+
+const streamCloseHandler: RequestHandler = async (req: Request<{ session: string }>, res: Response): Promise<void> => {
+    try {
+        const reply = await predictionWorker.request({ session: req.params.session }, 'stream_close');
+        res.json(reply.result);
+    } catch (error) {
+        console.error('Error closing scoring stream:', error);
+        res.status(500).json({ error: 'Internal server error' });
+    }
+};
+
 const supportedSymbolsHandler: RequestHandler = async (_req: Request, res: Response): Promise<void> => {
     try {
         const symbolsPath = path.join(__dirname, '../../src/data/supported_symbols.json');
@@ -160,8 +427,38 @@ const supportedSymbolsHandler: RequestHandler = async (_req: Request, res: Respo
 };
 
 router.post('/predict', predictHandler);
+router.post('/predict/batch', batchPredictHandler);
+router.post('/predict/screen', screenHandler);
+router.post('/predict/stream', streamOpenHandler);
+router.post('/predict/stream/:session', streamUpdateHandler);
+router.delete('/predict/stream/:session', streamCloseHandler);
 router.get('/supported-symbols', supportedSymbolsHandler);
 
+// Answers with { message } once the reply is complete, or, when the body sets stream,
+// with NDJSON: one { delta } line per generated chunk and a final { message } line.
+// /chat also returns a session; /chat/continue with that session only needs the new
+// message, and answers with type SessionNotFound once the session has expired.
+const relayChat = async (req: Request, res: Response, op: 'chat' | 'continue', args: { [key: string]: any }) => {
+    const stream = Boolean(req.body.stream);
+    if (stream) {
+        res.status(200);
+        res.setHeader('Content-Type', 'application/x-ndjson');
+        res.flushHeaders();
+    }
+
+    const reply = await chatWorker.request(args, op, stream ? (partial) => {
+        res.write(JSON.stringify(partial) + '\n');
+    } : undefined);
+
+    if (stream) {
+        res.end(JSON.stringify(reply.error ? { error: reply.error, type: reply.type } : reply.result) + '\n');
+    } else if (reply.error) {
+        res.status(500).json({ error: reply.error, type: reply.type });
+    } else {
+        res.json(reply.result);
+    }
+};
+
 router.post('/chat', async (req: Request, res: Response) => {
   try {
     const { 
@@ -174,97 +471,36 @@ router.post('/chat', async (req: Request, res: Response) => {
       derivedFeatures 
     } = req.body;
 
-    const scriptPath = path.join(__dirname, '../../anomaly_models/ai_chat.py');
-    const pythonPath = process.platform === 'win32' 
-      ? path.join(__dirname, '../../anomaly_models/.venv/Scripts/python.exe')
-      : path.join(__dirname, '../../anomaly_models/.venv/bin/python');
-    
-    const args = [
-      '--messages', JSON.stringify(messages),
-      '--market_data', JSON.stringify(marketData),
-      '--news_data', JSON.stringify(newsData),
-      '--strategy_name', strategyName || '',
-      '--strategy_purpose', strategyPurpose || '',
-      '--base_features', JSON.stringify(baseFeatures || {}),
-      '--derived_features', JSON.stringify(derivedFeatures || [])
-    ];
-
-    const result = await new Promise((resolve, reject) => {
-      const pythonProcess = spawn(pythonPath, [scriptPath, ...args]);
-      let dataString = '';
-      let errorString = '';
-
-      pythonProcess.stdout.on('data', (data) => {
-        dataString += data.toString();
-      });
-
-      pythonProcess.stderr.on('data', (data) => {
-        errorString += data.toString();
-      });
-
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          reject(new Error(errorString || 'Failed to get AI response'));
-        } else {
-          try {
-            resolve(JSON.parse(dataString));
-          } catch (e) {
-            reject(new Error('Invalid JSON response from Python script'));
-          }
-        }
-      });
+    await relayChat(req, res, 'chat', {
+      messages,
+      market_data: marketData || {},
+      news_data: newsData || [],
+      strategy_name: strategyName || '',
+      strategy_purpose: strategyPurpose || '',
+      base_features: baseFeatures || {},
+      derived_features: derivedFeatures || []
     });
-
-    res.json(result);
   } catch (error) {
     console.error('Error in AI chat:', error);
+    if (res.headersSent) {
+      res.end(JSON.stringify({ error: error.message }) + '\n');
+      return;
+    }
     res.status(500).json({ error: error.message });
   }
 });
 
 router.post('/chat/continue', async (req: Request, res: Response) => {
   try {
-    const { messages } = req.body;
-
-    const scriptPath = path.join(__dirname, '../../anomaly_models/ai_chat.py');
-    const pythonPath = process.platform === 'win32' 
-      ? path.join(__dirname, '../../anomaly_models/.venv/Scripts/python.exe')
-      : path.join(__dirname, '../../anomaly_models/.venv/bin/python');
-    
-    const args = [
-      '--messages', JSON.stringify(messages),
-      '--continue_chat', 'true' // Flag to indicate this is a continuation
-    ];
-
-    const result = await new Promise((resolve, reject) => {
-      const pythonProcess = spawn(pythonPath, [scriptPath, ...args]);
-      let dataString = '';
-      let errorString = '';
-
-      pythonProcess.stdout.on('data', (data) => {
-        dataString += data.toString();
-      });
-
-      pythonProcess.stderr.on('data', (data) => {
-        errorString += data.toString();
-      });
-
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          reject(new Error(errorString || 'Failed to get AI response'));
-        } else {
-          try {
-            resolve(JSON.parse(dataString));
-          } catch (e) {
-            reject(new Error('Invalid JSON response from Python script'));
-          }
-        }
-      });
-    });
+    const { messages, session } = req.body;
 
-    res.json(result);
+    await relayChat(req, res, 'continue', { messages, ...(session ? { session } : {}) });
   } catch (error) {
     console.error('Error in AI chat continuation:', error);
+    if (res.headersSent) {
+      res.end(JSON.stringify({ error: error.message }) + '\n');
+      return;
+    }
     res.status(500).json({ error: error.message });
   }
 });
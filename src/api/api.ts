@@ -1,4 +1,5 @@
 import axios, { AxiosInstance, AxiosError } from 'axios';
+import { decodePredictionFrame, PredictionFrame } from './predictionFrame';
 
 // Anomaly Detection
 export interface PredictionRequest {
@@ -7,6 +8,7 @@ export interface PredictionRequest {
   base_features: { [key: string]: string };
   interval: string;
   model: string;
+  max_points?: number;  // Server-side bucketing of long daily series; anomalous bars are always kept
 }
 
 const api: AxiosInstance = axios.create({
@@ -57,3 +59,21 @@ export const predictAnomalies = async (request: PredictionRequest): Promise<any>
 
   return response.json();
 };
+
+// Same request answered as a binary frame of typed columns instead of JSON lists
+export const predictAnomalyFrame = async (request: PredictionRequest): Promise<PredictionFrame> => {
+  const response = await fetch('/api/anomaly/predict', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ ...request, format: 'binary' }),
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.error || 'Failed to fetch predictions');
+  }
+
+  return decodePredictionFrame(await response.arrayBuffer());
+};
@@ -0,0 +1,58 @@
+// Decoder for the binary prediction frame written by anomaly_models/binary_frame.py.
+// Columns are viewed in place as typed arrays, so nothing is parsed element by element.
+
+export type FrameColumn = Int8Array | BigInt64Array | Float32Array | Float64Array;
+
+export interface PredictionFrame {
+  rows: number;
+  columns: { [name: string]: FrameColumn };
+  meta: { [key: string]: any };
+}
+
+interface ColumnDescriptor {
+  name: string;
+  dtype: 'int8' | 'int64' | 'float32' | 'float64';
+  offset: number;
+  length: number;
+}
+
+const MAGIC = 'AMDF';
+const VERSION = 1;
+const PREAMBLE_BYTES = 12;
+const ALIGNMENT = 8;
+
+const typedArray = (buffer: ArrayBuffer, column: ColumnDescriptor, byteOffset: number): FrameColumn => {
+  switch (column.dtype) {
+    case 'int8':
+      return new Int8Array(buffer, byteOffset, column.length);
+    case 'int64':
+      return new BigInt64Array(buffer, byteOffset, column.length);
+    case 'float32':
+      return new Float32Array(buffer, byteOffset, column.length);
+    case 'float64':
+      return new Float64Array(buffer, byteOffset, column.length);
+  }
+};
+
+export const decodePredictionFrame = (buffer: ArrayBuffer): PredictionFrame => {
+  const view = new DataView(buffer);
+  const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC || view.getUint8(4) !== VERSION) {
+    throw new Error(`Not a version ${VERSION} prediction frame`);
+  }
+
+  const headerLength = view.getUint32(8, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, PREAMBLE_BYTES, headerLength)));
+  let body = PREAMBLE_BYTES + headerLength;
+  body += (ALIGNMENT - (body % ALIGNMENT)) % ALIGNMENT;
+
+  const columns: { [name: string]: FrameColumn } = {};
+  for (const column of header.columns as ColumnDescriptor[]) {
+    columns[column.name] = typedArray(buffer, column, body + column.offset);
+  }
+  return { rows: header.rows, columns, meta: header.meta };
+};
+
+// Epoch millisecond timestamps as plain numbers, ready for chart libraries
+export const frameTimestamps = (frame: PredictionFrame): Float64Array =>
+  Float64Array.from(frame.columns.timestamp as BigInt64Array, (value) => Number(value));
@@ -36,11 +36,13 @@ export const AIChat: React.FC<AIChatProps> = ({
   const [message, setMessage] = useState('');
   const [messages, setMessages] = useState<Message[]>([]);
   const [isLoading, setIsLoading] = useState(false);
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   useEffect(() => {
     if (!isVisible) {
       setMessages([]);
+      setSessionId(null);
       setMessage('');
       setIsLoading(false);
       setIsOpen(false);
@@ -69,51 +71,84 @@ export const AIChat: React.FC<AIChatProps> = ({
     
     setIsLoading(true);
     
-    try {
-      const response = await fetch(
-        isInitialAnalysis ? '/api/anomaly/chat' : '/api/anomaly/chat/continue', 
-        {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify(
-            isInitialAnalysis ? {
-              messages: [{ role: 'user' as const, content: userMessage }],
-              marketData,
-              newsData,
-              strategyName,
-              strategyPurpose,
-              baseFeatures,
-              derivedFeatures
-            } : {
-              messages: [...messages, { role: 'user' as const, content: userMessage }]
-            }
-          ),
-        }
-      );
+    const conversation = isInitialAnalysis
+      ? [{ role: 'user' as const, content: userMessage }]
+      : [...messages, { role: 'user' as const, content: userMessage }];
 
-      if (!response.ok) {
+    // Streams one reply, showing it as it arrives; resolves with the final { message, session }
+    const streamReply = async (url: string, body: any) => {
+      const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ ...body, stream: true }),
+      });
+
+      if (!response.ok || !response.body) {
         throw new Error('Failed to get AI response');
       }
 
-      const data = await response.json();
-      
-      if (data.error) {
-        throw new Error(data.error);
+      // The reply arrives as NDJSON: { delta } lines while it is generated, then { message }
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let reply = '';
+      let final: any = null;
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let newlineIndex: number;
+        while ((newlineIndex = buffer.indexOf('\n')) !== -1) {
+          const line = buffer.slice(0, newlineIndex).trim();
+          buffer = buffer.slice(newlineIndex + 1);
+          if (!line) continue;
+
+          const data = JSON.parse(line);
+          if (data.error) {
+            throw Object.assign(new Error(data.error), { type: data.type });
+          }
+          if (data.delta === undefined) {
+            final = data;
+          }
+          reply = data.delta !== undefined ? reply + data.delta : data.message;
+          setMessages([...conversation, { role: 'assistant' as const, content: reply }]);
+        }
       }
+      return final;
+    };
 
+    try {
       if (isInitialAnalysis) {
-        setMessages([
-          { role: 'user' as const, content: userMessage },
-          { role: 'assistant' as const, content: data.message }
-        ]);
+        const final = await streamReply('/api/anomaly/chat', {
+          messages: conversation,
+          marketData,
+          newsData,
+          strategyName,
+          strategyPurpose,
+          baseFeatures,
+          derivedFeatures
+        });
+        setSessionId(final?.session ?? null);
       } else {
-        setMessages([
-          ...messages,
-          { role: 'user' as const, content: userMessage },
-          { role: 'assistant' as const, content: data.message }
-        ]);
+        try {
+          // The server keeps the market context and history, so only the new message is sent
+          if (!sessionId) {
+            throw Object.assign(new Error('No chat session'), { type: 'SessionNotFound' });
+          }
+          await streamReply('/api/anomaly/chat/continue', {
+            session: sessionId,
+            messages: [{ role: 'user' as const, content: userMessage }]
+          });
+        } catch (error: any) {
+          if (error?.type !== 'SessionNotFound') {
+            throw error;
+          }
+          // The session expired (or the worker restarted): fall back to sending the history
+          setSessionId(null);
+          await streamReply('/api/anomaly/chat/continue', { messages: conversation });
+        }
       }
     } catch (error) {
       console.error('Error sending message:', error);
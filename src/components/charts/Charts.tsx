@@ -104,6 +104,9 @@ const INTERVALS = [
   { value: 'max', label: 'Maximum' }
 ];
 
+// Longer histories are bucketed server side; the chart cannot show more bars than this anyway
+const CHART_MAX_POINTS = 1500;
+
 const isStrategyUsable = (strategy: Strategy): boolean => {
   if (!typedSymbols?.supported_symbols || !strategy?.features) {
     return false;
@@ -228,7 +231,8 @@ export const Charts = () => {
         symbol: searchSymbol,
         base_features,
         interval: selectedInterval,
-        model: selectedModel || 'voting_ensemble'
+        model: selectedModel || 'voting_ensemble',
+        max_points: CHART_MAX_POINTS
       });
 
       setApiResponse(response);